@@ -0,0 +1,79 @@
+from modules.voice_benchmark import (
+    BenchmarkSettings,
+    FixtureTranscriber,
+    RealtimeSttTranscriber,
+    ensure_fixtures,
+    load_fixtures,
+    run_base_flow,
+    run_typer_flow,
+)
+from modules.utils import build_file_path
+import json
+import typer
+
+app = typer.Typer()
+
+
+@app.command()
+def ping():
+    print("pong")
+
+
+@app.command()
+def run(
+    flow: str = typer.Option("all", "--flow", help="Options: ('typer', 'base', 'all')"),
+    runs: int = typer.Option(5, "--runs", "-n", help="Measured passes over the fixtures"),
+    fixtures: str = typer.Option(
+        "", "--fixtures", help="Directory of <name>.wav + <name>.txt utterances (default: synthetic ones in output/)"
+    ),
+    stt: str = typer.Option(
+        "fixture", "--stt", help="Options: ('fixture', 'realtime'). fixture: transcript after --stt-ms; realtime: RealtimeSTT on CPU"
+    ),
+    stt_ms: float = typer.Option(150, "--stt-ms", help="Stub transcription latency"),
+    llm_ms: float = typer.Option(600, "--llm-ms", help="Stub LLM latency to the complete response"),
+    first_token_ms: float = typer.Option(250, "--first-token-ms", help="Stub LLM latency to the first streamed token"),
+    command_ms: float = typer.Option(300, "--command-ms", help="Stub typer command execution time"),
+    tts_ms: float = typer.Option(100, "--tts-ms", help="Stub TTS latency to the first audio"),
+    mode: str = typer.Option("execute", "--mode", "-m", help="Typer assistant mode: ('default', 'execute', 'execute-no-scratch')"),
+    command_cache: bool = typer.Option(
+        False, "--command-cache", help="Let repeated typer requests reuse their cached command instead of the LLM"
+    ),
+    json_path: str = typer.Option("", "--json", help="Also write the report as JSON to this path"),
+):
+    """Measure per-stage and end-to-end p50/p95 latency of the voice pipelines offline"""
+    if flow not in ("typer", "base", "all"):
+        raise typer.BadParameter(f"Unknown flow: {flow}", param_hint="--flow")
+    directory = fixtures or ensure_fixtures(build_file_path("benchmark_fixtures"))
+    settings = BenchmarkSettings(
+        stt=stt_ms / 1000,
+        llm=llm_ms / 1000,
+        first_token=first_token_ms / 1000,
+        command=command_ms / 1000,
+        tts=tts_ms / 1000,
+        runs=runs,
+        mode=mode,
+        command_cache=command_cache,
+    )
+    transcriber = RealtimeSttTranscriber() if stt == "realtime" else FixtureTranscriber(settings.stt)
+
+    reports = []
+    try:
+        if flow in ("typer", "all"):
+            reports.append(run_typer_flow(load_fixtures(directory, "typer-") or load_fixtures(directory), transcriber, settings))
+        if flow in ("base", "all"):
+            reports.append(run_base_flow(load_fixtures(directory, "base-") or load_fixtures(directory), transcriber, settings))
+    finally:
+        if isinstance(transcriber, RealtimeSttTranscriber):
+            transcriber.shutdown()
+
+    for report in reports:
+        print(report.format())
+        print()
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump([report.as_dict() for report in reports], f, indent=2)
+        print(f"📈 Report written to {json_path}")
+
+
+if __name__ == "__main__":
+    app()
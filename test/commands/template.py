@@ -1,6 +1,25 @@
-import typer
+import os
 import sys
 
+import typer
+
+# Run as `python commands/template.py ...`: make `modules` importable. Command
+# bodies import their own dependencies so each invocation only loads what the
+# chosen command needs.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+app = typer.Typer()
+
+@app.callback()
+def main(profile_startup: bool = typer.Option(False, "--profile-startup",
+                                              help="Report the import-time breakdown of the given command and exit")):
+    """Ada command line: network, security and assistant commands."""
+    if profile_startup:
+        from modules.cli_startup import profile_startup as run_profile
+        argv = [a for a in sys.argv[1:] if a != "--profile-startup"]
+        typer.echo(run_profile(os.path.abspath(__file__), argv))
+        raise typer.Exit()
+
 @app.command()
 def ip_port_scan(target: str = typer.Argument(..., help="Target IP/CIDR or comma-separated list"),
                  port_mode: str = typer.Option("Common Ports", "--mode", help="Port scan mode: Common Ports, All Ports (1-65535), Custom Range, Custom List"),
@@ -124,6 +143,37 @@ def network_ping(ip: str = typer.Argument(..., help="Target IP to ping"),
     typer.echo(result)
     return result
 
+@app.command()
+def network_ping_many(targets: str = typer.Argument(..., help="Comma-separated list of hosts/IPs"),
+                      count: int = typer.Option(3, "--count", help="Echo requests per target"),
+                      packet_size: int = typer.Option(56, "--size", help="Packet size"),
+                      timeout: float = typer.Option(1.0, "--timeout", help="Seconds to wait for late replies")):
+    """Ping many hosts concurrently and print RTT/loss statistics (JSON)."""
+    from modules import network_skills_wrapper
+    result = network_skills_wrapper.ping_many(targets, count, packet_size, timeout)
+    typer.echo(result)
+    return result
+
+@app.command()
+def network_latency_monitor(targets: str = typer.Argument(..., help="Comma-separated list of hosts/IPs"),
+                            interval: float = typer.Option(1.0, "--interval", help="Seconds between probe rounds"),
+                            duration: float = typer.Option(60.0, "--duration", help="Seconds to run"),
+                            report_every: float = typer.Option(10.0, "--report-every", help="Seconds between live reports"),
+                            csv_path: str = typer.Option("", "--csv", help="Append every sample to this CSV file")):
+    """Monitor latency to many hosts concurrently with live p50/p95/p99 and jitter."""
+    from modules import network_skills_wrapper
+    result = network_skills_wrapper.latency_monitor(targets, interval, duration, report_every,
+                                                    csv_path=csv_path, echo=typer.echo)
+    return result
+
+@app.command()
+def network_latency_status():
+    """Show live statistics from the running latency monitor."""
+    from modules import network_skills_wrapper
+    result = network_skills_wrapper.latency_status()
+    typer.echo(result)
+    return result
+
 @app.command()
 def network_traceroute(ip: str = typer.Argument(..., help="Target IP for traceroute"),
                        max_hops: int = typer.Option(30, "--max-hops", help="Max hops"),
@@ -134,6 +184,16 @@ def network_traceroute(ip: str = typer.Argument(..., help="Target IP for tracero
     typer.echo(result)
     return result
 
+@app.command()
+def network_traceroute_many(targets: str = typer.Argument(..., help="Comma-separated list of hosts/IPs"),
+                            max_hops: int = typer.Option(30, "--max-hops", help="Max hops"),
+                            timeout: float = typer.Option(2.0, "--timeout", help="Seconds to wait for replies")):
+    """Traceroute to many hosts concurrently (Paris-style probes, cached shared hops)."""
+    from modules import network_skills_wrapper
+    result = network_skills_wrapper.traceroute_many(targets, max_hops, timeout)
+    typer.echo(result)
+    return result
+
 @app.command()
 def network_dns_lookup(domain: str = typer.Argument(..., help="Domain to query"),
                        record_type: str = typer.Option("A", "--type", help="DNS record type"),
@@ -144,6 +204,25 @@ def network_dns_lookup(domain: str = typer.Argument(..., help="Domain to query")
     typer.echo(result)
     return result
 
+@app.command()
+def network_dns_bulk(domains: str = typer.Argument(..., help="Comma-separated list of domains"),
+                     record_types: str = typer.Option("A", "--types", help="Comma-separated record types, e.g. A,AAAA,MX"),
+                     dns_server: str = typer.Option("8.8.8.8", "--server", help="DNS server")):
+    """Resolve many domains and record types concurrently."""
+    from modules import network_skills_wrapper
+    result = network_skills_wrapper.dns_bulk_lookup(domains, record_types, dns_server)
+    typer.echo(result)
+    return result
+
+@app.command()
+def network_dns_reverse_sweep(ip_range: str = typer.Argument(..., help="CIDR or comma-separated IPs"),
+                              dns_server: str = typer.Option("8.8.8.8", "--server", help="DNS server")):
+    """Reverse (PTR) lookups over a scanned range."""
+    from modules import network_skills_wrapper
+    result = network_skills_wrapper.dns_reverse_sweep(ip_range, dns_server)
+    typer.echo(result)
+    return result
+
 @app.command()
 def network_port_scan(ip: str = typer.Argument(..., help="Target IP for port scan"),
                       start_port: int = typer.Option(1, "--start", help="Start port"),
@@ -154,6 +233,19 @@ def network_port_scan(ip: str = typer.Argument(..., help="Target IP for port sca
     typer.echo(result)
     return result
 
+@app.command()
+def network_capture(filter_expr: str = typer.Option("", "--filter", help="tcpdump-style BPF filter"),
+                    duration: float = typer.Option(10.0, "--duration", help="Seconds to capture"),
+                    count: int = typer.Option(0, "--count", help="Stop after N packets (0 = no limit)"),
+                    iface: str = typer.Option("", "--iface", help="Interface (default: all)"),
+                    pcap_path: str = typer.Option("", "--pcap", help="Also write frames to this pcap file"),
+                    top: int = typer.Option(10, "--top", help="Number of top talkers/ports to show")):
+    """Streaming packet capture with top talkers, ports and protocols."""
+    from modules import network_skills_wrapper
+    result = network_skills_wrapper.packet_capture(filter_expr, duration, count, iface, pcap_path, top)
+    typer.echo(result)
+    return result
+
 @app.command()
 def network_interface_info():
     """Show interface info (JSON)."""
@@ -162,6 +254,61 @@ def network_interface_info():
     typer.echo(result)
     return result
 
+@app.command()
+def network_tcp_matrix(
+    path: str = typer.Argument(..., help="CSV/YAML with host, port, expect (open/closed) and optional policy"),
+    concurrency: int = typer.Option(500, help="Maximum connects in flight"),
+    timeout: float = typer.Option(2.0, help="Connect timeout in seconds"),
+    show_all: bool = typer.Option(False, help="List every check, not only deviations"),
+):
+    """Verify a connectivity matrix concurrently and report deviations."""
+    from modules import network_skills_wrapper
+    result = network_skills_wrapper.tcp_matrix(path, concurrency, timeout, show_all)
+    typer.echo(result)
+    return result
+
+@app.command()
+def network_bandwidth_local(
+    host: str = typer.Option("", help="Remote throughput server (empty = bundled loopback server)"),
+    port: int = typer.Option(5201, help="Server port"),
+    streams: int = typer.Option(4, help="Parallel TCP streams"),
+    duration: float = typer.Option(10.0, help="Seconds per direction"),
+    interval: float = typer.Option(1.0, help="Seconds between interval reports"),
+    reverse: bool = typer.Option(False, help="Server sends (download) instead of client"),
+):
+    """Multi-stream TCP throughput test without third-party endpoints."""
+    from modules import network_skills_wrapper
+    result = network_skills_wrapper.bandwidth_local(host, port, streams, duration, interval, reverse, echo=typer.echo)
+    typer.echo(result)
+    return result
+
+@app.command()
+def network_bandwidth_server(
+    host: str = typer.Option("0.0.0.0", help="Address to listen on"),
+    port: int = typer.Option(5201, help="Port to listen on"),
+):
+    """Run the throughput test server until interrupted."""
+    from modules import network_skills_wrapper
+    result = network_skills_wrapper.bandwidth_server(host, port)
+    typer.echo(result)
+    return result
+
+@app.command()
+def network_routes():
+    """Show the route table (JSON)."""
+    from modules import network_skills_wrapper
+    result = network_skills_wrapper.routes()
+    typer.echo(result)
+    return result
+
+@app.command()
+def network_neighbours():
+    """Show the ARP/NDP neighbour table (JSON)."""
+    from modules import network_skills_wrapper
+    result = network_skills_wrapper.neighbours()
+    typer.echo(result)
+    return result
+
 @app.command()
 def network_tcp_test(host: str = typer.Argument(..., help="Host for TCP test"),
                      port: int = typer.Argument(..., help="Port"),
@@ -178,4 +325,9 @@ def launch_webui(ip: str = typer.Option("127.0.0.1", "--ip"),
                  theme: str = typer.Option("Ocean", "--theme")):
     """Start the Gradio Web UI."""
     from modules import webui_launcher
-    typer.echo(webui_launcher.launch(ip, port, theme))
\ No newline at end of file
+    typer.echo(webui_launcher.launch(ip, port, theme))
+
+if __name__ == "__main__":
+    from modules.cli_startup import select_command
+    select_command(app, sys.argv[1:])
+    app()
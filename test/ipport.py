@@ -77,6 +77,15 @@ def autodiscover_network_gradio():
         raise gr.Error("Scapy library is required for auto-discovery. Please install it.")
 
     add_to_log_queue("[INFO] Attempting to discover local network...", "blue")
+    try:
+        from modules import netlink
+        primary = netlink.primary_network(netlink.shared_reader().current())
+    except (ImportError, OSError):
+        primary = None
+    if primary:
+        add_to_log_queue(f"[INFO] Local network on {primary['interface']}: {primary['network']} (gateway {primary['gateway']})", "green")
+        return primary["network"]
+
     try:
         s_temp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         s_temp.settimeout(0.1)
@@ -15,13 +15,21 @@ def ping():
 
 
 @app.command()
-def chat():
+def chat(
+    metrics_port: int = typer.Option(
+        0, "--metrics-port", help="Serve Prometheus metrics at http://127.0.0.1:<port>/metrics (0: off)"
+    ),
+):
     """Start a chat session with the plain assistant using voice input and wake-word."""
     from modules.voice_listener import VoiceListener
+    from modules.metrics import serve_metrics
     # Create session and logging
     session_id = create_session_logger_id()
     logger = setup_logging(session_id)
     logger.info(f"🚀 Starting chat session {session_id}")
+    if metrics_port:
+        serve_metrics(metrics_port)
+        logger.info(f"📈 Metrics at http://127.0.0.1:{metrics_port}/metrics")
 
     # Create assistant, pass interrupt_flag
     listener = None
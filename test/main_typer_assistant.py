@@ -15,6 +15,18 @@ def ping():
     print("pong")
 
 
+@app.command()
+def command_server(
+    typer_file: str = typer.Option(
+        ..., "--typer-file", "-f", help="Path to typer commands file"
+    ),
+):
+    """Keep the typer commands loaded and serve them over a Unix socket"""
+    from modules.command_server import serve
+
+    serve(typer_file)
+
+
 @app.command()
 def awaken(
     typer_file: str = typer.Option(
@@ -32,11 +44,29 @@ def awaken(
         "-m",
         help="Options: ('default', 'execute', 'execute-no-scratch'). Execution mode: default (no exec), execute (exec + scratch), execute-no-scratch (exec only)",
     ),
+    metrics_port: int = typer.Option(
+        0, "--metrics-port", help="Serve Prometheus metrics at http://127.0.0.1:<port>/metrics (0: off)"
+    ),
 ):
     """Run STT interface that processes speech into typer commands"""
     # Remove the list concatenation - pass scratchpad as a single string
     assistant, typer_file, _ = TyperAgent.build_agent(typer_file, [scratchpad])
 
+    if mode != "default":
+        # Warm the resident command server so the first command is fast too.
+        from modules.command_server import ensure_server
+        try:
+            ensure_server(typer_file)
+        except ConnectionError as e:
+            print(f"⚠️ Command server unavailable ({e}); commands will run in a shell.")
+
+    from modules.metrics import SttTimer, serve_metrics
+
+    if metrics_port:
+        serve_metrics(metrics_port)
+        print(f"📈 Metrics at http://127.0.0.1:{metrics_port}/metrics")
+    stt = SttTimer(assistant="typer")
+
     print("🎤 Speak now... (press Ctrl+C to exit)")
 
     recorder = AudioToTextRecorder(
@@ -72,10 +102,12 @@ def awaken(
         # on_recorded_chunk=lambda chunk: print(f"🎤 on_recorded_chunk(): {chunk}"),
         # on_transcription_start=lambda: print("🎤 on_transcription_start()"),
         # on_recording_stop=lambda: print("🎤 on_transcription_stop()"),
+        on_recording_stop=stt.recording_stopped,
         # on_recording_start=lambda: print("🎤 on_recording_start()"),
     )
 
     def process_text(text):
+        stt.transcribed()
         print(f"\n🎤 Heard: {text}")
         try:
             assistant_name = get_config("typer_assistant.assistant_name")
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import queue
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from modules.utils import write_file_atomic
+
+POOL_SIZE = 4
+REFRESH_EVERY = 8
+MAX_ATTEMPTS = 3
+
+Variant = Tuple[str, Optional[bytes]]
+
+
+class AcknowledgementCache:
+    """
+    Pools of pre-generated spoken acknowledgements ("Command generated and
+    executed") with their rendered audio, keyed on the action, the assistant
+    and human names, and the voice.
+
+    `get()` never touches the network: it hands out the pooled variants in
+    rotation and queues background work to fill a short pool or, after
+    every REFRESH_EVERY uses, to replace the oldest variant so phrasings
+    keep changing. On a cold miss the caller generates one phrasing itself
+    and hands it to `add()`, which then fills the rest of the pool.
+
+    `generate(action, assistant_name, human_name)` writes a phrasing (an
+    LLM call) and `render(text)` returns its audio, or None when the local
+    engine speaks it. With `directory`, pools and audio are kept on disk so
+    new sessions start warm.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[str, str, str], str],
+        render: Optional[Callable[[str], Optional[bytes]]] = None,
+        voice: str = "",
+        directory: Optional[str] = None,
+        pool_size: int = POOL_SIZE,
+        refresh_every: int = REFRESH_EVERY,
+        logger=None,
+    ):
+        self.generate = generate
+        self.render = render
+        self.voice = voice
+        self.directory = directory
+        self.pool_size = pool_size
+        self.refresh_every = refresh_every
+        self.logger = logger
+        self._pools: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._queued = set()
+        self._worker: Optional[threading.Thread] = None
+        self._load()
+
+    def key(self, action: str, assistant_name: str, human_name: str) -> str:
+        raw = "\0".join((action.strip().lower(), assistant_name, human_name, self.voice))
+        return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+    def get(self, action: str, assistant_name: str, human_name: str) -> Optional[Variant]:
+        """A pooled (text, audio) for the action, or None on a cold miss (see `add()`)."""
+        key = self.key(action, assistant_name, human_name)
+        with self._lock:
+            pool = self._pools.get(key)
+            variants = pool["variants"] if pool else []
+            if not variants:
+                variant = None
+            else:
+                variant = variants[pool["next"] % len(variants)]
+                pool["next"] += 1
+                pool["uses"] += 1
+            refresh = pool is not None and pool["uses"] >= self.refresh_every
+            if refresh:
+                pool["uses"] = 0
+        if variant is not None and (len(variants) < self.pool_size or refresh):
+            self._schedule(key, action, assistant_name, human_name, replace=refresh)
+        return (variant["text"], self._audio(variant)) if variant else None
+
+    def add(self, action: str, assistant_name: str, human_name: str, text: str, audio: Optional[bytes]):
+        """Keep a response generated on the hot path and fill the rest of its pool in the background."""
+        key = self.key(action, assistant_name, human_name)
+        self._store(key, action, text, audio, replace=False)
+        with self._lock:
+            short = len(self._pools[key]["variants"]) < self.pool_size
+        if short:
+            self._schedule(key, action, assistant_name, human_name)
+
+    def warm(self, actions: Iterable[str], assistant_name: str, human_name: str):
+        """Queue background fills for actions that will be acknowledged soon."""
+        for action in actions:
+            key = self.key(action, assistant_name, human_name)
+            with self._lock:
+                pool = self._pools.get(key)
+                full = pool is not None and len(pool["variants"]) >= self.pool_size
+            if not full:
+                self._schedule(key, action, assistant_name, human_name)
+
+    def wait(self):
+        """Block until queued background work is done."""
+        self._jobs.join()
+
+    # Background work
+
+    def _schedule(self, key: str, action: str, assistant_name: str, human_name: str, replace: bool = False):
+        with self._lock:
+            if key in self._queued:
+                return
+            self._queued.add(key)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, daemon=True, name="acknowledgements")
+                self._worker.start()
+        self._jobs.put((key, action, assistant_name, human_name, replace))
+
+    def _run(self):
+        while True:
+            key, action, assistant_name, human_name, replace = self._jobs.get()
+            try:
+                self._fill(key, action, assistant_name, human_name, replace)
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning(f"⚠️ Could not refresh acknowledgement '{action}': {e}")
+            finally:
+                with self._lock:
+                    self._queued.discard(key)
+                self._jobs.task_done()
+
+    def _fill(self, key: str, action: str, assistant_name: str, human_name: str, replace: bool):
+        with self._lock:
+            pool = self._pools.get(key)
+            have = len(pool["variants"]) if pool else 0
+        wanted = 1 if replace and have >= self.pool_size else self.pool_size - have
+        added = attempts = 0
+        while added < wanted and attempts < wanted * MAX_ATTEMPTS:
+            attempts += 1
+            text = self.generate(action, assistant_name, human_name).strip()
+            if not text or self._has(key, text):
+                continue
+            audio = self.render(text) if self.render else None
+            self._store(key, action, text, audio, replace=replace)
+            added += 1
+
+    def _has(self, key: str, text: str) -> bool:
+        with self._lock:
+            pool = self._pools.get(key)
+            return pool is not None and any(v["text"] == text for v in pool["variants"])
+
+    def _store(self, key: str, action: str, text: str, audio: Optional[bytes], replace: bool):
+        variant = {"text": text, "audio": None, "data": audio}
+        if audio is not None and self.directory:
+            name = f"{key}-{hashlib.sha1(text.encode()).hexdigest()[:10]}.mp3"
+            self._write(name, audio)
+            variant = {"text": text, "audio": name, "data": audio}
+        with self._lock:
+            pool = self._pools.setdefault(key, {"action": action, "variants": [], "next": 0, "uses": 0})
+            if any(v["text"] == text for v in pool["variants"]):
+                return
+            if replace and len(pool["variants"]) >= self.pool_size:
+                old = pool["variants"].pop(0)
+                self._remove(old.get("audio"))
+            pool["variants"].append(variant)
+        self._save_index()
+
+    # Persistence
+
+    def _audio(self, variant: Dict) -> Optional[bytes]:
+        if variant["data"] is None and variant["audio"] and self.directory:
+            try:
+                with open(os.path.join(self.directory, variant["audio"]), "rb") as f:
+                    variant["data"] = f.read()
+            except OSError:
+                variant["audio"] = None
+        return variant["data"]
+
+    def _save_index(self):
+        if not self.directory:
+            return
+        with self._write_lock:
+            with self._lock:
+                index = {
+                    key: {
+                        "action": pool["action"],
+                        "variants": [{"text": v["text"], "audio": v["audio"]} for v in pool["variants"]],
+                    }
+                    for key, pool in self._pools.items()
+                }
+            self._write("index.json", json.dumps(index, indent=2).encode())
+
+    def _load(self):
+        if not self.directory:
+            return
+        try:
+            with open(os.path.join(self.directory, "index.json")) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        for key, pool in index.items():
+            variants = [{"text": v["text"], "audio": v.get("audio"), "data": None} for v in pool.get("variants", [])]
+            self._pools[key] = {"action": pool.get("action", ""), "variants": variants, "next": 0, "uses": 0}
+
+    def _write(self, name: str, data: bytes):
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        write_file_atomic(os.path.join(self.directory, name), data)
+
+    def _remove(self, name: Optional[str]):
+        if name and self.directory:
+            try:
+                os.unlink(os.path.join(self.directory, name))
+            except OSError:
+                pass
@@ -1,38 +1,229 @@
+import copy
 import os
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, Optional, Tuple
+
 import yaml
-from dpath import util as dpath_util
+
+from modules.utils import write_file_atomic
 
 DEFAULT_CONFIG_PATH = "assistant_config.yml"
+CHECK_INTERVAL = 1.0
+VOICES = ("elevenlabs", "local", "realtime-tts")
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class AssistantSettings:
+    """One assistant section (`typer_assistant` or `base_assistant`)."""
+
+    assistant_name: str = "Ada"
+    human_companion_name: str = "Dan"
+    ears: str = "realtime-stt"
+    brain: str = "deepseek-v3"
+    voice: str = "elevenlabs"
+    elevenlabs_voice: str = ""
 
+    @classmethod
+    def from_dict(cls, section: str, data: Optional[Dict], **defaults) -> "AssistantSettings":
+        """
+        Validate a YAML section. Missing or empty values take the defaults.
 
-def get_config(dot_path_key: str, config_path: str = DEFAULT_CONFIG_PATH) -> str:
+        Raises:
+            ValueError: If the section is not a mapping or a value is invalid
+        """
+        if data is None:
+            data = {}
+        if not isinstance(data, dict):
+            raise ValueError(f"Config section '{section}' must be a mapping")
+        values = {}
+        for field in fields(cls):
+            value = data.get(field.name)
+            if value is None or value == "":
+                value = defaults.get(field.name, field.default)
+            elif isinstance(value, (dict, list)):
+                raise ValueError(f"Config value '{section}.{field.name}' must be a scalar")
+            values[field.name] = str(value)
+        if values["voice"] not in VOICES:
+            raise ValueError(f"Invalid voice '{values['voice']}' in '{section}' (use {', '.join(VOICES)})")
+        return cls(**values)
+
+
+class ConfigSnapshot:
+    """
+    One parsed version of the config file. `values` maps every dotted key
+    (sections and leaves) to its value, with section defaults filled in.
+    Snapshots are never modified after construction.
+    """
+
+    def __init__(self, raw: Dict, version: Tuple[int, int, int]):
+        self.raw = raw
+        self.version = version
+        self.typer_assistant = AssistantSettings.from_dict("typer_assistant", raw.get("typer_assistant"))
+        self.base_assistant = AssistantSettings.from_dict("base_assistant", raw.get("base_assistant"), brain="gemini")
+
+        merged = copy.deepcopy(raw)
+        merged["typer_assistant"] = {**(raw.get("typer_assistant") or {}), **asdict(self.typer_assistant)}
+        merged["base_assistant"] = {**(raw.get("base_assistant") or {}), **asdict(self.base_assistant)}
+        self.values: Dict[str, Any] = {}
+        self._flatten(merged, "")
+
+    def _flatten(self, data: Dict, prefix: str):
+        for key, value in data.items():
+            path = f"{prefix}{key}"
+            self.values[path] = value
+            if isinstance(value, dict):
+                self._flatten(value, path + ".")
+
+
+class AssistantConfig:
+    """
+    assistant_config.yml parsed once and validated into typed sections.
+
+    The file is re-stat'ed at most every `check_interval` seconds and
+    reparsed only when its (mtime, size, inode) changes; the new snapshot
+    replaces the old one in a single assignment, so readers always see one
+    complete version. An edit that fails to parse or validate is ignored
+    (and kept in `last_error`) until the file is fixed.
+    """
+
+    def __init__(self, path: str, check_interval: float = CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self.last_error: Optional[Exception] = None
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self.reload()
+
+    def _version(self) -> Tuple[int, int, int]:
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def reload(self) -> ConfigSnapshot:
+        """
+        Reparse the file now.
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+            ValueError: If the first load fails validation
+        """
+        with self._lock:
+            if not os.path.exists(self.path):
+                raise FileNotFoundError(f"Config file not found at {self.path}")
+            version = self._version()
+            try:
+                with open(self.path) as f:
+                    raw = yaml.safe_load(f) or {}
+                if not isinstance(raw, dict):
+                    raise ValueError("Config file must contain a mapping")
+                snapshot = ConfigSnapshot(raw, version)
+            except (yaml.YAMLError, ValueError) as e:
+                self.last_error = e
+                if self._snapshot is None:
+                    raise ValueError(f"Invalid config file {self.path}: {e}") from e
+                # Keep serving the last good version, but don't retry until the file changes again.
+                self._snapshot = ConfigSnapshot(self._snapshot.raw, version)
+                return self._snapshot
+            self.last_error = None
+            self._snapshot = snapshot
+            self._next_check = time.monotonic() + self.check_interval
+            return snapshot
+
+    def snapshot(self) -> ConfigSnapshot:
+        """The current snapshot, reloading first if the file changed."""
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            try:
+                changed = self._version() != self._snapshot.version
+            except FileNotFoundError:
+                changed = False  # mid-replace or deleted; keep the last version
+            if changed:
+                return self.reload()
+        return self._snapshot
+
+    def get(self, dot_path_key: str, default: Any = _MISSING) -> Any:
+        """
+        Value at a dotted key path such as 'typer_assistant.brain'.
+
+        Raises:
+            KeyError: If the key path is not in the config and no default is given
+        """
+        try:
+            return self.snapshot().values[dot_path_key]
+        except KeyError:
+            if default is _MISSING:
+                raise KeyError(f"Key path '{dot_path_key}' not found in config")
+            return default
+
+    @property
+    def typer_assistant(self) -> AssistantSettings:
+        return self.snapshot().typer_assistant
+
+    @property
+    def base_assistant(self) -> AssistantSettings:
+        return self.snapshot().base_assistant
+
+    def as_dict(self) -> Dict:
+        """A copy of the file's contents as written (without defaults)."""
+        return copy.deepcopy(self.snapshot().raw)
+
+    def save(self, data: Dict):
+        """
+        Validate and write `data`, replacing the file atomically, then reload.
+
+        Raises:
+            ValueError: If `data` fails validation (the file is left untouched)
+        """
+        ConfigSnapshot(data, (0, 0, 0))
+        write_file_atomic(self.path, yaml.dump(data, default_flow_style=False))
+        self.reload()
+
+
+_configs: Dict[str, AssistantConfig] = {}
+_configs_lock = threading.Lock()
+
+
+def get_assistant_config(config_path: str = DEFAULT_CONFIG_PATH) -> AssistantConfig:
+    """
+    The process-wide AssistantConfig for `config_path` (relative paths are
+    resolved against the current working directory).
+
+    Raises:
+        FileNotFoundError: If the config file doesn't exist
+    """
+    abs_config_path = os.path.join(os.getcwd(), config_path)
+    config = _configs.get(abs_config_path)
+    if config is None:
+        with _configs_lock:
+            config = _configs.get(abs_config_path)
+            if config is None:
+                config = AssistantConfig(abs_config_path)
+                _configs[abs_config_path] = config
+    return config
+
+
+def get_config(dot_path_key: str, config_path: str = DEFAULT_CONFIG_PATH, default: Any = _MISSING) -> Any:
     """
     Load a field from the YAML config file using dot notation path.
 
     Args:
         dot_path_key: The key path to look up in the config (e.g. 'parent.child.key')
         config_path: Path to the YAML config file, defaults to assistant_config.yml
+        default: Returned when the key path is missing (otherwise KeyError)
 
     Returns:
-        str: The value for the requested key path
+        The value for the requested key path
 
     Raises:
         FileNotFoundError: If config file doesn't exist
-        KeyError: If ke{y path not found in config
+        KeyError: If key path not found in config
     """
-    # Get absolute path from current working directory
-    abs_config_path = os.path.join(os.getcwd(), config_path)
-
-    if not os.path.exists(abs_config_path):
-        raise FileNotFoundError(f"Config file not found at {abs_config_path}")
-
-    with open(abs_config_path) as f:
-        config = yaml.safe_load(f)
-
-    try:
-        return dpath_util.get(config, dot_path_key, separator=".")
-    except KeyError:
-        raise KeyError(f"Key path '{dot_path_key}' not found in config")
+    return get_assistant_config(config_path).get(dot_path_key, default)
 
 
 def get_config_file(config_path: str = DEFAULT_CONFIG_PATH) -> str:
@@ -0,0 +1,266 @@
+import asyncio
+import ipaddress
+import itertools
+import random
+import socket
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import dns.asyncquery
+import dns.exception
+import dns.flags
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.reversename
+
+NEGATIVE_TTL = 60
+
+
+class DNSCache:
+    """
+    In-process DNS answer cache. Entries expire after the smallest TTL in the
+    answer; NXDOMAIN/NODATA answers are cached for the SOA minimum (or
+    NEGATIVE_TTL). Least recently used entries are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str, rdtype: str) -> Optional[Dict]:
+        key = (name.lower().rstrip("."), rdtype.upper())
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        result = dict(entry[1])
+        result["ttl"] = max(0, int(entry[0] - time.monotonic()))
+        result["cached"] = True
+        return result
+
+    def put(self, name: str, rdtype: str, result: Dict, ttl: int):
+        if ttl <= 0:
+            return
+        key = (name.lower().rstrip("."), rdtype.upper())
+        self._entries[key] = (time.monotonic() + ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _PipelineProtocol(asyncio.DatagramProtocol):
+    """One UDP socket carrying many in-flight queries, matched by message id."""
+
+    def __init__(self):
+        self.transport = None
+        self.pending: Dict[int, Tuple[dns.message.Message, asyncio.Future]] = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            response = dns.message.from_wire(data)
+        except dns.exception.DNSException:
+            return
+        entry = self.pending.get(response.id)
+        if entry is None:
+            return
+        query, future = entry
+        if not future.done() and query.is_response(response):
+            future.set_result(response)
+
+    def error_received(self, exc):
+        for _, future in self.pending.values():
+            if not future.done():
+                future.set_exception(exc)
+
+    def connection_lost(self, exc):
+        for _, future in self.pending.values():
+            if not future.done():
+                future.set_exception(exc or ConnectionError("DNS socket closed"))
+
+
+class AsyncResolver:
+    """
+    Bulk asynchronous stub resolver. Queries are pipelined over a small pool
+    of UDP sockets (many outstanding ids per socket) with at most
+    `max_in_flight` queries outstanding. Truncated answers are retried over
+    TCP. Answers go through a shared TTL-respecting DNSCache.
+    """
+
+    def __init__(
+        self,
+        nameservers: Iterable[str] = ("8.8.8.8",),
+        port: int = 53,
+        pool_size: int = 4,
+        max_in_flight: int = 512,
+        timeout: float = 2.0,
+        retries: int = 2,
+        cache: DNSCache = None,
+    ):
+        self.nameservers = list(nameservers)
+        self.port = port
+        self.pool_size = pool_size
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.retries = retries
+        self.cache = cache if cache is not None else DNSCache()
+        self._pool: List[_PipelineProtocol] = []
+        self._next = itertools.count()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def open(self):
+        loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        for i in range(self.pool_size):
+            server = self.nameservers[i % len(self.nameservers)]
+            family = socket.AF_INET6 if ":" in server else socket.AF_INET
+            _, protocol = await loop.create_datagram_endpoint(
+                _PipelineProtocol, remote_addr=(server, self.port), family=family
+            )
+            self._pool.append(protocol)
+        return self
+
+    async def close(self):
+        for protocol in self._pool:
+            if protocol.transport is not None:
+                protocol.transport.close()
+        self._pool = []
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _query(self, query: dns.message.Message) -> dns.message.Message:
+        loop = asyncio.get_running_loop()
+        last_error: Exception = dns.exception.Timeout()
+        for attempt in range(self.retries + 1):
+            protocol = self._pool[next(self._next) % len(self._pool)]
+            while True:
+                query.id = random.randint(0, 0xFFFF)
+                if query.id not in protocol.pending:
+                    break
+            future = loop.create_future()
+            protocol.pending[query.id] = (query, future)
+            try:
+                protocol.transport.sendto(query.to_wire())
+                response = await asyncio.wait_for(future, self.timeout)
+            except (asyncio.TimeoutError, OSError) as e:
+                last_error = e
+                continue
+            finally:
+                protocol.pending.pop(query.id, None)
+            if response.flags & dns.flags.TC:
+                server = protocol.transport.get_extra_info("peername")[0]
+                response = await dns.asyncquery.tcp(query, server, timeout=self.timeout, port=self.port)
+            return response
+        raise last_error
+
+    async def resolve(self, name: str, rdtype: str = "A") -> Dict:
+        """
+        Resolve one name/record type.
+
+        Returns:
+            dict: name, type, records (list of str), ttl, cached, and error if
+            the lookup failed.
+        """
+        rdtype = rdtype.upper()
+        cached = self.cache.get(name, rdtype)
+        if cached is not None:
+            return cached
+
+        result = {"name": name, "type": rdtype, "records": [], "ttl": 0, "cached": False}
+        async with self._semaphore:
+            try:
+                query = dns.message.make_query(name, rdtype)
+                response = await self._query(query)
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+                return result
+
+        rcode = response.rcode()
+        wanted = dns.rdatatype.from_text(rdtype)
+        ttls = []
+        for rrset in response.answer:
+            if rrset.rdtype == wanted:
+                result["records"].extend(str(r) for r in rrset)
+                ttls.append(rrset.ttl)
+        if rcode != dns.rcode.NOERROR:
+            result["error"] = dns.rcode.to_text(rcode)
+        if ttls:
+            result["ttl"] = min(ttls)
+        elif rcode in (dns.rcode.NOERROR, dns.rcode.NXDOMAIN):
+            soa = [rrset for rrset in response.authority if rrset.rdtype == dns.rdatatype.SOA]
+            result["ttl"] = min(soa[0].ttl, soa[0][0].minimum) if soa else NEGATIVE_TTL
+        if rcode in (dns.rcode.NOERROR, dns.rcode.NXDOMAIN):
+            self.cache.put(name, rdtype, dict(result), result["ttl"])
+        return result
+
+    async def resolve_many(self, queries: Iterable[Tuple[str, str]]) -> List[Dict]:
+        """Resolve (name, rdtype) pairs concurrently, preserving input order."""
+        return await asyncio.gather(*(self.resolve(name, rdtype) for name, rdtype in queries))
+
+    async def reverse_sweep(self, addresses: Iterable[str]) -> List[Dict]:
+        """PTR lookups for every address; results carry the `address` they belong to."""
+        addresses = list(addresses)
+        names = [dns.reversename.from_address(a).to_text() for a in addresses]
+        results = await self.resolve_many((n, "PTR") for n in names)
+        for address, result in zip(addresses, results):
+            result["address"] = address
+        return results
+
+
+def expand_targets(spec: str) -> List[str]:
+    """Expand a CIDR, comma-separated list, or mix of both into host addresses."""
+    addresses = []
+    for part in (p.strip() for p in spec.split(",")):
+        if not part:
+            continue
+        if "/" in part:
+            network = ipaddress.ip_network(part, strict=False)
+            hosts = list(network.hosts()) or [network.network_address]
+            addresses.extend(str(h) for h in hosts)
+        else:
+            addresses.append(part)
+    return addresses
+
+
+async def _run(nameservers, port, cache, method, *args):
+    async with AsyncResolver(nameservers, port=port, cache=cache) as resolver:
+        return await getattr(resolver, method)(*args)
+
+
+def bulk_resolve(
+    names: Iterable[str],
+    record_types: Iterable[str] = ("A",),
+    nameservers: Iterable[str] = ("8.8.8.8",),
+    port: int = 53,
+    cache: DNSCache = None,
+) -> List[Dict]:
+    """Synchronously resolve every name for every record type."""
+    queries = [(n, t) for n in names for t in record_types]
+    return asyncio.run(_run(list(nameservers), port, cache, "resolve_many", queries))
+
+
+def reverse_sweep(
+    addresses: Iterable[str],
+    nameservers: Iterable[str] = ("8.8.8.8",),
+    port: int = 53,
+    cache: DNSCache = None,
+) -> List[Dict]:
+    """Synchronously run PTR lookups over `addresses`."""
+    return asyncio.run(_run(list(nameservers), port, cache, "reverse_sweep", list(addresses)))
@@ -1,42 +1,42 @@
-from typing import List, Dict
+from typing import Iterable, Iterator, List, Dict, Optional
 import logging
 import os
-from modules.deepseek import conversational_prompt as deepseek_conversational_prompt
-from modules.ollama import conversational_prompt as ollama_conversational_prompt
-
-# New LLM provider imports, guarded
-try:
-    from modules.gemini import conversational_prompt as gemini_conversational_prompt
-except ImportError:
-    gemini_conversational_prompt = None
-try:
-    from modules.mistral import conversational_prompt as mistral_conversational_prompt
-except ImportError:
-    mistral_conversational_prompt = None
-try:
-    from modules.groq import conversational_prompt as groq_conversational_prompt
-except ImportError:
-    groq_conversational_prompt = None
 from modules.utils import build_file_name_session
 from RealtimeTTS import TextToAudioStream, SystemEngine
 from elevenlabs import play
 from elevenlabs.client import ElevenLabs
 import pyttsx3
 import time
-from modules.assistant_config import get_config
+import threading
+import contextlib
+from modules.assistant_config import get_assistant_config
+from modules.conversation_memory import ConversationMemory
+from modules.router import get_brain
+from modules.metrics import get_metrics, write_session_metrics
+from modules.sentence_chunker import iter_sentences
+from modules.speech_pipeline import SentencePipeline
 
 
 class PlainAssistant:
     def __init__(self, logger: logging.Logger, session_id: str, interrupt_flag=None):
         self.logger = logger
         self.session_id = session_id
-        self.conversation_history = []
 
         # Get voice configuration
-        self.voice_type = get_config("base_assistant.voice")
-        self.elevenlabs_voice = get_config("base_assistant.elevenlabs_voice")
-        self.brain = get_config("base_assistant.brain")
+        self.config = get_assistant_config()
+        self.memory = ConversationMemory(
+            summarize=self._summarize, embed=self._build_embedder(), logger=logger
+        )
+        settings = self.config.base_assistant
+        self.voice_type = settings.voice
+        self.elevenlabs_voice = settings.elevenlabs_voice
+        self.brain = settings.brain
         self.interrupt_flag = interrupt_flag  # For TTS interruption
+        try:
+            # Create the brain's client now so the first reply skips setup
+            get_brain(self.config, "base_assistant", self.logger).warm()
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not initialize {self.brain} provider: {e}")
 
         # Initialize appropriate TTS engine
         self.engine = None
@@ -63,6 +63,7 @@ class PlainAssistant:
             raise ValueError(f"Unsupported voice type: {self.voice_type}")
 
         self._tts_thread = None  # For TTS interruption
+        self.first_audio: Optional[float] = None
 
     def _ensure_local_tts_initialized(self):
         if not hasattr(self, "engine") or self.engine is None:
@@ -72,128 +73,173 @@ class PlainAssistant:
             self.engine.setProperty("rate", 150)
             self.engine.setProperty("volume", 1.0)
 
+    def _build_embedder(self):
+        """Embedding function for memory retrieval, if `base_assistant.memory_embeddings` is set."""
+        spec = self.config.get("base_assistant.memory_embeddings", None)
+        if not spec:
+            return None
+        if not spec.startswith("ollama:"):
+            raise ValueError(f"Unsupported memory_embeddings provider: {spec} (use ollama:<model>)")
+        from modules.ollama import embed
+        model = spec.split(":", 1)[1]
+        return lambda text: embed(text, model=model)
+
+    def _chat(self, messages: List[Dict[str, str]]) -> str:
+        """Send messages to the configured brain"""
+        return get_brain(self.config, "base_assistant", self.logger).chat(messages)
+
+    def _chat_stream(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        """Stream the configured brain's response token by token"""
+        return get_brain(self.config, "base_assistant", self.logger).stream(messages)
+
+    def _summarize(self, prompt: str) -> str:
+        # Runs on the memory's background thread
+        return self._chat([{"role": "user", "content": prompt}])
+
     def process_text(self, text: str) -> str:
         """Process text input and generate response"""
+        start = time.perf_counter()
         try:
             # Check if text matches our last response
-            if (
-                self.conversation_history
-                and text.strip().lower()
-                in self.conversation_history[-1]["content"].lower()
-            ):
+            last = self.memory.last()
+            if last and text.strip().lower() in last["content"].lower():
                 self.logger.info("🤖 Ignoring own speech input")
                 return ""
 
-            # Add user message to conversation history
-            self.conversation_history.append({"role": "user", "content": text})
+            # Add user message to conversation memory
+            self.memory.add("user", text)
 
-            # Generate response using configured brain
+            # Generate response using configured brain (picks up config edits)
+            self.brain = self.config.base_assistant.brain
             self.logger.info(f"🤖 Processing text with {self.brain}...")
-            # Routing based on self.brain
-            if self.brain.startswith("ollama:"):
-                model_no_prefix = ":".join(self.brain.split(":")[1:])
-                response = ollama_conversational_prompt(
-                    self.conversation_history, model=model_no_prefix
-                )
-            elif self.brain.startswith("gemini"):
-                if gemini_conversational_prompt is None:
-                    raise ImportError("Gemini provider not available (missing dependency).")
-                response = gemini_conversational_prompt(self.conversation_history)
-            elif self.brain.startswith("mistral"):
-                if mistral_conversational_prompt is None:
-                    raise ImportError("Mistral provider not available (missing dependency).")
-                response = mistral_conversational_prompt(self.conversation_history)
-            elif self.brain.startswith("groq"):
-                if groq_conversational_prompt is None:
-                    raise ImportError("Groq provider not available (missing dependency).")
-                response = groq_conversational_prompt(self.conversation_history)
-            else:
-                response = deepseek_conversational_prompt(self.conversation_history)
+            # Recent turns verbatim plus a summary of older ones, within a fixed token budget
+            tokens = self._chat_stream(self.memory.messages(query=text))
 
-            # Add assistant response to history
-            self.conversation_history.append({"role": "assistant", "content": response})
+            # Speak sentence by sentence while the rest is still generating
+            speaking = time.perf_counter()
+            response = self.speak_stream(tokens)
+            if self.first_audio is not None:
+                get_metrics().observe(
+                    "request_seconds", speaking - start + self.first_audio, assistant="base"
+                )
 
-            # Speak the response
-            self.speak(response)
+            # Add assistant response to memory
+            self.memory.add("assistant", response)
 
             return response
 
         except Exception as e:
             self.logger.error(f"❌ Error occurred: {str(e)}")
             raise
+        finally:
+            write_session_metrics(self.session_id, self.logger)
 
     def speak(self, text: str):
         """Convert text to speech using configured engine, with interruption support."""
-        self.logger.info(f"🔊 Speaking: {text}")
-        if self.voice_type == "local":
-            self._ensure_local_tts_initialized()
-            def tts_func():
-                try:
-                    self.engine.say(text)
-                    self.engine.runAndWait()
-                except Exception as e:
-                    self.logger.error(f"❌ Local TTS error: {e}")
-            self._tts_thread = threading.Thread(target=tts_func)
-            self._tts_thread.start()
-            # Interruption monitoring
-            while self._tts_thread.is_alive():
-                if self.interrupt_flag and self.interrupt_flag.is_set():
-                    self.logger.info("🔊 TTS interrupted by user speech.")
-                    try:
-                        self.engine.stop()
-                    except Exception:
-                        pass
-                    break
-                time.sleep(0.2)
-            self._tts_thread.join(timeout=0.1)
-        elif self.voice_type == "realtime-tts":
-            def tts_func():
-                try:
-                    self.stream.feed(text)
-                    self.stream.play()
-                except Exception as e:
-                    self.logger.error(f"❌ RealtimeTTS error: {e}")
-            self._tts_thread = threading.Thread(target=tts_func)
-            self._tts_thread.start()
-            while self._tts_thread.is_alive():
-                if self.interrupt_flag and self.interrupt_flag.is_set():
-                    self.logger.info("🔊 RealtimeTTS interrupted by user speech.")
-                    try:
-                        self.stream.stop()
-                    except Exception:
-                        pass
-                    break
-                time.sleep(0.2)
-            self._tts_thread.join(timeout=0.1)
-        elif self.voice_type == "elevenlabs":
-            def tts_func():
-                try:
-                    # Stream in chunks for interruption
-                    audio_stream = self.elevenlabs_client.generate(
-                        text=text,
-                        voice=self.elevenlabs_voice,
-                        model="eleven_turbo_v2",
-                        stream=True,
-                    )
-                    for chunk in audio_stream:
-                        if self.interrupt_flag and self.interrupt_flag.is_set():
-                            self.logger.info("🔊 ElevenLabs TTS interrupted by user speech.")
-                            break
-                        play(chunk)
-                except Exception as e:
-                    self.logger.warning(f"⚠️ ElevenLabs TTS failed ({e}); falling back to local TTS.")
-                    self.voice_type = "local"
-                    self._ensure_local_tts_initialized()
-                    try:
-                        self.engine.say(text)
-                        self.engine.runAndWait()
-                    except Exception as e2:
-                        self.logger.error(f"❌ Local TTS error (fallback): {e2}")
-            self._tts_thread = threading.Thread(target=tts_func)
-            self._tts_thread.start()
-            while self._tts_thread.is_alive():
-                if self.interrupt_flag and self.interrupt_flag.is_set():
-                    break
-                time.sleep(0.2)
-            self._tts_thread.join(timeout=0.1)
+        self.speak_stream([text])
+
+    def speak_stream(self, tokens: Iterable[str]) -> str:
+        """
+        Speak a token stream as it arrives, starting with the first complete
+        sentence. Returns the full text, even if speech was interrupted.
+        """
+        start = time.perf_counter()
+        synthesis = None
+        if self.voice_type == "realtime-tts":
+            text = self._speak_realtime_tts(tokens)
+            first_audio = None
+        else:
+            if self.voice_type == "elevenlabs":
+                pipeline = SentencePipeline(
+                    self._play_audio, self._synthesize_elevenlabs, self.interrupt_flag
+                )
+            else:
+                self._ensure_local_tts_initialized()
+                pipeline = SentencePipeline(self._say_local, None, self.interrupt_flag)
+            with self._stop_on_interrupt(self.engine.stop if self.voice_type == "local" else None):
+                text = pipeline.run(tokens)
+            first_audio = pipeline.first_audio
+            if self.voice_type == "elevenlabs" and first_audio is not None and pipeline.first_sentence is not None:
+                # Only the first sentence's synthesis, not the LLM time before it
+                synthesis = first_audio - pipeline.first_sentence
+        self.first_audio = first_audio
+        if synthesis is not None:
+            get_metrics().observe("tts_first_audio_seconds", synthesis, assistant="base")
+        if first_audio is not None:
+            self.logger.info(f"🔊 First audio after {first_audio:.2f}s, done after {time.perf_counter() - start:.2f}s")
         self.logger.info(f"🔊 Spoken: {text}")
+        return text
+
+    def _synthesize_elevenlabs(self, sentence: str):
+        # Runs on the pipeline worker, one sentence ahead of playback
+        if self.voice_type != "elevenlabs":
+            return sentence
+        try:
+            audio_stream = self.elevenlabs_client.generate(
+                text=sentence,
+                voice=self.elevenlabs_voice,
+                model="eleven_turbo_v2",
+                stream=True,
+            )
+            return b"".join(audio_stream)
+        except Exception as e:
+            self.logger.warning(f"⚠️ ElevenLabs TTS failed ({e}); falling back to local TTS.")
+            self.voice_type = "local"
+            return sentence
+
+    def _play_audio(self, item):
+        # Text means synthesis fell back to the local engine
+        if isinstance(item, str):
+            self._say_local(item)
+        else:
+            play(item)
+
+    def _say_local(self, sentence: str):
+        self._ensure_local_tts_initialized()
+        try:
+            self.engine.say(sentence)
+            self.engine.runAndWait()
+        except Exception as e:
+            self.logger.error(f"❌ Local TTS error: {e}")
+
+    def _speak_realtime_tts(self, tokens: Iterable[str]) -> str:
+        # RealtimeTTS synthesizes fed text incrementally; hand it whole sentences.
+        parts = []
+
+        def collect():
+            for token in tokens:
+                parts.append(token)
+                yield token
+
+        sentences = iter_sentences(collect())
+        self.stream.feed(sentence + " " for sentence in sentences)
+        with self._stop_on_interrupt(self.stream.stop):
+            try:
+                self.stream.play()
+            except Exception as e:
+                self.logger.error(f"❌ RealtimeTTS error: {e}")
+        for _ in sentences:  # interrupted: drain the rest so the reply is complete
+            pass
+        return "".join(parts)
+
+    @contextlib.contextmanager
+    def _stop_on_interrupt(self, stop):
+        """Call `stop` if interrupt_flag is set while the block is speaking."""
+        done = threading.Event()
+        if stop is not None and self.interrupt_flag is not None:
+            def watch():
+                while not done.wait(0.2):
+                    if self.interrupt_flag.is_set():
+                        self.logger.info("🔊 TTS interrupted by user speech.")
+                        try:
+                            stop()
+                        except Exception:
+                            pass
+                        return
+
+            self._tts_thread = threading.Thread(target=watch, daemon=True)
+            self._tts_thread.start()
+        try:
+            yield
+        finally:
+            done.set()
@@ -0,0 +1,102 @@
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+
+def _command_name(command) -> str:
+    if command.name:
+        return command.name
+    return command.callback.__name__.lower().replace("_", "-")
+
+
+def _first_command(argv: List[str]) -> Optional[str]:
+    for arg in argv:
+        if arg in ("--help", "-h"):
+            return None
+        if not arg.startswith("-"):
+            return arg
+    return None
+
+
+def select_command(app, argv: List[str]) -> Optional[str]:
+    """
+    Keep only the command named in `argv` registered on a typer app, so click
+    builds one command instead of the whole CLI. The app needs a callback so
+    typer still treats it as a group. Top-level help and unknown names keep
+    every command, which preserves typer's normal listing and error messages.
+
+    Returns:
+        str: The selected command name, or None if nothing was pruned
+    """
+    name = _first_command(argv)
+    if name is None:
+        return None
+    name = name.replace("_", "-")
+    matches = [c for c in app.registered_commands if _command_name(c) == name]
+    if not matches:
+        return None
+    app.registered_commands = matches
+    return name
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Parse `python -X importtime` output.
+
+    Returns:
+        list: (module, self_us, cumulative_us, depth) in the order imported
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        entries.append((name.strip(), int(parts[0]), int(parts[1]), depth))
+    return entries
+
+
+def import_breakdown(entries: List[Tuple[str, int, int, int]]) -> Dict[str, int]:
+    """Cumulative import time (us) of each top-level import, grouped by root package."""
+    totals: Dict[str, int] = defaultdict(int)
+    for name, _self_us, cumulative_us, depth in entries:
+        if depth == 0:
+            totals[name.split(".")[0]] += cumulative_us
+    return dict(sorted(totals.items(), key=lambda kv: kv[1], reverse=True))
+
+
+def _timed_run(cmd: List[str], cwd: str) -> Tuple[float, subprocess.CompletedProcess]:
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True)
+    return time.perf_counter() - start, proc
+
+
+def profile_startup(script: str, argv: List[str], top: int = 15) -> str:
+    """
+    Profile how long `script` takes to load the command named in `argv`, under
+    `-X importtime`, and report wall time, the bare interpreter baseline, and
+    the slowest top-level imports. The command is loaded with `--help` so its
+    callback never runs; imports done inside the command body are not counted.
+    """
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(script)))
+    name = _first_command(argv)
+    load_argv = [name, "--help"] if name else ["--help"]
+    baseline, _ = _timed_run([sys.executable, "-c", "pass"], cwd)
+    wall, _ = _timed_run([sys.executable, script, *load_argv], cwd)
+    _, traced = _timed_run([sys.executable, "-X", "importtime", script, *load_argv], cwd)
+    breakdown = import_breakdown(parse_importtime(traced.stderr))
+    lines = [
+        f"Startup profile: {' '.join(load_argv)}",
+        f"  wall time:            {wall * 1000:8.1f} ms",
+        f"  interpreter baseline: {baseline * 1000:8.1f} ms",
+        f"  imports (traced):     {sum(breakdown.values()) / 1000:8.1f} ms",
+        "Slowest top-level imports (cumulative):",
+    ]
+    lines += [f"  {name:<32} {us / 1000:8.1f} ms" for name, us in list(breakdown.items())[:top]]
+    return "\n".join(lines)
@@ -0,0 +1,232 @@
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from modules.command_server import parse_invocation
+from modules.utils import write_file_atomic
+
+SIMILARITY_THRESHOLD = 0.9
+MAX_ENTRIES = 500
+NGRAM_DIMENSIONS = 512
+
+FILLER = re.compile(
+    r"\b(?:hey|hi|ok|okay|please|thanks|thank you|could you|can you|would you|will you|"
+    r"i want you to|i'd like you to|go ahead and|for me|now|just|the|a|an|my|our|your)\b"
+)
+# Words that carry no meaning of their own; every other word must match for a fuzzy hit.
+CONNECTIVES = {"at", "on", "in", "to", "of", "from", "with", "by", "it", "is", "me", "us"}
+# Arguments that must match exactly for a fuzzy hit: numbers, IPs, ports, host names, paths.
+ARGUMENT = re.compile(r"[\w./:-]*\d[\w./:-]*|[\w-]+(?:\.[\w-]+)+|/[\w./-]+")
+COMMAND_DEF = re.compile(r"@app\.command\(([^)]*)\)\s*\n\s*def\s+(\w+)")
+COMMAND_NAME = re.compile(r"^\s*[\"']([^\"']+)[\"']|name\s*=\s*[\"']([^\"']+)[\"']")
+
+
+def normalize(text: str, assistant_name: str = "") -> str:
+    """Lower-case request text without the wake word, fillers, articles and punctuation."""
+    text = text.lower()
+    if assistant_name:
+        text = re.sub(rf"\b{re.escape(assistant_name.lower())}\b", " ", text)
+    text = FILLER.sub(" ", text)
+    # Keep dots/colons inside arguments (8.8.8.8, host:port) but drop sentence punctuation.
+    text = re.sub(r"[^\w\s./:-]|(?<!\w)[./:-]|[./:-](?!\w)", " ", text)
+    return " ".join(text.split())
+
+
+def arguments(text: str) -> Set[str]:
+    return set(ARGUMENT.findall(text))
+
+
+def content_words(text: str) -> Set[str]:
+    """Words of a normalized request other than connectives ("at", "to", ...)."""
+    return set(text.split()) - CONNECTIVES
+
+
+def ngram_embedding(text: str, dimensions: int = NGRAM_DIMENSIONS) -> List[float]:
+    """
+    Hashed character-trigram vector: a dependency-free, CPU-only embedding
+    that scores rephrasings ("ping the server" / "ping server") close together.
+    """
+    vector = [0.0] * dimensions
+    padded = f"  {text} "
+    for i in range(len(padded) - 2):
+        bucket = int.from_bytes(hashlib.blake2b(padded[i:i + 3].encode(), digest_size=4).digest(), "little")
+        vector[bucket % dimensions] += 1.0
+    return vector
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def command_names(source: str) -> Set[str]:
+    """CLI names of the `@app.command` functions in a typer file's source."""
+    names = set()
+    for decorator_args, function in COMMAND_DEF.findall(source):
+        explicit = COMMAND_NAME.search(decorator_args)
+        names.add(next(filter(None, explicit.groups())) if explicit else function.replace("_", "-"))
+    return names
+
+
+def validate_command(command: str, typer_file: str, names: Set[str]) -> bool:
+    """True if every `&&`-chained part invokes an existing command of typer_file."""
+    parts = [part.strip() for part in command.split("&&")]
+    for part in parts:
+        argv = parse_invocation(part, typer_file)
+        if not argv or argv[0] not in names:
+            return False
+    return True
+
+
+class CommandCache:
+    """
+    Natural-language request → validated typer command, for repeated requests.
+
+    Entries are keyed on the normalized request text within the hash of the
+    typer file's contents, so editing the file invalidates them. A miss on
+    the exact key falls back to embedding similarity (hashed trigrams by
+    default, or any local `embed(text) -> vector`) above `threshold`, and
+    only when the request has the same content words and literal arguments
+    (IPs, ports, host names) as the cached one, so "start the monitor" never
+    reuses "stop the monitor". With `path`, entries persist as JSON.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        embed: Optional[Callable[[str], Sequence[float]]] = None,
+        threshold: float = SIMILARITY_THRESHOLD,
+        max_entries: int = MAX_ENTRIES,
+    ):
+        self.path = path
+        self.embed = embed or ngram_embedding
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._file_hash = ""
+        self._file_version: Optional[Tuple[int, int]] = None
+        self._names: Set[str] = set()
+        self._entries: Dict[str, Dict] = {}
+        self._load()
+
+    def _typer_state(self, typer_file: str) -> str:
+        st = os.stat(typer_file)
+        version = (st.st_mtime_ns, st.st_size)
+        if version != self._file_version:
+            with open(typer_file, "rb") as f:
+                source = f.read()
+            file_hash = hashlib.sha1(source).hexdigest()
+            with self._lock:
+                if file_hash != self._file_hash:
+                    self._entries = {}  # the commands changed; nothing cached is trustworthy
+                    self._file_hash = file_hash
+                self._names = command_names(source.decode("utf-8", "replace"))
+                self._file_version = version
+        return self._file_hash
+
+    def lookup(self, text: str, typer_file: str, assistant_name: str = "") -> Optional[Tuple[str, float]]:
+        """
+        Cached command for the request as (command, similarity), similarity
+        1.0 for an exact match, or None.
+        """
+        self._typer_state(typer_file)
+        key = normalize(text, assistant_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            candidates = list(self._entries.items()) if entry is None else []
+        if entry is not None:
+            return self._hit(entry, 1.0)
+        if not key or not candidates:
+            self.misses += 1
+            return None
+        try:
+            vector = self.embed(key)
+        except Exception:
+            self.misses += 1
+            return None
+        wanted, words = arguments(key), content_words(key)
+        best, best_score = None, 0.0
+        for candidate_key, candidate in candidates:
+            stored = candidate.get("vector")
+            if stored is None or len(stored) != len(vector) or set(candidate["arguments"]) != wanted:
+                continue
+            if content_words(candidate_key) != words:
+                continue
+            score = _cosine(vector, stored)
+            if score > best_score:
+                best, best_score = candidate, score
+        if best is None or best_score < self.threshold:
+            self.misses += 1
+            return None
+        return self._hit(best, best_score)
+
+    def _hit(self, entry: Dict, score: float) -> Tuple[str, float]:
+        self.hits += 1
+        with self._lock:
+            entry["hits"] = entry.get("hits", 0) + 1
+            entry["used"] = time.time()
+        return entry["command"], score
+
+    def store(self, text: str, typer_file: str, command: str, assistant_name: str = "") -> bool:
+        """Cache a generated command if it validates against the typer file."""
+        file_hash = self._typer_state(typer_file)
+        key = normalize(text, assistant_name)
+        if not key or not validate_command(command, typer_file, self._names):
+            return False
+        try:
+            vector = list(self.embed(key))
+        except Exception:
+            vector = None
+        with self._lock:
+            if file_hash != self._file_hash:
+                return False
+            self._entries[key] = {
+                "request": text,
+                "command": command,
+                "arguments": sorted(arguments(key)),
+                "vector": vector,
+                "hits": 0,
+                "used": time.time(),
+            }
+            if len(self._entries) > self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k]["used"])
+                del self._entries[oldest]
+        self.save()
+        return True
+
+    def invalidate(self, text: str, assistant_name: str = "", command: Optional[str] = None):
+        """
+        Forget the entry for a request (e.g. after its command failed), and with
+        `command` every entry that maps to it, so a failed fuzzy hit is dropped too.
+        """
+        with self._lock:
+            self._entries.pop(normalize(text, assistant_name), None)
+            if command is not None:
+                self._entries = {k: e for k, e in self._entries.items() if e["command"] != command}
+        self.save()
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps({"typer_hash": self._file_hash, "entries": self._entries})
+        write_file_atomic(self.path, data)
+
+    def _load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._file_hash = data.get("typer_hash", "")
+        self._entries = data.get("entries", {})
@@ -0,0 +1,278 @@
+import contextlib
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import shlex
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional, Tuple
+
+SHELL_OPERATORS = ("&&", "||", "|", ";", "&", ">", ">>", "<", "2>", "2>&1")
+SHELL_CHARS = ("`", "$(", "\n")
+PYTHON_NAMES = ("python", "python3")
+START_BACKOFF = 30.0
+MAX_START_BACKOFF = 600.0
+
+# abspath(typer_file) -> (monotonic time to try again, current backoff) after a failed start
+_failed_starts: Dict[str, Tuple[float, float]] = {}
+_failed_lock = threading.Lock()
+
+
+def default_socket_path(typer_file: str) -> str:
+    """Per-user, per-typer-file socket path in the temp directory."""
+    key = hashlib.sha1(os.path.abspath(typer_file).encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"ada-commands-{os.getuid()}-{key}.sock")
+
+
+def parse_invocation(command: str, typer_file: str) -> Optional[List[str]]:
+    """
+    Extract the typer arguments from a generated command line such as
+    `uv run python commands/template.py network-ping 8.8.8.8`.
+
+    Returns:
+        list: argv after the script, or None if the line needs a real shell
+        (chained commands, pipes, redirects, substitutions) or targets a
+        different script.
+    """
+    if any(c in command for c in SHELL_CHARS):
+        return None
+    try:
+        lexer = shlex.shlex(command, posix=True, punctuation_chars=True)
+        lexer.whitespace_split = True
+        tokens = list(lexer)
+    except ValueError:
+        return None
+    if any(t in SHELL_OPERATORS for t in tokens):
+        return None
+    if tokens[:2] == ["uv", "run"]:
+        tokens = tokens[2:]
+    if not tokens or os.path.basename(tokens[0]) not in PYTHON_NAMES or len(tokens) < 2:
+        return None
+    if os.path.realpath(tokens[1]) != os.path.realpath(typer_file):
+        return None
+    return tokens[2:]
+
+
+class _CommandHost:
+    """The typer app loaded from the commands file, rebuilt when the file changes."""
+
+    def __init__(self, typer_file: str):
+        self.typer_file = os.path.abspath(typer_file)
+        self.command = None
+        self.mtime = None
+        self.lock = threading.Lock()
+
+    def _load(self):
+        import typer.main
+        mtime = os.stat(self.typer_file).st_mtime_ns
+        if mtime == self.mtime:
+            return
+        spec = importlib.util.spec_from_file_location("ada_typer_commands", self.typer_file)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        self.command = typer.main.get_command(module.app)
+        self.mtime = mtime
+
+    def run(self, argv: List[str], cwd: Optional[str] = None):
+        """Invoke the command in-process, capturing what it prints."""
+        import typer
+
+        with self.lock:
+            out = io.StringIO()
+            code = 0
+            previous = os.getcwd()
+            try:
+                if cwd:
+                    os.chdir(cwd)
+                self._load()
+                with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+                    try:
+                        self.command.main(args=argv, prog_name=os.path.basename(self.typer_file),
+                                          standalone_mode=False)
+                    except typer.Exit as e:
+                        code = e.exit_code
+                    except typer.Abort:
+                        out.write("Aborted!\n")
+                        code = 1
+                    except SystemExit as e:
+                        code = e.code if isinstance(e.code, int) else 1
+                    except Exception as e:
+                        if hasattr(e, "show") and hasattr(e, "exit_code"):  # click usage errors
+                            e.show(file=out)
+                            code = e.exit_code
+                        else:
+                            traceback.print_exc(file=out)
+                            code = 1
+            finally:
+                os.chdir(previous)
+            return out.getvalue(), code
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            output, code = self.server.host.run(request["argv"], request.get("cwd"))
+            response = {"output": output, "exit_code": code}
+        except Exception as e:
+            response = {"output": f"Command server error: {e}\n", "exit_code": 1}
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class CommandServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Resident server that keeps the typer commands file imported (with its
+    modules and skill singletons warm) and runs invocations sent over a Unix
+    socket in-process, one at a time.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, typer_file: str, socket_path: Optional[str] = None):
+        self.socket_path = socket_path or default_socket_path(typer_file)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.host = _CommandHost(typer_file)
+        self.host._load()
+        super().__init__(self.socket_path, _Handler)
+        os.chmod(self.socket_path, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.socket_path)
+
+
+def request(argv: List[str], socket_path: str, timeout: Optional[float] = None) -> Tuple[str, int]:
+    """
+    Run argv on a running CommandServer.
+
+    Returns:
+        tuple: (output, exit_code)
+
+    Raises:
+        ConnectionError: If no server is listening on socket_path
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise ConnectionError(f"No command server at {socket_path}") from e
+        sock.sendall(json.dumps({"argv": argv, "cwd": os.getcwd()}).encode() + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError("Command server closed the connection.")
+    response = json.loads(line)
+    return response["output"], response.get("exit_code", 0)
+
+
+def send(argv: List[str], socket_path: str, timeout: Optional[float] = None) -> str:
+    """Run argv on a running CommandServer and return what it printed."""
+    return request(argv, socket_path, timeout)[0]
+
+
+def start_daemon(typer_file: str, socket_path: Optional[str] = None, wait: float = 10.0) -> str:
+    """Spawn a detached command server for typer_file and wait for its socket."""
+    socket_path = socket_path or default_socket_path(typer_file)
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(socket_path)  # stale socket from a server that is gone
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "modules.command_server", os.path.abspath(typer_file), socket_path],
+        cwd=root, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if os.path.exists(socket_path):
+            _start_succeeded(typer_file)
+            return socket_path
+        if proc.poll() is not None:
+            _start_failed(typer_file)
+            raise ConnectionError(f"Command server exited with status {proc.returncode} on startup")
+        time.sleep(0.05)
+    _start_failed(typer_file)
+    raise ConnectionError(f"Command server did not start within {wait}s")
+
+
+def _start_failed(typer_file: str):
+    key = os.path.abspath(typer_file)
+    with _failed_lock:
+        _, backoff = _failed_starts.get(key, (0.0, START_BACKOFF / 2))
+        backoff = min(backoff * 2, MAX_START_BACKOFF)
+        _failed_starts[key] = (time.monotonic() + backoff, backoff)
+
+
+def _start_succeeded(typer_file: str):
+    with _failed_lock:
+        _failed_starts.pop(os.path.abspath(typer_file), None)
+
+
+def start_backed_off(typer_file: str) -> bool:
+    """True while a recent failed start of typer_file's server means not trying again yet."""
+    with _failed_lock:
+        entry = _failed_starts.get(os.path.abspath(typer_file))
+    return entry is not None and time.monotonic() < entry[0]
+
+
+def ensure_server(typer_file: str, socket_path: Optional[str] = None) -> str:
+    """Start a command server for typer_file unless one is already answering."""
+    socket_path = socket_path or default_socket_path(typer_file)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+            return socket_path
+        except OSError:
+            pass
+    return start_daemon(typer_file, socket_path)
+
+
+def run_command(command: str, typer_file: str, socket_path: Optional[str] = None,
+                autostart: bool = True) -> Optional[Tuple[str, int]]:
+    """
+    Execute a generated command line on the resident server, starting one if
+    needed. Returns (output, exit_code), or None when the line must go
+    through a shell instead. After a failed start no server is started
+    again for that typer file until its backoff (START_BACKOFF, doubling
+    up to MAX_START_BACKOFF) has passed.
+    """
+    argv = parse_invocation(command, typer_file)
+    if argv is None:
+        return None
+    socket_path = socket_path or default_socket_path(typer_file)
+    try:
+        return request(argv, socket_path)
+    except ConnectionError:
+        if not autostart or start_backed_off(typer_file):
+            return None
+    try:
+        start_daemon(typer_file, socket_path)
+        return request(argv, socket_path)
+    except ConnectionError:
+        return None
+
+
+def serve(typer_file: str, socket_path: Optional[str] = None):
+    """Run a command server in the foreground until interrupted."""
+    server = CommandServer(typer_file, socket_path)
+    print(f"Command server for {typer_file} listening on {server.socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
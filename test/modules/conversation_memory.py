@@ -0,0 +1,221 @@
+import math
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+TOKEN_BUDGET = 2000
+RECENT_BUDGET = 1200
+SUMMARY_BUDGET = 300
+RETRIEVE_K = 2
+RETRIEVE_MIN_SCORE = 0.3
+MAX_ARCHIVE = 5000
+MESSAGE_OVERHEAD = 4
+
+SUMMARY_PROMPT = """Update the running summary of a conversation between a user and an assistant.
+Keep names, facts, preferences, decisions and open questions; drop small talk.
+Reply with the updated summary only, in at most {words} words.
+
+<current-summary>
+{summary}
+</current-summary>
+
+<new-messages>
+{messages}
+</new-messages>"""
+
+Message = Dict[str, str]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgeting."""
+    return (len(text) + 3) // 4
+
+
+def message_tokens(message: Message) -> int:
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _format(messages: Sequence[Message]) -> str:
+    return "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+
+
+class ConversationMemory:
+    """
+    Conversation history kept within a token budget.
+
+    Recent messages are kept verbatim up to `recent_budget` tokens. Older
+    messages are folded into a rolling summary by `summarize(prompt) -> str`
+    on a background thread, so a turn never waits for it; until a fold is
+    summarized its messages stay available verbatim as far as the budget
+    allows. With `embed(text) -> vector`, folded messages are also archived
+    and the `retrieve_k` most similar to the new request are brought back.
+
+    `messages(query)` returns what to send to the provider: the summary and
+    any retrieved messages as system messages, then the recent messages,
+    within `token_budget` tokens however long the session runs (the latest
+    exchange is always kept whole, even if it alone is larger).
+    """
+
+    def __init__(
+        self,
+        summarize: Optional[Callable[[str], str]] = None,
+        embed: Optional[Callable[[str], Sequence[float]]] = None,
+        token_budget: int = TOKEN_BUDGET,
+        recent_budget: int = RECENT_BUDGET,
+        summary_budget: int = SUMMARY_BUDGET,
+        retrieve_k: int = RETRIEVE_K,
+        logger=None,
+    ):
+        if recent_budget + summary_budget > token_budget:
+            raise ValueError("recent_budget + summary_budget must fit within token_budget")
+        self.summarize = summarize
+        self.embed = embed
+        self.token_budget = token_budget
+        self.recent_budget = recent_budget
+        self.summary_budget = summary_budget
+        self.retrieve_k = retrieve_k
+        self.logger = logger
+
+        self.summary = ""
+        self.recent: Deque[Message] = deque()
+        self._recent_tokens = 0
+        self._pending: List[Message] = []
+        self._archive: Deque[Tuple[Message, Sequence[float]]] = deque(maxlen=MAX_ARCHIVE)
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self.recent)
+
+    def add(self, role: str, content: str):
+        """Append a message, folding the oldest ones out once recent_budget is exceeded."""
+        message = {"role": role, "content": content}
+        with self._lock:
+            self.recent.append(message)
+            self._recent_tokens += message_tokens(message)
+            while self._recent_tokens > self.recent_budget and len(self.recent) > 2:
+                old = self.recent.popleft()
+                self._recent_tokens -= message_tokens(old)
+                self._pending.append(old)
+            if self._pending and self._worker is None:
+                self._worker = threading.Thread(target=self._fold_pending, daemon=True)
+                self._worker.start()
+
+    def last(self) -> Optional[Message]:
+        return self.recent[-1] if self.recent else None
+
+    def clear(self):
+        self.wait()
+        with self._lock:
+            self.summary = ""
+            self.recent.clear()
+            self._recent_tokens = 0
+            self._pending.clear()
+            self._archive.clear()
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block until background summarization has caught up."""
+        worker = self._worker
+        if worker is not None and worker is not threading.current_thread():
+            worker.join(timeout)
+
+    def _fold_pending(self):
+        while True:
+            with self._lock:
+                batch = list(self._pending)
+                summary = self.summary
+                if not batch:
+                    self._worker = None
+                    return
+            summary = self._summarize(summary, batch)
+            vectors = self._embed_all(batch)
+            with self._lock:
+                self.summary = summary
+                del self._pending[:len(batch)]
+                for message, vector in zip(batch, vectors):
+                    if vector is not None:
+                        self._archive.append((message, vector))
+
+    def _summarize(self, summary: str, batch: List[Message]) -> str:
+        if self.summarize is not None:
+            prompt = SUMMARY_PROMPT.format(
+                words=self.summary_budget * 3 // 4, summary=summary or "(none)", messages=_format(batch)
+            )
+            try:
+                return self._clip(self.summarize(prompt).strip())
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning(f"⚠️ Conversation summary failed ({e}); keeping an extract instead.")
+        # No summarizer (or it failed): keep the newest text that fits.
+        return self._clip("\n".join(filter(None, [summary, _format(batch)])), keep_tail=True)
+
+    def _clip(self, text: str, keep_tail: bool = False) -> str:
+        limit = self.summary_budget * 4
+        if len(text) <= limit:
+            return text
+        return text[-limit:] if keep_tail else text[:limit]
+
+    def _embed_all(self, batch: List[Message]) -> List[Optional[Sequence[float]]]:
+        if self.embed is None:
+            return [None] * len(batch)
+        vectors = []
+        for message in batch:
+            try:
+                vectors.append(self.embed(message["content"]))
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning(f"⚠️ Embedding failed ({e}); message not archived.")
+                vectors.append(None)
+        return vectors
+
+    def retrieve(self, query: str, k: Optional[int] = None) -> List[Message]:
+        """Archived messages most similar to `query` (oldest first)."""
+        k = self.retrieve_k if k is None else k
+        with self._lock:
+            archive = list(self._archive)
+        if self.embed is None or not archive or k <= 0:
+            return []
+        try:
+            target = self.embed(query)
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f"⚠️ Embedding failed ({e}); skipping retrieval.")
+            return []
+        scored = [(_cosine(target, vector), i) for i, (_, vector) in enumerate(archive)]
+        best = sorted(i for score, i in sorted(scored, reverse=True)[:k] if score >= RETRIEVE_MIN_SCORE)
+        return [archive[i][0] for i in best]
+
+    def messages(self, query: Optional[str] = None) -> List[Message]:
+        """Provider-ready messages for the next turn, within token_budget."""
+        with self._lock:
+            summary = self.summary
+            pending = list(self._pending)
+            recent = list(self.recent)
+            used = self._recent_tokens
+        head: List[Message] = []
+        if summary:
+            head.append({"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"})
+            used += message_tokens(head[0])
+
+        extra: List[Message] = []
+        retrieved = self.retrieve(query) if query else []
+        if retrieved:
+            context = {"role": "system", "content": f"Relevant earlier messages:\n{_format(retrieved)}"}
+            if used + message_tokens(context) <= self.token_budget:
+                extra.append(context)
+                used += message_tokens(context)
+        # Messages still being summarized, newest first, as far as they fit.
+        unsummarized: List[Message] = []
+        for message in reversed(pending):
+            cost = message_tokens(message)
+            if used + cost > self.token_budget:
+                break
+            unsummarized.insert(0, message)
+            used += cost
+        return head + extra + unsummarized + recent
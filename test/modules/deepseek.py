@@ -2,15 +2,26 @@ from openai import OpenAI
 import os
 import json
 from dotenv import load_dotenv
-from typing import List, Dict
+from typing import List, Dict, Iterator
+
+from modules.http_client import get_httpx_client
 
 # Load environment variables
 load_dotenv()
 
-# Initialize DeepSeek client
-client = OpenAI(
-    api_key=os.getenv("DEEPSEEK_API_KEY"), base_url="https://api.deepseek.com/beta"
-)
+_client = None
+
+
+def _get_client() -> OpenAI:
+    """The DeepSeek client, created on first use and reused for every call."""
+    global _client
+    if _client is None:
+        _client = OpenAI(
+            api_key=os.getenv("DEEPSEEK_API_KEY"),
+            base_url="https://api.deepseek.com/beta",
+            http_client=get_httpx_client(),
+        )
+    return _client
 
 DEEPSEEK_V3_MODEL = "deepseek-chat"
 
@@ -19,7 +30,7 @@ def prompt(prompt: str, model: str = DEEPSEEK_V3_MODEL) -> str:
     """
     Send a prompt to DeepSeek and get detailed benchmarking response.
     """
-    response = client.chat.completions.create(
+    response = _get_client().chat.completions.create(
         model=model, messages=[{"role": "user", "content": prompt}], stream=False
     )
     return response.choices[0].message.content
@@ -37,7 +48,7 @@ def fill_in_the_middle_prompt(
         prompt="def fib(a):",
         suffix="    return fib(a-1) + fib(a-2)",
     """
-    response = client.completions.create(model=model, prompt=prompt, suffix=suffix)
+    response = _get_client().completions.create(model=model, prompt=prompt, suffix=suffix)
     return prompt + response.choices[0].text + suffix
 
 
@@ -55,7 +66,7 @@ def json_prompt(prompt: str, model: str = DEEPSEEK_V3_MODEL) -> dict:
     """
     messages = [{"role": "user", "content": prompt}]
 
-    response = client.chat.completions.create(
+    response = _get_client().chat.completions.create(
         model=model, messages=messages, response_format={"type": "json_object"}
     )
     return json.loads(response.choices[0].message.content)
@@ -80,7 +91,7 @@ def prefix_prompt(
         {"role": "assistant", "content": prefix, "prefix": True},
     ]
 
-    response = client.chat.completions.create(model=model, messages=messages)
+    response = _get_client().chat.completions.create(model=model, messages=messages)
     if no_prefix:
         return response.choices[0].message.content
     else:
@@ -106,7 +117,7 @@ def prefix_then_stop_prompt(
         {"role": "user", "content": prompt},
         {"role": "assistant", "content": prefix, "prefix": True},
     ]
-    response = client.chat.completions.create(
+    response = _get_client().chat.completions.create(
         model=model, messages=messages, stop=[suffix]
     )
     return response.choices[0].message.content
@@ -133,9 +144,39 @@ def conversational_prompt(
             {"role": "system", "content": system_prompt},
             *messages,
         ]
-        response = client.chat.completions.create(
+        response = _get_client().chat.completions.create(
             model=model, messages=messages, stream=False
         )
         return response.choices[0].message.content
     except Exception as e:
         raise Exception(f"Error in conversational prompt: {str(e)}")
+
+
+def stream_conversational_prompt(
+    messages: List[Dict[str, str]],
+    system_prompt: str = "You are a helpful conversational assistant. Respond in a short, concise, friendly manner.",
+    model: str = DEEPSEEK_V3_MODEL,
+) -> Iterator[str]:
+    """
+    Stream a conversational response from DeepSeek token by token.
+
+    Args:
+        messages: List of message dicts with 'role' and 'content' keys
+        model: The model to use, defaults to deepseek-chat
+
+    Yields:
+        str: Text deltas as they arrive
+    """
+    try:
+        messages = [
+            {"role": "system", "content": system_prompt},
+            *messages,
+        ]
+        stream = _get_client().chat.completions.create(
+            model=model, messages=messages, stream=True
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    except Exception as e:
+        raise Exception(f"Error in conversational prompt: {str(e)}")
@@ -1,5 +1,6 @@
 import subprocess
 import shlex
+from typing import Tuple
 
 
 def execute_uv_python(command: str, file_path: str) -> str:
@@ -11,6 +12,10 @@ def execute_uv_python(command: str, file_path: str) -> str:
 
 def execute(command: str) -> str:
     """Execute shell code and return the output as a string."""
+    return _run_shell(command)[0]
+
+
+def _run_shell(command: str) -> Tuple[str, int]:
     try:
         # Use shell=True to properly handle shell operators like &&
         result = subprocess.run(
@@ -19,6 +24,33 @@ def execute(command: str) -> str:
             capture_output=True,
             text=True,
         )
-        return result.stdout + result.stderr
+        return result.stdout + result.stderr, result.returncode
     except subprocess.SubprocessError as e:
-        return str(e)
+        return str(e), 1
+
+
+class CommandFailed(Exception):
+    """A generated typer command exited non-zero; `output` is what it printed."""
+
+    def __init__(self, output: str, exit_code: int):
+        super().__init__(f"Command exited with status {exit_code}")
+        self.output = output
+        self.exit_code = exit_code
+
+
+def execute_typer_command(command: str, typer_file: str) -> str:
+    """
+    Execute a generated typer command on the resident command server
+    (in-process, warm imports), falling back to a shell for chained commands
+    or when the server cannot be reached.
+
+    Raises:
+        CommandFailed: If the command exits with a non-zero status
+    """
+    from modules.command_server import run_command
+
+    result = run_command(command, typer_file)
+    output, exit_code = result if result is not None else _run_shell(command)
+    if exit_code:
+        raise CommandFailed(output, exit_code)
+    return output
@@ -1,18 +1,39 @@
 import os
 
-def conversational_prompt(messages, system_prompt="You are a helpful assistant.", model="gemini-1.0-pro-latest"):
-    try:
-        import google.generativeai as genai
-    except ImportError:
-        raise ImportError("google-generativeai is not installed. Please install it to use Gemini.")
-    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+GEMINI_MODEL = "gemini-1.0-pro-latest"
+
+_models = {}
+
+def _get_model(model):
+    # genai keeps its own transport; configure once and reuse model objects so
+    # the underlying channel stays open between calls.
+    if model not in _models:
+        try:
+            import google.generativeai as genai
+        except ImportError:
+            raise ImportError("google-generativeai is not installed. Please install it to use Gemini.")
+        if not _models:
+            genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+        _models[model] = genai.GenerativeModel(model)
+    return _models[model]
+
+def conversational_prompt(messages, system_prompt="You are a helpful assistant.", model=GEMINI_MODEL):
+    model_obj = _get_model(model)
     joined = "\n".join([f"{m['role']}: {m['content']}" for m in messages])
     full_prompt = f"{system_prompt}\n{joined}"
-    model_obj = genai.GenerativeModel(model)
     resp = model_obj.generate_content(full_prompt)
     return resp.text
 
-def prefix_prompt(prompt, prefix="", model="gemini-1.0-pro-latest"):
+def stream_conversational_prompt(messages, system_prompt="You are a helpful assistant.", model=GEMINI_MODEL):
+    # Yields text chunks as they arrive
+    model_obj = _get_model(model)
+    joined = "\n".join([f"{m['role']}: {m['content']}" for m in messages])
+    full_prompt = f"{system_prompt}\n{joined}"
+    for chunk in model_obj.generate_content(full_prompt, stream=True):
+        if chunk.text:
+            yield chunk.text
+
+def prefix_prompt(prompt, prefix="", model=GEMINI_MODEL):
     # Trivial: prepend prefix and ask model to complete
     system_prompt = f"You must always begin your response with the following prefix: '{prefix}'.\n" if prefix else ""
     return conversational_prompt([{"role":"user","content":prompt}], system_prompt=system_prompt, model=model)
\ No newline at end of file
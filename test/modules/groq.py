@@ -1,15 +1,32 @@
 import os
 
+_client = None
+
+def _get_client():
+    global _client
+    if _client is None:
+        try:
+            from groq import Groq
+        except ImportError:
+            raise ImportError("groq python package is required for Groq Cloud.")
+        from modules.http_client import get_httpx_client
+        _client = Groq(api_key=os.getenv("GROQ_API_KEY"), http_client=get_httpx_client())
+    return _client
+
 def conversational_prompt(messages, system_prompt="You are a helpful assistant.", model="llama3-70b-8192"):
-    try:
-        from groq import Groq
-    except ImportError:
-        raise ImportError("groq python package is required for Groq Cloud.")
-    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+    client = _get_client()
     chat_messages = [{"role":"system","content":system_prompt}] + messages
     resp = client.chat.completions.create(model=model, messages=chat_messages)
     return resp.choices[0].message.content
 
+def stream_conversational_prompt(messages, system_prompt="You are a helpful assistant.", model="llama3-70b-8192"):
+    # Yields text deltas as they arrive
+    client = _get_client()
+    chat_messages = [{"role":"system","content":system_prompt}] + messages
+    for chunk in client.chat.completions.create(model=model, messages=chat_messages, stream=True):
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
 def prefix_prompt(prompt, prefix="", model="llama3-70b-8192"):
     # Trivial: just prepend prefix to user prompt and call as normal
     system_prompt = f"You must always begin your response with the following prefix: '{prefix}'.\n" if prefix else ""
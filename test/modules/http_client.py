@@ -0,0 +1,180 @@
+import importlib.util
+import ipaddress
+import os
+import socket
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+POOL_HOSTS = 32
+PER_HOST_CONNECTIONS = 10
+MAX_CONNECTIONS = 100
+DNS_TTL = 300.0
+DEFAULT_TIMEOUT = 15
+LLM_TIMEOUT = 120.0
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_httpx_client = None
+_dns_cache: Optional["AddrInfoCache"] = None
+
+
+class AddrInfoCache:
+    """
+    TTL cache in front of socket.getaddrinfo. Successful lookups for host
+    names are reused for `ttl` seconds so new pooled connections skip the
+    resolver; IP literals and failures are never cached.
+    """
+
+    def __init__(self, resolver: Callable = socket.getaddrinfo, ttl: float = DNS_TTL, max_entries: int = 1024):
+        self.resolver = resolver
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple, Tuple[float, list]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, host, port, family=0, type=0, proto=0, flags=0):
+        if not host or _is_ip(host):
+            return self.resolver(host, port, family, type, proto, flags)
+        key = (host, port, family, type, proto, flags)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return list(entry[1])
+        self.misses += 1
+        result = self.resolver(host, port, family, type, proto, flags)
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+        self._entries[key] = (time.monotonic() + self.ttl, list(result))
+        return result
+
+    def clear(self):
+        self._entries.clear()
+
+
+def _is_ip(host) -> bool:
+    try:
+        ipaddress.ip_address(host.decode() if isinstance(host, bytes) else host)
+        return True
+    except ValueError:
+        return False
+
+
+def install_dns_cache(ttl: float = DNS_TTL) -> AddrInfoCache:
+    """
+    Route socket.getaddrinfo through a process-wide AddrInfoCache (idempotent).
+    This affects every lookup in the process, so it is opt-in: call it
+    explicitly, or set HTTP_DNS_CACHE_TTL (seconds) to have the pooled clients
+    install it on first use.
+    """
+    global _dns_cache
+    with _lock:
+        if _dns_cache is None:
+            _dns_cache = AddrInfoCache(socket.getaddrinfo, ttl)
+            socket.getaddrinfo = _dns_cache
+        return _dns_cache
+
+
+def uninstall_dns_cache():
+    """Restore the original socket.getaddrinfo."""
+    global _dns_cache
+    with _lock:
+        if _dns_cache is not None:
+            if socket.getaddrinfo is _dns_cache:
+                socket.getaddrinfo = _dns_cache.resolver
+            _dns_cache = None
+
+
+def _dns_cache_from_env():
+    ttl = float(os.getenv("HTTP_DNS_CACHE_TTL") or 0)
+    if ttl > 0:
+        install_dns_cache(ttl)
+
+
+class _TimeoutSession(requests.Session):
+    """requests.Session that applies DEFAULT_TIMEOUT when a call gives none."""
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+
+def get_session() -> requests.Session:
+    """
+    The shared keep-alive requests session. Connections are pooled for up to
+    POOL_HOSTS hosts with at most PER_HOST_CONNECTIONS each; connect errors
+    are retried twice.
+    """
+    global _session
+    if _session is None:
+        _dns_cache_from_env()
+        with _lock:
+            if _session is None:
+                session = _TimeoutSession()
+                adapter = HTTPAdapter(
+                    pool_connections=POOL_HOSTS,
+                    pool_maxsize=PER_HOST_CONNECTIONS,
+                    pool_block=True,
+                    max_retries=Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.1),
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def get_httpx_client():
+    """
+    The shared httpx.Client for SDKs that accept one (OpenAI-compatible, Groq).
+    Negotiates HTTP/2 when the `h2` package is installed.
+
+    Raises:
+        ImportError: If httpx is not installed
+    """
+    global _httpx_client
+    if _httpx_client is None:
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("httpx is required for pooled LLM provider clients.")
+        _dns_cache_from_env()
+        with _lock:
+            if _httpx_client is None:
+                _httpx_client = httpx.Client(
+                    http2=HTTP2_AVAILABLE,
+                    limits=httpx.Limits(
+                        max_connections=MAX_CONNECTIONS,
+                        max_keepalive_connections=PER_HOST_CONNECTIONS * 2,
+                        keepalive_expiry=60.0,
+                    ),
+                    timeout=httpx.Timeout(LLM_TIMEOUT, connect=10.0),
+                    follow_redirects=True,
+                )
+    return _httpx_client
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return get_session().get(url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return get_session().post(url, **kwargs)
+
+
+def close():
+    """Close pooled connections (an installed DNS cache stays installed)."""
+    global _session, _httpx_client
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+        if _httpx_client is not None:
+            _httpx_client.close()
+            _httpx_client = None
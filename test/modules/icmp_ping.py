@@ -0,0 +1,259 @@
+import asyncio
+import itertools
+import os
+import socket
+import struct
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+ICMP6_ECHO_REQUEST = 128
+ICMP6_ECHO_REPLY = 129
+
+
+def _checksum(data: bytes) -> int:
+    """Internet checksum (RFC 1071) over `data`."""
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def build_echo_request(ident: int, seq: int, payload: bytes, ipv6: bool = False) -> bytes:
+    """Build an ICMP (or ICMPv6) echo request packet."""
+    icmp_type = ICMP6_ECHO_REQUEST if ipv6 else ICMP_ECHO_REQUEST
+    header = struct.pack("!BBHHH", icmp_type, 0, 0, ident, seq)
+    if ipv6:
+        # The kernel fills in the ICMPv6 checksum (it covers the pseudo-header).
+        return header + payload
+    csum = _checksum(header + payload)
+    return struct.pack("!BBHHH", icmp_type, 0, csum, ident, seq) + payload
+
+
+def parse_echo_reply(packet: bytes, raw: bool, ipv6: bool = False) -> Optional[Tuple[int, int]]:
+    """
+    Parse an echo reply and return (identifier, sequence), or None if the
+    packet is not an echo reply.
+
+    Args:
+        packet: Bytes read from the socket
+        raw: True if read from a SOCK_RAW IPv4 socket (IP header included)
+        ipv6: True for ICMPv6 packets
+    """
+    if raw and not ipv6:
+        if len(packet) < 20:
+            return None
+        packet = packet[(packet[0] & 0x0F) * 4:]
+    if len(packet) < 8:
+        return None
+    icmp_type, _code, _csum, ident, seq = struct.unpack("!BBHHH", packet[:8])
+    if icmp_type != (ICMP6_ECHO_REPLY if ipv6 else ICMP_ECHO_REPLY):
+        return None
+    return ident, seq
+
+
+def open_icmp_socket(family: int = socket.AF_INET) -> Tuple[socket.socket, bool]:
+    """
+    Open a non-blocking ICMP socket, preferring the unprivileged datagram
+    ("ping") socket and falling back to a raw socket.
+
+    Returns:
+        tuple: (socket, is_raw)
+
+    Raises:
+        PermissionError: If neither socket type is permitted
+    """
+    proto = socket.IPPROTO_ICMPV6 if family == socket.AF_INET6 else socket.IPPROTO_ICMP
+    for sock_type, is_raw in ((socket.SOCK_DGRAM, False), (socket.SOCK_RAW, True)):
+        try:
+            sock = socket.socket(family, sock_type, proto)
+        except (PermissionError, OSError):
+            continue
+        sock.setblocking(False)
+        return sock, is_raw
+    raise PermissionError(
+        "ICMP sockets are not permitted. Allow unprivileged ping sockets "
+        "(sysctl net.ipv4.ping_group_range) or run as root."
+    )
+
+
+def summarize(target: str, address: Optional[str], sent: int, rtts: List[float], error: str = "") -> Dict:
+    """Build the structured statistics dict for one target (RTTs in ms)."""
+    received = len(rtts)
+    stats = {
+        "target": target,
+        "address": address,
+        "sent": sent,
+        "received": received,
+        "loss_pct": round(100.0 * (sent - received) / sent, 2) if sent else 100.0,
+        "rtt_min": None,
+        "rtt_avg": None,
+        "rtt_max": None,
+        "rtt_mdev": None,
+        "rtts": [round(r, 3) for r in rtts],
+    }
+    if rtts:
+        avg = sum(rtts) / received
+        stats.update(
+            rtt_min=round(min(rtts), 3),
+            rtt_avg=round(avg, 3),
+            rtt_max=round(max(rtts), 3),
+            rtt_mdev=round((sum((r - avg) ** 2 for r in rtts) / received) ** 0.5, 3),
+        )
+    if error:
+        stats["error"] = error
+    return stats
+
+
+class IcmpPinger:
+    """
+    Concurrent ICMP echo engine. All targets share one socket per address
+    family and are driven from a single event loop, so pinging hundreds of
+    hosts costs no more processes than pinging one.
+    """
+
+    def __init__(self, timeout: float = 1.0, packet_size: int = 56, interval: float = 0.2):
+        self.timeout = timeout
+        self.packet_size = packet_size
+        self.interval = interval
+        self._ident = os.getpid() & 0xFFFF
+        self._seq = itertools.count(1)
+
+    async def _resolve(self, loop, target: str) -> Tuple[int, str]:
+        infos = await loop.getaddrinfo(target, None, type=socket.SOCK_DGRAM)
+        # Prefer IPv4 when a name resolves to both families.
+        infos.sort(key=lambda info: info[0] != socket.AF_INET)
+        family, _, _, _, sockaddr = infos[0]
+        return family, sockaddr[0]
+
+    async def ping_many(self, targets: Iterable[str], count: int = 1) -> List[Dict]:
+        """
+        Ping every target `count` times concurrently.
+
+        Args:
+            targets: Hostnames or IP addresses
+            count: Echo requests per target
+
+        Returns:
+            list: One statistics dict per target, in input order
+        """
+        loop = asyncio.get_running_loop()
+        targets = list(dict.fromkeys(targets))
+        resolved = await asyncio.gather(
+            *(self._resolve(loop, t) for t in targets), return_exceptions=True
+        )
+
+        sockets: Dict[int, Tuple[socket.socket, bool]] = {}
+        pending: Dict[Tuple[int, str, int], Tuple[str, float]] = {}
+        rtts: Dict[str, List[float]] = {t: [] for t in targets}
+        sent: Dict[str, int] = {t: 0 for t in targets}
+        errors: Dict[str, str] = {}
+        payload = bytes(range(256)) * (self.packet_size // 256 + 1)
+        payload = payload[: self.packet_size]
+
+        def on_readable(family: int):
+            sock, is_raw = sockets[family]
+            while True:
+                try:
+                    packet, addr = sock.recvfrom(65535)
+                except (BlockingIOError, InterruptedError):
+                    return
+                except OSError:
+                    return
+                now = time.perf_counter()
+                parsed = parse_echo_reply(packet, is_raw, family == socket.AF_INET6)
+                if parsed is None:
+                    continue
+                ident, seq = parsed
+                # Datagram ping sockets rewrite the identifier, so only raw
+                # sockets need it checked.
+                if is_raw and ident != self._ident:
+                    continue
+                probe = pending.pop((family, addr[0], seq), None)
+                if probe is not None:
+                    target, sent_at = probe
+                    rtts[target].append((now - sent_at) * 1000.0)
+
+        active = []
+        for target, res in zip(targets, resolved):
+            if isinstance(res, Exception):
+                errors[target] = f"Could not resolve {target}: {res}"
+                continue
+            family, address = res
+            if family not in sockets:
+                try:
+                    sockets[family] = open_icmp_socket(family)
+                except PermissionError as e:
+                    errors[target] = str(e)
+                    continue
+                loop.add_reader(sockets[family][0].fileno(), on_readable, family)
+            active.append((target, family, address))
+
+        try:
+            for round_no in range(count):
+                if round_no:
+                    await asyncio.sleep(self.interval)
+                for target, family, address in active:
+                    seq = next(self._seq) & 0xFFFF
+                    sock, _ = sockets[family]
+                    packet = build_echo_request(self._ident, seq, payload, family == socket.AF_INET6)
+                    pending[(family, address, seq)] = (target, time.perf_counter())
+                    try:
+                        sock.sendto(packet, (address, 0))
+                        sent[target] += 1
+                    except OSError as e:
+                        pending.pop((family, address, seq), None)
+                        errors.setdefault(target, f"Send failed: {e}")
+            deadline = loop.time() + self.timeout
+            while pending and loop.time() < deadline:
+                await asyncio.sleep(min(0.01, max(0.0, deadline - loop.time())))
+        finally:
+            for sock, _ in sockets.values():
+                loop.remove_reader(sock.fileno())
+                sock.close()
+
+        addresses = {target: address for target, _, address in active}
+        return [
+            summarize(t, addresses.get(t), sent[t], rtts[t], errors.get(t, ""))
+            for t in targets
+        ]
+
+
+def ping_many(
+    targets: Iterable[str],
+    count: int = 1,
+    timeout: float = 1.0,
+    packet_size: int = 56,
+    interval: float = 0.2,
+) -> List[Dict]:
+    """
+    Synchronous helper around IcmpPinger.ping_many.
+
+    Returns:
+        list: One statistics dict per target
+    """
+    pinger = IcmpPinger(timeout=timeout, packet_size=packet_size, interval=interval)
+    return asyncio.run(pinger.ping_many(targets, count))
+
+
+def format_stats(stats: Dict) -> str:
+    """Render one target's statistics in the familiar ping summary style."""
+    name = stats["target"]
+    if stats.get("address") and stats["address"] != name:
+        name = f"{name} ({stats['address']})"
+    lines = [f"--- {name} ping statistics ---"]
+    if stats.get("error"):
+        lines.append(f"Error: {stats['error']}")
+    lines.append(
+        f"{stats['sent']} packets transmitted, {stats['received']} received, "
+        f"{stats['loss_pct']}% packet loss"
+    )
+    if stats["received"]:
+        lines.append(
+            f"rtt min/avg/max/mdev = {stats['rtt_min']}/{stats['rtt_avg']}/"
+            f"{stats['rtt_max']}/{stats['rtt_mdev']} ms"
+        )
+    return "\n".join(lines)
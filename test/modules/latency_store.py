@@ -0,0 +1,282 @@
+import asyncio
+import json
+import logging
+import math
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+from modules.icmp_ping import IcmpPinger
+from modules.utils import write_file_atomic
+
+
+class P2Quantile:
+    """
+    Streaming quantile estimate using the P-square algorithm (Jain & Chlamtac).
+    Keeps five markers regardless of how many samples are observed.
+    """
+
+    def __init__(self, q: float):
+        self.q = q
+        self.heights: List[float] = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * q, 1 + 4 * q, 3 + 2 * q, 5]
+        self.increments = [0, q / 2, q, (1 + q) / 2, 1]
+
+    def add(self, x: float):
+        if len(self.heights) < 5:
+            self.heights.append(x)
+            self.heights.sort()
+            return
+
+        h = self.heights
+        if x < h[0]:
+            h[0] = x
+            k = 0
+        elif x >= h[4]:
+            h[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if h[i] <= x < h[i + 1])
+
+        for i in range(k + 1, 5):
+            self.positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        for i in (1, 2, 3):
+            d = self.desired[i] - self.positions[i]
+            if (d >= 1 and self.positions[i + 1] - self.positions[i] > 1) or (
+                d <= -1 and self.positions[i - 1] - self.positions[i] < -1
+            ):
+                step = 1 if d > 0 else -1
+                candidate = self._parabolic(i, step)
+                if not h[i - 1] < candidate < h[i + 1]:
+                    candidate = self._linear(i, step)
+                h[i] = candidate
+                self.positions[i] += step
+
+    def _parabolic(self, i: int, d: int) -> float:
+        n, h = self.positions, self.heights
+        return h[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def _linear(self, i: int, d: int) -> float:
+        n, h = self.positions, self.heights
+        return h[i] + d * (h[i + d] - h[i]) / (n[i + d] - n[i])
+
+    def value(self) -> Optional[float]:
+        if not self.heights:
+            return None
+        if len(self.heights) < 5:
+            return _percentile(sorted(self.heights), self.q)
+        return self.heights[2]
+
+
+def _percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+class LatencySeries:
+    """
+    Fixed-capacity ring buffer of (timestamp, rtt_ms) samples for one target,
+    backed by two `array('d')` buffers. Lost probes are stored as NaN.
+
+    Window percentiles are exact over the ring; lifetime p50/p95/p99 use P-square
+    estimators, and jitter is the RFC 3550 smoothed inter-arrival variation, so
+    memory stays bounded however long the monitor runs.
+    """
+
+    def __init__(self, capacity: int = 3600):
+        self.capacity = capacity
+        self.timestamps = array("d", [0.0] * capacity)
+        self.rtts = array("d", [math.nan] * capacity)
+        self.head = 0
+        self.size = 0
+        self.sent = 0
+        self.received = 0
+        self.jitter = 0.0
+        self._last_rtt: Optional[float] = None
+        self.lifetime = {q: P2Quantile(q) for q in (0.5, 0.95, 0.99)}
+
+    def add(self, timestamp: float, rtt_ms: Optional[float]):
+        self.timestamps[self.head] = timestamp
+        self.rtts[self.head] = math.nan if rtt_ms is None else rtt_ms
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.sent += 1
+        if rtt_ms is None:
+            return
+        self.received += 1
+        if self._last_rtt is not None:
+            self.jitter += (abs(rtt_ms - self._last_rtt) - self.jitter) / 16.0
+        self._last_rtt = rtt_ms
+        for estimator in self.lifetime.values():
+            estimator.add(rtt_ms)
+
+    def samples(self, last: Optional[int] = None) -> List[tuple]:
+        """Return up to `last` samples, oldest first, as (timestamp, rtt_ms|None)."""
+        n = self.size if last is None else min(last, self.size)
+        start = (self.head - n) % self.capacity
+        out = []
+        for i in range(n):
+            idx = (start + i) % self.capacity
+            rtt = self.rtts[idx]
+            out.append((self.timestamps[idx], None if math.isnan(rtt) else rtt))
+        return out
+
+    def stats(self) -> Dict:
+        window = sorted(r for _, r in self.samples() if r is not None)
+
+        def rnd(v):
+            return None if v is None else round(v, 3)
+
+        return {
+            "sent": self.sent,
+            "received": self.received,
+            "loss_pct": round(100.0 * (self.sent - self.received) / self.sent, 2) if self.sent else 0.0,
+            "last_rtt": rnd(self._last_rtt),
+            "jitter": round(self.jitter, 3),
+            "window": {
+                "samples": self.size,
+                "min": rnd(window[0] if window else None),
+                "max": rnd(window[-1] if window else None),
+                "p50": rnd(_percentile(window, 0.5)),
+                "p95": rnd(_percentile(window, 0.95)),
+                "p99": rnd(_percentile(window, 0.99)),
+            },
+            "lifetime": {f"p{int(q * 100)}": rnd(e.value()) for q, e in self.lifetime.items()},
+        }
+
+
+class LatencyMonitor:
+    """
+    Background latency monitor. Probes all targets concurrently every
+    `interval` seconds on its own thread and event loop, keeping samples in
+    per-target LatencySeries. `snapshot()` may be called at any time while it
+    runs; if `status_path` is set the snapshot is also written there each round
+    so other processes (e.g. the CLI) can query it. `csv_path` optionally
+    appends every sample to an on-disk time series.
+    """
+
+    def __init__(
+        self,
+        targets: Iterable[str],
+        interval: float = 1.0,
+        timeout: float = 1.0,
+        capacity: int = 3600,
+        status_path: Optional[str] = None,
+        csv_path: Optional[str] = None,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.targets = list(dict.fromkeys(targets))
+        self.interval = interval
+        self.timeout = min(timeout, interval) if interval > 0 else timeout
+        self.status_path = status_path
+        self.csv_path = csv_path
+        self.series = {t: LatencySeries(capacity) for t in self.targets}
+        self.started_at: Optional[float] = None
+        self.running = False
+        self.error: Optional[str] = None
+        self.logger = logger or logging.getLogger("LatencyMonitor")
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, duration: Optional[float] = None) -> "LatencyMonitor":
+        self._stop.clear()
+        self.started_at = time.time()
+        self.running = True
+        self._thread = threading.Thread(target=self._run, args=(duration,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, wait: bool = True):
+        self._stop.set()
+        if wait and self._thread:
+            self._thread.join(timeout=self.interval + self.timeout + 1)
+
+    def is_running(self) -> bool:
+        return self.running
+
+    def wait(self, timeout: Optional[float] = None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self, duration: Optional[float]):
+        asyncio.run(self._loop(duration))
+
+    async def _loop(self, duration: Optional[float]):
+        pinger = IcmpPinger(timeout=self.timeout)
+        end_time = None if duration is None else time.monotonic() + duration
+        try:
+            while not self._stop.is_set():
+                round_start = time.monotonic()
+                now = time.time()
+                results = await pinger.ping_many(self.targets, count=1)
+                with self._lock:
+                    for stats in results:
+                        rtt = stats["rtts"][0] if stats["rtts"] else None
+                        self.series[stats["target"]].add(now, rtt)
+                self._persist(now, results)
+                if end_time is not None and time.monotonic() + self.interval > end_time:
+                    break
+                delay = self.interval - (time.monotonic() - round_start)
+                if delay > 0:
+                    await asyncio.get_running_loop().run_in_executor(None, self._stop.wait, delay)
+        except Exception as e:
+            self.error = str(e)
+            self.logger.error(f"❌ Latency monitor stopped: {e}")
+        finally:
+            self.running = False
+            try:
+                self._persist(None, [])
+            except OSError as e:
+                self.logger.error(f"❌ Could not write latency status: {e}")
+
+    def _persist(self, now: Optional[float], results: List[Dict]):
+        if self.csv_path and results:
+            with open(self.csv_path, "a") as f:
+                for stats in results:
+                    rtt = stats["rtts"][0] if stats["rtts"] else ""
+                    f.write(f"{now:.3f},{stats['target']},{rtt}\n")
+        if self.status_path:
+            write_file_atomic(self.status_path, json.dumps(self.snapshot(), indent=2))
+
+    def snapshot(self) -> Dict:
+        """Current statistics for every target."""
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "running": self.running,
+                "error": self.error,
+                "interval": self.interval,
+                "targets": {t: s.stats() for t, s in self.series.items()},
+            }
+
+
+def format_snapshot(snapshot: Dict) -> str:
+    """Render a monitor snapshot as a fixed-width text table."""
+    lines = [
+        f"{'target':<28} {'sent':>6} {'loss%':>6} {'last':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'jitter':>8}"
+    ]
+
+    def fmt(v):
+        return "-" if v is None else f"{v:.2f}"
+
+    for target, s in snapshot.get("targets", {}).items():
+        w = s["window"]
+        lines.append(
+            f"{target:<28} {s['sent']:>6} {s['loss_pct']:>6.1f} {fmt(s['last_rtt']):>8} "
+            f"{fmt(w['p50']):>8} {fmt(w['p95']):>8} {fmt(w['p99']):>8} {fmt(s['jitter']):>8}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,253 @@
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, List, Optional, Tuple
+
+from modules.utils import build_file_name_session, write_file_atomic
+
+PREFIX = "assistant_"
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 30.0)
+SAMPLES = 1024
+
+# name -> (type, help). Only these can be recorded, so names stay consistent.
+METRICS: Dict[str, Tuple[str, str]] = {
+    "stt_seconds": ("histogram", "Speech-to-text time from the end of recording to the transcript"),
+    "llm_first_token_seconds": ("histogram", "LLM time to the first streamed token"),
+    "llm_seconds": ("histogram", "LLM time to the complete response"),
+    "command_seconds": ("histogram", "Typer command execution time"),
+    "tts_first_audio_seconds": ("histogram", "Speech synthesis time of a reply's first audio, from its text (or first sentence) being ready"),
+    "acknowledgement_wait_seconds": ("histogram", "Time a typer response waited for its acknowledgement after the work finished"),
+    "request_seconds": ("histogram", "Time from a transcribed request to the start of the spoken response"),
+    "llm_prompt_tokens_total": ("counter", "Estimated prompt tokens sent to LLM providers"),
+    "llm_completion_tokens_total": ("counter", "Estimated completion tokens received from LLM providers"),
+    "llm_errors_total": ("counter", "Failed LLM requests"),
+    "cache_hits_total": ("counter", "Cache hits"),
+    "cache_misses_total": ("counter", "Cache misses"),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0..100) of `values`."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+class Histogram:
+    """Cumulative bucket counts for Prometheus plus recent samples for percentiles."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.samples: Deque[float] = deque(maxlen=SAMPLES)
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+        self.samples.append(value)
+
+    def summary(self) -> Dict:
+        samples = list(self.samples)
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "p50": percentile(samples, 50),
+            "p95": percentile(samples, 95),
+            "max": max(samples) if samples else None,
+        }
+
+
+def _format_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _label_key(labels: Labels) -> str:
+    return ",".join(f"{k}={v}" for k, v in labels)
+
+
+class Metrics:
+    """
+    Process-wide latency histograms and counters, by metric name and labels
+    (e.g. `provider="deepseek"`). `prometheus()` renders them in the
+    Prometheus text format; `summary()` as a dict with p50/p95 per series.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self.started = time.time()
+
+    @staticmethod
+    def _labels(labels: Dict[str, object]) -> Labels:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def _check(self, name: str, kind: str):
+        if METRICS.get(name, ("",))[0] != kind:
+            raise KeyError(f"Unknown {kind} metric: {name}")
+
+    def observe(self, name: str, value: float, **labels):
+        self._check(name, "histogram")
+        key = self._labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        self._check(name, "counter")
+        key = self._labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    @contextmanager
+    def time(self, name: str, **labels):
+        """Observe the duration of the `with` block (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def value(self, name: str, **labels) -> float:
+        """Current value of a counter series."""
+        with self._lock:
+            return self._counters.get(name, {}).get(self._labels(labels), 0)
+
+    def histogram(self, name: str, **labels) -> Optional[Histogram]:
+        with self._lock:
+            return self._histograms.get(name, {}).get(self._labels(labels))
+
+    def samples(self, name: str) -> List[float]:
+        """Recent samples of a histogram across all its label sets."""
+        with self._lock:
+            return [v for h in self._histograms.get(name, {}).values() for v in h.samples]
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.started = time.time()
+
+    def prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, (kind, help_text) in METRICS.items():
+                if kind == "histogram":
+                    series = self._histograms.get(name)
+                else:
+                    series = self._counters.get(name)
+                if not series:
+                    continue
+                full = PREFIX + name
+                lines += [f"# HELP {full} {help_text}", f"# TYPE {full} {kind}"]
+                for labels, data in sorted(series.items()):
+                    if kind == "counter":
+                        lines.append(f"{full}{_format_labels(labels)} {data:g}")
+                        continue
+                    for bound, count in zip(data.buckets, data.counts):
+                        lines.append(f"{full}_bucket{_format_labels(labels, (('le', f'{bound:g}'),))} {count}")
+                    lines.append(f"{full}_bucket{_format_labels(labels, (('le', '+Inf'),))} {data.count}")
+                    lines.append(f"{full}_sum{_format_labels(labels)} {data.sum:.6f}")
+                    lines.append(f"{full}_count{_format_labels(labels)} {data.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {
+                "started": self.started,
+                "updated": time.time(),
+                "histograms": {
+                    name: {_label_key(k): h.summary() for k, h in sorted(series.items())}
+                    for name, series in self._histograms.items()
+                },
+                "counters": {
+                    name: {_label_key(k): v for k, v in sorted(series.items())}
+                    for name, series in self._counters.items()
+                },
+            }
+
+    def write_summary(self, path: str):
+        """Write `summary()` as JSON (atomically, so readers never see half a file)."""
+        write_file_atomic(path, json.dumps(self.summary(), indent=2))
+
+
+class SttTimer:
+    """Times transcription: from the recorder's end of recording to the transcript."""
+
+    def __init__(self, metrics: Optional[Metrics] = None, **labels):
+        self.metrics = metrics
+        self.labels = labels
+        self._stopped: Optional[float] = None
+
+    def recording_stopped(self):
+        self._stopped = time.perf_counter()
+
+    def transcribed(self):
+        if self._stopped is not None:
+            (self.metrics or get_metrics()).observe("stt_seconds", time.perf_counter() - self._stopped, **self.labels)
+            self._stopped = None
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1", metrics: Optional[Metrics] = None) -> ThreadingHTTPServer:
+    """Serve `GET /metrics` in the Prometheus text format on a daemon thread."""
+    source = metrics or get_metrics()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = source.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+    return server
+
+
+_metrics: Optional[Metrics] = None
+
+
+def get_metrics() -> Metrics:
+    """Process-wide Metrics."""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
+
+
+def write_session_metrics(session_id: str, logger=None):
+    """Save the latency/token summary to output/<session_id>/metrics.json, logging (not raising) on failure."""
+    try:
+        get_metrics().write_summary(build_file_name_session("metrics.json", session_id))
+    except OSError as e:
+        if logger:
+            logger.warning(f"⚠️ Could not write metrics: {e}")
@@ -1,15 +1,33 @@
 import os
 
+_client = None
+
+def _get_client():
+    global _client
+    if _client is None:
+        try:
+            from openai import OpenAI
+        except ImportError:
+            raise ImportError("openai python package is required for Mistral.")
+        from modules.http_client import get_httpx_client
+        _client = OpenAI(api_key=os.getenv("MISTRAL_API_KEY"), base_url="https://api.mistral.ai/v1",
+                         http_client=get_httpx_client())
+    return _client
+
 def conversational_prompt(messages, system_prompt="You are a helpful assistant.", model="mistral-large-latest"):
-    try:
-        from openai import OpenAI
-    except ImportError:
-        raise ImportError("openai python package is required for Mistral.")
-    client = OpenAI(api_key=os.getenv("MISTRAL_API_KEY"), base_url="https://api.mistral.ai/v1")
+    client = _get_client()
     chat_messages = [{"role":"system","content":system_prompt}] + messages
     resp = client.chat.completions.create(model=model, messages=chat_messages)
     return resp.choices[0].message.content
 
+def stream_conversational_prompt(messages, system_prompt="You are a helpful assistant.", model="mistral-large-latest"):
+    # Yields text deltas as they arrive
+    client = _get_client()
+    chat_messages = [{"role":"system","content":system_prompt}] + messages
+    for chunk in client.chat.completions.create(model=model, messages=chat_messages, stream=True):
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
 def prefix_prompt(prompt, prefix="", model="mistral-large-latest"):
     # Trivial: just prepend prefix to user prompt and call as normal
     system_prompt = f"You must always begin your response with the following prefix: '{prefix}'.\n" if prefix else ""
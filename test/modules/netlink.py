@@ -0,0 +1,357 @@
+import ipaddress
+import os
+import socket
+import struct
+import threading
+from typing import Callable, Dict, List, Optional
+
+NETLINK_ROUTE = 0
+
+RTM_NEWLINK, RTM_DELLINK, RTM_GETLINK = 16, 17, 18
+RTM_NEWADDR, RTM_DELADDR, RTM_GETADDR = 20, 21, 22
+RTM_NEWROUTE, RTM_DELROUTE, RTM_GETROUTE = 24, 25, 26
+RTM_NEWNEIGH, RTM_DELNEIGH, RTM_GETNEIGH = 28, 29, 30
+
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+
+IFLA_ADDRESS, IFLA_IFNAME, IFLA_MTU, IFLA_OPERSTATE = 1, 3, 4, 16
+IFA_ADDRESS, IFA_LOCAL, IFA_LABEL, IFA_BROADCAST = 1, 2, 3, 4
+RTA_DST, RTA_OIF, RTA_GATEWAY, RTA_PRIORITY, RTA_PREFSRC, RTA_TABLE = 1, 4, 5, 6, 7, 15
+NDA_DST, NDA_LLADDR = 1, 2
+
+RT_TABLE_MAIN = 254
+RTN_UNICAST = 1
+IFF_UP = 0x1
+
+RTMGRP_LINK = 0x1
+RTMGRP_NEIGH = 0x4
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_IFADDR = 0x100
+RTMGRP_IPV6_ROUTE = 0x400
+ALL_GROUPS = (RTMGRP_LINK | RTMGRP_NEIGH | RTMGRP_IPV4_IFADDR | RTMGRP_IPV4_ROUTE
+              | RTMGRP_IPV6_IFADDR | RTMGRP_IPV6_ROUTE)
+
+NUD_STATES = {0x01: "incomplete", 0x02: "reachable", 0x04: "stale", 0x08: "delay",
+              0x10: "probe", 0x20: "failed", 0x40: "noarp", 0x80: "permanent"}
+OPER_STATES = {0: "unknown", 1: "notpresent", 2: "down", 3: "lowerlayerdown",
+               4: "testing", 5: "dormant", 6: "up"}
+
+_NLMSGHDR = struct.Struct("=IHHII")
+_IFINFOMSG = struct.Struct("=BxHiII")
+_IFADDRMSG = struct.Struct("=BBBBI")
+_RTMSG = struct.Struct("=BBBBBBBBI")
+_NDMSG = struct.Struct("=BxxxiHBB")
+_RTATTR = struct.Struct("=HH")
+
+
+def _align(n: int) -> int:
+    return (n + 3) & ~3
+
+
+def _attrs(data: bytes, offset: int) -> Dict[int, bytes]:
+    attrs = {}
+    while offset + 4 <= len(data):
+        length, kind = _RTATTR.unpack_from(data, offset)
+        if length < 4:
+            break
+        attrs[kind & 0x3FFF] = data[offset + 4:offset + length]
+        offset += _align(length)
+    return attrs
+
+
+def _ip(family: int, raw: Optional[bytes]) -> Optional[str]:
+    if raw is None:
+        return None
+    return socket.inet_ntop(family, raw)
+
+
+def _mac(raw: Optional[bytes]) -> Optional[str]:
+    return ":".join(f"{b:02x}" for b in raw) if raw else None
+
+
+def _cstr(raw: Optional[bytes]) -> Optional[str]:
+    return raw.split(b"\0", 1)[0].decode() if raw else None
+
+
+def parse_message(msg_type: int, body: bytes) -> Optional[Dict]:
+    """Decode one rtnetlink message body into a structured record."""
+    if msg_type in (RTM_NEWLINK, RTM_DELLINK):
+        _family, _type, index, flags, _change = _IFINFOMSG.unpack_from(body)
+        a = _attrs(body, _IFINFOMSG.size)
+        return {
+            "index": index,
+            "name": _cstr(a.get(IFLA_IFNAME)),
+            "mac": _mac(a.get(IFLA_ADDRESS)),
+            "mtu": struct.unpack("=I", a[IFLA_MTU])[0] if IFLA_MTU in a else None,
+            "up": bool(flags & IFF_UP),
+            "operstate": OPER_STATES.get(a[IFLA_OPERSTATE][0], "unknown") if IFLA_OPERSTATE in a else "unknown",
+        }
+    if msg_type in (RTM_NEWADDR, RTM_DELADDR):
+        family, prefixlen, _flags, scope, index = _IFADDRMSG.unpack_from(body)
+        a = _attrs(body, _IFADDRMSG.size)
+        return {
+            "family": family,
+            "address": _ip(family, a.get(IFA_LOCAL, a.get(IFA_ADDRESS))),
+            "prefixlen": prefixlen,
+            "broadcast": _ip(family, a.get(IFA_BROADCAST)),
+            "label": _cstr(a.get(IFA_LABEL)),
+            "index": index,
+            "scope": scope,
+        }
+    if msg_type in (RTM_NEWROUTE, RTM_DELROUTE):
+        family, dst_len, _src_len, _tos, table, protocol, scope, rtype, _flags = _RTMSG.unpack_from(body)
+        a = _attrs(body, _RTMSG.size)
+        default = "0.0.0.0" if family == socket.AF_INET else "::"
+        return {
+            "family": family,
+            "destination": _ip(family, a.get(RTA_DST)) or default,
+            "prefixlen": dst_len,
+            "gateway": _ip(family, a.get(RTA_GATEWAY)),
+            "index": struct.unpack("=I", a[RTA_OIF])[0] if RTA_OIF in a else None,
+            "metric": struct.unpack("=I", a[RTA_PRIORITY])[0] if RTA_PRIORITY in a else 0,
+            "prefsrc": _ip(family, a.get(RTA_PREFSRC)),
+            "table": struct.unpack("=I", a[RTA_TABLE])[0] if RTA_TABLE in a else table,
+            "protocol": protocol,
+            "scope": scope,
+            "type": rtype,
+        }
+    if msg_type in (RTM_NEWNEIGH, RTM_DELNEIGH):
+        family, index, state, _flags, _type = _NDMSG.unpack_from(body)
+        a = _attrs(body, _NDMSG.size)
+        return {
+            "family": family,
+            "address": _ip(family, a.get(NDA_DST)),
+            "mac": _mac(a.get(NDA_LLADDR)),
+            "index": index,
+            "state": NUD_STATES.get(state, str(state)),
+        }
+    return None
+
+
+def _iter_messages(data: bytes):
+    offset = 0
+    while offset + _NLMSGHDR.size <= len(data):
+        length, msg_type, flags, seq, pid = _NLMSGHDR.unpack_from(data, offset)
+        if length < _NLMSGHDR.size:
+            return
+        yield msg_type, seq, data[offset + _NLMSGHDR.size:offset + length]
+        offset += _align(length)
+
+
+class NetlinkSnapshot:
+    """Current links, addresses, routes and neighbours, keyed for in-place updates."""
+
+    def __init__(self):
+        self.links: Dict[int, Dict] = {}
+        self.addresses: Dict[tuple, Dict] = {}
+        self.routes: Dict[tuple, Dict] = {}
+        self.neighbours: Dict[tuple, Dict] = {}
+
+    def apply(self, msg_type: int, record: Dict):
+        if msg_type in (RTM_NEWLINK, RTM_DELLINK):
+            table, key = self.links, record["index"]
+        elif msg_type in (RTM_NEWADDR, RTM_DELADDR):
+            table, key = self.addresses, (record["index"], record["address"], record["prefixlen"])
+        elif msg_type in (RTM_NEWROUTE, RTM_DELROUTE):
+            table = self.routes
+            key = (record["table"], record["destination"], record["prefixlen"], record["index"], record["metric"])
+        else:
+            table, key = self.neighbours, (record["index"], record["address"])
+        if msg_type in (RTM_DELLINK, RTM_DELADDR, RTM_DELROUTE, RTM_DELNEIGH):
+            table.pop(key, None)
+        else:
+            table[key] = record
+
+    def copy(self) -> "NetlinkSnapshot":
+        """Independent copy; records are replaced, never mutated, so a shallow copy suffices."""
+        snapshot = NetlinkSnapshot()
+        snapshot.links = dict(self.links)
+        snapshot.addresses = dict(self.addresses)
+        snapshot.routes = dict(self.routes)
+        snapshot.neighbours = dict(self.neighbours)
+        return snapshot
+
+    def ifname(self, index: Optional[int]) -> Optional[str]:
+        link = self.links.get(index)
+        return link["name"] if link else None
+
+    def _named(self, records) -> List[Dict]:
+        return [dict(r, interface=self.ifname(r.get("index"))) for r in records]
+
+    def get_links(self) -> List[Dict]:
+        return [dict(l) for l in sorted(self.links.values(), key=lambda l: l["index"])]
+
+    def get_addresses(self) -> List[Dict]:
+        return self._named(self.addresses.values())
+
+    def get_routes(self, table: Optional[int] = RT_TABLE_MAIN) -> List[Dict]:
+        routes = [r for r in self.routes.values() if table is None or r["table"] == table]
+        routes.sort(key=lambda r: (r["family"], -r["prefixlen"], r["metric"]))
+        return self._named(routes)
+
+    def get_neighbours(self) -> List[Dict]:
+        return self._named(self.neighbours.values())
+
+
+class NetlinkReader:
+    """
+    rtnetlink client (Linux). `dump()` fetches links, addresses, routes and
+    neighbours over one netlink socket; `subscribe()` keeps a snapshot current
+    from kernel multicast notifications on a background thread, so readers
+    never need to poll or spawn `netstat`/`ip`.
+    """
+
+    def __init__(self):
+        if not hasattr(socket, "AF_NETLINK"):
+            raise OSError("Netlink is only available on Linux.")
+        self.snapshot = NetlinkSnapshot()
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._listeners: List[Callable[[int, Dict], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._sub_sock: Optional[socket.socket] = None
+
+    def _request(self, sock: socket.socket, msg_type: int, family: int = socket.AF_UNSPEC):
+        self._seq += 1
+        if msg_type == RTM_GETLINK:
+            body = _IFINFOMSG.pack(family, 0, 0, 0, 0)
+        elif msg_type == RTM_GETADDR:
+            body = _IFADDRMSG.pack(family, 0, 0, 0, 0)
+        elif msg_type == RTM_GETROUTE:
+            body = _RTMSG.pack(family, 0, 0, 0, 0, 0, 0, 0, 0)
+        else:
+            body = _NDMSG.pack(family, 0, 0, 0, 0)
+        header = _NLMSGHDR.pack(_NLMSGHDR.size + len(body), msg_type, NLM_F_REQUEST | NLM_F_DUMP, self._seq, 0)
+        sock.send(header + body)
+        return self._seq
+
+    def dump(self) -> NetlinkSnapshot:
+        """Fetch a fresh snapshot of links, addresses, routes and neighbours."""
+        snapshot = NetlinkSnapshot()
+        with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE) as sock:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+            sock.bind((0, 0))
+            for msg_type in (RTM_GETLINK, RTM_GETADDR, RTM_GETROUTE, RTM_GETNEIGH):
+                seq = self._request(sock, msg_type)
+                done = False
+                while not done:
+                    data = sock.recv(1 << 20)
+                    for kind, msg_seq, body in _iter_messages(data):
+                        if msg_seq != seq:
+                            continue
+                        if kind == NLMSG_DONE:
+                            done = True
+                            break
+                        if kind == NLMSG_ERROR:
+                            errno = -struct.unpack_from("=i", body)[0]
+                            if errno:
+                                raise OSError(errno, os.strerror(errno))
+                            done = True
+                            break
+                        record = parse_message(kind, body)
+                        if record is not None:
+                            snapshot.apply(kind, record)
+        return snapshot
+
+    def subscribe(self, callback: Optional[Callable[[int, Dict], None]] = None) -> "NetlinkReader":
+        """
+        Start following kernel change notifications. The subscription socket is
+        bound before the initial dump so no change between the two is missed.
+        """
+        if callback is not None:
+            self._listeners.append(callback)
+        if self._thread is not None:
+            return self
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        sock.bind((0, ALL_GROUPS))
+        self._sub_sock = sock
+        snapshot = self.dump()
+        with self._lock:
+            self.snapshot = snapshot
+        self._thread = threading.Thread(target=self._follow, daemon=True)
+        self._thread.start()
+        return self
+
+    def _follow(self):
+        while True:
+            try:
+                data = self._sub_sock.recv(1 << 20)
+            except OSError as e:
+                if self._sub_sock is None or self._sub_sock.fileno() < 0:
+                    return
+                if e.errno == 105:  # ENOBUFS: notifications were lost, resync.
+                    snapshot = self.dump()
+                    with self._lock:
+                        self.snapshot = snapshot
+                    continue
+                return
+            for kind, _seq, body in _iter_messages(data):
+                record = parse_message(kind, body)
+                if record is None:
+                    continue
+                with self._lock:
+                    self.snapshot.apply(kind, record)
+                for listener in self._listeners:
+                    listener(kind, record)
+
+    def close(self):
+        sock, self._sub_sock = self._sub_sock, None
+        if sock is not None:
+            sock.close()
+
+    def current(self) -> NetlinkSnapshot:
+        """
+        A copy of the subscribed snapshot, taken under the lock so callers can
+        iterate it while notifications arrive, or a fresh dump if not subscribed.
+        """
+        if self._thread is None:
+            return self.dump()
+        with self._lock:
+            return self.snapshot.copy()
+
+
+def prefix_to_netmask(family: int, prefixlen: int) -> str:
+    if family == socket.AF_INET:
+        return str(ipaddress.IPv4Network(f"0.0.0.0/{prefixlen}").netmask)
+    return str(ipaddress.IPv6Network(f"::/{prefixlen}").netmask)
+
+
+def primary_network(snapshot: NetlinkSnapshot) -> Optional[Dict]:
+    """
+    The IPv4 network on the interface carrying the default route.
+
+    Returns:
+        dict: interface, address, network (CIDR string) and gateway, or None
+    """
+    defaults = [r for r in snapshot.get_routes() if r["family"] == socket.AF_INET and r["prefixlen"] == 0]
+    if not defaults:
+        return None
+    route = defaults[0]
+    for addr in snapshot.get_addresses():
+        if addr["family"] == socket.AF_INET and addr["index"] == route["index"]:
+            network = ipaddress.ip_network(f"{addr['address']}/{addr['prefixlen']}", strict=False)
+            return {
+                "interface": addr["interface"],
+                "address": addr["address"],
+                "network": str(network),
+                "gateway": route["gateway"],
+            }
+    return None
+
+
+_shared_reader: Optional[NetlinkReader] = None
+_shared_lock = threading.Lock()
+
+
+def shared_reader() -> NetlinkReader:
+    """Process-wide subscribed reader, started on first use."""
+    global _shared_reader
+    with _shared_lock:
+        if _shared_reader is None:
+            _shared_reader = NetlinkReader().subscribe()
+        return _shared_reader
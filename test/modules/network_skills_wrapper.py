@@ -1,43 +1,88 @@
 import json
+import threading
+
+_skills = {}
+_skills_lock = threading.Lock()
+
+def get_skill(name: str):
+    """
+    Shared instance of a network_diagnostic_skills class, created on first use.
+    Skills keep resolvers, hop and DNS caches and netlink subscriptions, so
+    reusing one instance per process keeps that state warm across calls.
+    """
+    skill = _skills.get(name)
+    if skill is None:
+        try:
+            import network_diagnostic_skills
+        except ImportError:
+            raise ImportError("network_diagnostic_skills.py (and dependencies) are required.")
+        with _skills_lock:
+            skill = _skills.get(name)
+            if skill is None:
+                skill = _skills[name] = getattr(network_diagnostic_skills, name)()
+    return skill
 
 def ping(ip: str, count: int = 1, packet_size: int = 56, timeout: int = 1) -> str:
-    try:
-        from network_diagnostic_skills import NetworkDiagnosticSkill
-    except ImportError:
-        raise ImportError("network_diagnostic_skills.py (and dependencies) are required.")
-    skill = NetworkDiagnosticSkill()
+    skill = get_skill("NetworkDiagnosticSkill")
     return skill.ping(ip, packet_size=packet_size, count=count, timeout=timeout)
 
+def ping_many(targets: str, count: int = 1, packet_size: int = 56, timeout: float = 1.0) -> str:
+    """Ping a comma-separated list of targets concurrently and return JSON statistics."""
+    skill = get_skill("NetworkDiagnosticSkill")
+    hosts = [t.strip() for t in targets.split(",") if t.strip()]
+    stats = skill.ping_many(hosts, packet_size=packet_size, count=count, timeout=timeout)
+    return json.dumps(stats, indent=2)
+
 def traceroute(ip: str, max_hops: int = 30, packet_size: int = 40) -> str:
-    try:
-        from network_diagnostic_skills import NetworkDiagnosticSkill
-    except ImportError:
-        raise ImportError("network_diagnostic_skills.py (and dependencies) are required.")
-    skill = NetworkDiagnosticSkill()
+    skill = get_skill("NetworkDiagnosticSkill")
     return skill.traceroute(ip, max_hops=max_hops, packet_size=packet_size)
 
-def dns_lookup(domain: str, record_type: str = "A", dns_server: str = "8.8.8.8") -> str:
+def traceroute_many(targets: str, max_hops: int = 30, timeout: float = 2.0) -> str:
+    """Trace routes to a comma-separated list of targets concurrently."""
+    from modules.paris_traceroute import format_trace
+    skill = get_skill("NetworkDiagnosticSkill")
+    hosts = [t.strip() for t in targets.split(",") if t.strip()]
     try:
-        from network_diagnostic_skills import DNSLookupSkill
-    except ImportError:
-        raise ImportError("network_diagnostic_skills.py (and dependencies) are required.")
-    skill = DNSLookupSkill()
+        results = skill.traceroute_many(hosts, max_hops=max_hops, timeout=timeout)
+    except PermissionError:
+        return "Traceroute failed: raw ICMP sockets require root/CAP_NET_RAW."
+    return "\n\n".join(format_trace(r) for r in results)
+
+def dns_lookup(domain: str, record_type: str = "A", dns_server: str = "8.8.8.8") -> str:
+    skill = get_skill("DNSLookupSkill")
     return skill.lookup(domain, record_type, dns_server)
 
+def dns_bulk_lookup(domains: str, record_types: str = "A", dns_server: str = "8.8.8.8") -> str:
+    """Resolve comma-separated domains for comma-separated record types concurrently."""
+    skill = get_skill("DNSLookupSkill")
+    names = [d.strip() for d in domains.split(",") if d.strip()]
+    types = [t.strip() for t in record_types.split(",") if t.strip()]
+    lines = []
+    for r in skill.bulk_lookup(names, types, dns_server):
+        answer = ", ".join(r["records"]) if r["records"] else r.get("error", "no records")
+        lines.append(f"{r['name']} {r['type']}: {answer}")
+    return "\n".join(lines)
+
+def dns_reverse_sweep(ip_range: str, dns_server: str = "8.8.8.8") -> str:
+    """PTR sweep over a CIDR or comma-separated list of addresses; lists only addresses with names."""
+    skill = get_skill("DNSLookupSkill")
+    results = skill.reverse_sweep(ip_range, dns_server)
+    named = [f"{r['address']}: {', '.join(r['records'])}" for r in results if r["records"]]
+    return "\n".join(named) if named else f"No PTR records found for {ip_range}."
+
 def port_scan(ip: str, start_port: int = 1, end_port: int = 1024) -> str:
-    try:
-        from network_diagnostic_skills import PortScannerSkill
-    except ImportError:
-        raise ImportError("network_diagnostic_skills.py (and dependencies) are required.")
-    skill = PortScannerSkill()
+    skill = get_skill("PortScannerSkill")
     return skill.scan(ip, start_port, end_port)
 
+def packet_capture(filter_expr: str = "", duration: float = 10.0, count: int = 0, iface: str = "",
+                   pcap_path: str = "", top: int = 10) -> str:
+    """Streaming capture with rolling aggregates (requires root on Linux)."""
+    skill = get_skill("PacketSnifferSkill")
+    return skill.capture(filter_expr, duration=duration, count=count, iface=iface or None,
+                         pcap_path=pcap_path or None, top=top)
+
 def interface_info() -> str:
-    try:
-        from network_diagnostic_skills import NetworkInterfaceSkill
-    except ImportError:
-        raise ImportError("network_diagnostic_skills.py (and dependencies) are required.")
-    skill = NetworkInterfaceSkill()
+    skill = get_skill("NetworkInterfaceSkill")
     info = skill.get_info()
     # If already str, return as is; else pretty-print JSON
     if isinstance(info, str):
@@ -47,10 +92,70 @@ def interface_info() -> str:
     except Exception:
         return str(info)
 
+def routes() -> str:
+    """Route table as JSON."""
+    return json.dumps(get_skill("RouteTableSkill").get_routes(), indent=2)
+
+def neighbours() -> str:
+    """ARP/NDP neighbour table as JSON."""
+    return json.dumps(get_skill("RouteTableSkill").get_neighbours(), indent=2)
+
 def tcp_test(host: str, port: int, timeout: int = 5) -> str:
+    skill = get_skill("TCPConnectionTestSkill")
+    return skill.test(host, port, timeout)
+
+def bandwidth_local(host: str = "", port: int = 5201, streams: int = 4, duration: float = 10.0,
+                    interval: float = 1.0, reverse: bool = False, echo=print) -> str:
+    """
+    Multi-stream TCP throughput test. With no host a bundled server is started
+    on loopback; otherwise `host` must be running `bandwidth_server`.
+    """
+    report = lambda r: echo(f"  {r['start']:6.2f}-{r['end']:6.2f}s  {r['mbps']:10.2f} Mbps")
+    return get_skill("BandwidthTestSkill").local_test(host or None, port, streams, duration, interval, reverse, on_interval=report)
+
+def bandwidth_server(host: str = "0.0.0.0", port: int = 5201) -> str:
+    """Run the throughput server until interrupted."""
+    return get_skill("BandwidthTestSkill").serve(host, port)
+
+def tcp_matrix(path: str, concurrency: int = 500, timeout: float = 2.0, show_all: bool = False) -> str:
+    return get_skill("TCPConnectionTestSkill").test_matrix(path, concurrency, timeout, show_all)
+
+def latency_monitor(targets: str, interval: float = 1.0, duration: float = 60.0, report_every: float = 10.0,
+                    status_path: str = "", csv_path: str = "", echo=print) -> str:
+    """
+    Run the background latency monitor over comma-separated targets, printing a
+    live percentile table every `report_every` seconds until `duration` elapses.
+    """
     try:
-        from network_diagnostic_skills import TCPConnectionTestSkill
+        from modules.latency_store import LatencyMonitor, format_snapshot
+        from modules.utils import build_file_path
     except ImportError:
-        raise ImportError("network_diagnostic_skills.py (and dependencies) are required.")
-    skill = TCPConnectionTestSkill()
-    return skill.test(host, port, timeout)
\ No newline at end of file
+        raise ImportError("modules.latency_store (and dependencies) are required.")
+    hosts = [t.strip() for t in targets.split(",") if t.strip()]
+    monitor = LatencyMonitor(hosts, interval=interval, timeout=min(1.0, interval),
+                             status_path=status_path or build_file_path("latency_monitor.json"),
+                             csv_path=csv_path or None)
+    monitor.start(duration=duration)
+    try:
+        while monitor.is_running():
+            monitor.wait(report_every)
+            echo(format_snapshot(monitor.snapshot()) + "\n")
+    except KeyboardInterrupt:
+        monitor.stop()
+    report = format_snapshot(monitor.snapshot())
+    if monitor.error:
+        report += f"\nMonitor stopped early: {monitor.error}"
+    return report
+
+def latency_status(status_path: str = "") -> str:
+    """Read the snapshot written by a running (or finished) latency monitor."""
+    from modules.latency_store import format_snapshot
+    from modules.utils import build_file_path
+    path = status_path or build_file_path("latency_monitor.json")
+    try:
+        with open(path) as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return f"No latency monitor status found at {path}."
+    state = "running" if snapshot.get("running") else "stopped"
+    return f"Latency monitor ({state}):\n" + format_snapshot(snapshot)
@@ -1,5 +1,5 @@
 from ollama import chat
-from typing import List, Dict
+from typing import List, Dict, Iterator
 
 
 def conversational_prompt(
@@ -30,3 +30,48 @@ def conversational_prompt(
 
     except Exception as e:
         raise Exception(f"Error in conversational prompt: {str(e)}")
+
+
+def stream_conversational_prompt(
+    messages: List[Dict[str, str]],
+    system_prompt: str = "You are a helpful conversational assistant. Respond in a short, concise, friendly manner.",
+    model: str = "phi4",
+) -> Iterator[str]:
+    """
+    Stream a conversational response from Ollama token by token.
+
+    Args:
+        messages: List of message dicts with 'role' and 'content' keys
+        system_prompt: Optional system prompt to set context
+        model: The model to use, defaults to phi4
+
+    Yields:
+        str: Text deltas as they arrive
+    """
+    try:
+        full_messages = [{"role": "system", "content": system_prompt}, *messages]
+        for chunk in chat(model=model, messages=full_messages, stream=True):
+            if chunk.message.content:
+                yield chunk.message.content
+
+    except Exception as e:
+        raise Exception(f"Error in conversational prompt: {str(e)}")
+
+
+def embed(text: str, model: str = "nomic-embed-text") -> List[float]:
+    """
+    Embed text with an Ollama embedding model.
+
+    Args:
+        text: The text to embed
+        model: The embedding model to use, defaults to nomic-embed-text
+
+    Returns:
+        List[float]: The embedding vector
+    """
+    from ollama import embeddings
+
+    try:
+        return embeddings(model=model, prompt=text)["embedding"]
+    except Exception as e:
+        raise Exception(f"Error in embedding: {str(e)}")
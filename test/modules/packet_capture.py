@@ -0,0 +1,285 @@
+import ctypes
+import shutil
+import socket
+import struct
+import subprocess
+import time
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+ETH_P_ALL = 0x0003
+SOL_PACKET = 263
+PACKET_STATISTICS = 6
+SO_ATTACH_FILTER = 26
+
+PROTO_NAMES = {1: "ICMP", 2: "IGMP", 6: "TCP", 17: "UDP", 47: "GRE", 50: "ESP", 58: "ICMPv6", 132: "SCTP"}
+
+
+class _SockFilter(ctypes.Structure):
+    _fields_ = [("code", ctypes.c_uint16), ("jt", ctypes.c_uint8), ("jf", ctypes.c_uint8), ("k", ctypes.c_uint32)]
+
+
+class _SockFprog(ctypes.Structure):
+    _fields_ = [("len", ctypes.c_uint16), ("filter", ctypes.POINTER(_SockFilter))]
+
+
+def compile_bpf(filter_expr: str, iface: Optional[str] = None) -> List[Tuple[int, int, int, int]]:
+    """
+    Compile a tcpdump-style filter expression into classic BPF instructions.
+    Uses `tcpdump -ddd` when available and scapy's libpcap binding otherwise.
+
+    Raises:
+        ValueError: If the expression cannot be compiled
+    """
+    tcpdump = shutil.which("tcpdump")
+    if tcpdump:
+        cmd = [tcpdump, "-ddd"] + (["-i", iface] if iface else []) + [filter_expr]
+        res = subprocess.run(cmd, capture_output=True, text=True)
+        if res.returncode != 0:
+            raise ValueError(f"Invalid capture filter '{filter_expr}': {res.stderr.strip()}")
+        lines = res.stdout.split("\n")
+        return [tuple(int(v) for v in line.split()) for line in lines[1:int(lines[0]) + 1]]
+    try:
+        from scapy.arch.common import compile_filter
+    except ImportError:
+        raise ValueError("Compiling capture filters requires tcpdump or scapy with libpcap.")
+    try:
+        prog = compile_filter(filter_expr, iface=iface)
+    except Exception as e:
+        raise ValueError(f"Invalid capture filter '{filter_expr}': {e}")
+    return [(ins.code, ins.jt, ins.jf, ins.k) for ins in prog.bf_insns[:prog.bf_len]]
+
+
+def attach_bpf(sock: socket.socket, instructions: List[Tuple[int, int, int, int]]):
+    """Attach a classic BPF program to a socket (SO_ATTACH_FILTER)."""
+    insns = (_SockFilter * len(instructions))(*[_SockFilter(*i) for i in instructions])
+    prog = _SockFprog(len(instructions), ctypes.cast(insns, ctypes.POINTER(_SockFilter)))
+    sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, bytes(memoryview(prog)))
+
+
+def parse_frame(frame, length: int) -> Tuple[str, Optional[str], Optional[str], Optional[int], Optional[int]]:
+    """
+    Lightweight Ethernet/IPv4/IPv6/TCP/UDP header parse.
+
+    Returns:
+        tuple: (protocol, src, dst, sport, dport); unknown fields are None
+    """
+    if length < 14:
+        return "short", None, None, None, None
+    ethertype = struct.unpack_from("!H", frame, 12)[0]
+    offset = 14
+    while ethertype in (0x8100, 0x88A8) and length >= offset + 4:
+        ethertype = struct.unpack_from("!H", frame, offset + 2)[0]
+        offset += 4
+
+    if ethertype == 0x0800 and length >= offset + 20:
+        ihl = (frame[offset] & 0x0F) * 4
+        proto = frame[offset + 9]
+        src = socket.inet_ntoa(bytes(frame[offset + 12:offset + 16]))
+        dst = socket.inet_ntoa(bytes(frame[offset + 16:offset + 20]))
+        l4 = offset + ihl
+        fragment_offset = struct.unpack_from("!H", frame, offset + 6)[0] & 0x1FFF
+        if fragment_offset:
+            return PROTO_NAMES.get(proto, str(proto)), src, dst, None, None
+    elif ethertype == 0x86DD and length >= offset + 40:
+        proto = frame[offset + 6]
+        src = socket.inet_ntop(socket.AF_INET6, bytes(frame[offset + 8:offset + 24]))
+        dst = socket.inet_ntop(socket.AF_INET6, bytes(frame[offset + 24:offset + 40]))
+        l4 = offset + 40
+    elif ethertype == 0x0806:
+        return "ARP", None, None, None, None
+    else:
+        return f"0x{ethertype:04x}", None, None, None, None
+
+    name = PROTO_NAMES.get(proto, str(proto))
+    if proto in (6, 17, 132) and length >= l4 + 4:
+        sport, dport = struct.unpack_from("!HH", frame, l4)
+        return name, src, dst, sport, dport
+    return name, src, dst, None, None
+
+
+class PcapWriter:
+    """Minimal pcap (libpcap format, Ethernet link type) writer with size-based rotation."""
+
+    def __init__(self, path: str, snaplen: int = 65535, max_bytes: int = 0):
+        self.path = path
+        self.snaplen = snaplen
+        self.max_bytes = max_bytes
+        self.rotations = 0
+        self._open(path)
+
+    def _open(self, path: str):
+        self._file = open(path, "wb")
+        self._file.write(struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, self.snaplen, 1))
+        self._written = 24
+
+    def write(self, timestamp: float, data, orig_len: int):
+        if self.max_bytes and self._written + 16 + len(data) > self.max_bytes:
+            self._file.close()
+            self.rotations += 1
+            self._open(f"{self.path}.{self.rotations}")
+        sec = int(timestamp)
+        self._file.write(struct.pack("<IIII", sec, int((timestamp - sec) * 1e6), len(data), orig_len))
+        self._file.write(data)
+        self._written += 16 + len(data)
+
+    def close(self):
+        self._file.close()
+
+
+class StreamingCapture:
+    """
+    Raw-frame capture through an AF_PACKET socket with an optional kernel BPF
+    filter (Linux only). Frames are read with recv_into straight into a
+    preallocated ring of `ring_slots` x `snaplen` bytes, headers are parsed
+    in place, and rolling aggregates (top talkers, ports, protocols) are kept
+    instead of packet objects, so memory stays constant at any capture length.
+    Frames can optionally be spilled to a pcap file as they arrive.
+    """
+
+    def __init__(
+        self,
+        iface: Optional[str] = None,
+        filter_expr: str = "",
+        ring_slots: int = 4096,
+        snaplen: int = 256,
+        pcap_path: Optional[str] = None,
+        pcap_max_bytes: int = 0,
+        max_keys: int = 65536,
+    ):
+        self.iface = iface
+        self.filter_expr = filter_expr
+        self.ring_slots = ring_slots
+        self.snaplen = snaplen
+        self.max_keys = max_keys
+        self.ring = bytearray(ring_slots * snaplen)
+        self.lengths = array("I", [0] * ring_slots)
+        self.timestamps = array("d", [0.0] * ring_slots)
+        self.head = 0
+        self.packets = 0
+        self.bytes = 0
+        self.kernel_drops = 0
+        self.talkers: Counter = Counter()
+        self.ports: Counter = Counter()
+        self.protocols: Counter = Counter()
+        self.started_at: Optional[float] = None
+        self.elapsed = 0.0
+        self.pcap_path = pcap_path
+        self.pcap_max_bytes = pcap_max_bytes
+        self.pcap: Optional[PcapWriter] = None
+
+    def _open_socket(self) -> socket.socket:
+        if not hasattr(socket, "AF_PACKET"):
+            raise OSError("Streaming capture requires Linux AF_PACKET sockets.")
+        sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+        if self.filter_expr:
+            attach_bpf(sock, compile_bpf(self.filter_expr, self.iface))
+        if self.iface:
+            sock.bind((self.iface, 0))
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+        sock.settimeout(0.2)
+        return sock
+
+    def _record(self, view: memoryview, caplen: int, orig_len: int, timestamp: float):
+        self.packets += 1
+        self.bytes += orig_len
+        proto, src, dst, sport, dport = parse_frame(view, caplen)
+        self.protocols[proto] += 1
+        if src is not None:
+            self._bump(self.talkers, src, orig_len)
+            self._bump(self.talkers, dst, orig_len)
+        if dport is not None:
+            self._bump(self.ports, f"{proto}/{min(sport, dport)}", 1)
+        if self.pcap:
+            self.pcap.write(timestamp, view[:caplen], orig_len)
+
+    def _bump(self, counter: Counter, key, amount: int):
+        counter[key] += amount
+        if len(counter) > self.max_keys:
+            # Keep aggregates bounded: drop the lower half (space-saving style).
+            for k, _ in counter.most_common()[self.max_keys // 2:]:
+                del counter[k]
+
+    def run(self, count: int = 0, duration: Optional[float] = None):
+        """Capture until `count` packets (0 = unlimited) or `duration` seconds elapse."""
+        sock = self._open_socket()
+        if self.pcap_path:
+            # Only create the pcap once capturing can start, so a failed socket leaves no empty file.
+            try:
+                self.pcap = PcapWriter(self.pcap_path, snaplen=self.snaplen, max_bytes=self.pcap_max_bytes)
+            except OSError:
+                sock.close()
+                raise
+        view = memoryview(self.ring)
+        start = self.started_at = time.time()
+        deadline = None if duration is None else time.monotonic() + duration
+        flags = socket.MSG_TRUNC
+        try:
+            while (not count or self.packets < count) and (deadline is None or time.monotonic() < deadline):
+                slot = self.head
+                offset = slot * self.snaplen
+                try:
+                    orig_len = sock.recv_into(view[offset:offset + self.snaplen], self.snaplen, flags)
+                except socket.timeout:
+                    continue
+                timestamp = time.time()
+                caplen = min(orig_len, self.snaplen)
+                self.lengths[slot] = orig_len
+                self.timestamps[slot] = timestamp
+                self.head = (slot + 1) % self.ring_slots
+                self._record(view[offset:offset + caplen], caplen, orig_len, timestamp)
+        finally:
+            self.elapsed = time.time() - start
+            self._read_drops(sock)
+            sock.close()
+            view.release()
+            if self.pcap:
+                self.pcap.close()
+        return self
+
+    def _read_drops(self, sock: socket.socket):
+        try:
+            _, drops = struct.unpack("II", sock.getsockopt(SOL_PACKET, PACKET_STATISTICS, 8))
+            self.kernel_drops += drops
+        except OSError:
+            pass
+
+    def recent(self, n: int = 10) -> List[Dict]:
+        """Parsed headers of the last `n` frames still held in the ring."""
+        n = min(n, self.packets, self.ring_slots)
+        out = []
+        for i in range(n):
+            slot = (self.head - n + i) % self.ring_slots
+            offset = slot * self.snaplen
+            caplen = min(self.lengths[slot], self.snaplen)
+            proto, src, dst, sport, dport = parse_frame(memoryview(self.ring)[offset:offset + caplen], caplen)
+            out.append({"time": self.timestamps[slot], "length": self.lengths[slot], "proto": proto,
+                        "src": src, "dst": dst, "sport": sport, "dport": dport})
+        return out
+
+    def stats(self, top: int = 10) -> Dict:
+        return {
+            "packets": self.packets,
+            "bytes": self.bytes,
+            "kernel_drops": self.kernel_drops,
+            "seconds": round(self.elapsed, 3),
+            "pps": round(self.packets / self.elapsed, 1) if self.elapsed else 0.0,
+            "top_talkers": self.talkers.most_common(top),
+            "top_ports": self.ports.most_common(top),
+            "protocols": dict(self.protocols.most_common()),
+        }
+
+
+def format_capture_stats(stats: Dict) -> str:
+    """Render capture aggregates as plain text."""
+    lines = [
+        f"Captured {stats['packets']} packets ({stats['bytes']} bytes) in {stats['seconds']}s "
+        f"({stats['pps']} pps, {stats['kernel_drops']} dropped by kernel)",
+        "Protocols: " + (", ".join(f"{p}={n}" for p, n in stats["protocols"].items()) or "none"),
+        "Top talkers (bytes):",
+    ]
+    lines += [f"  {addr}: {n}" for addr, n in stats["top_talkers"]] or ["  none"]
+    lines.append("Top ports (packets):")
+    lines += [f"  {port}: {n}" for port, n in stats["top_ports"]] or ["  none"]
+    return "\n".join(lines)
@@ -0,0 +1,262 @@
+import ipaddress
+import select
+import socket
+import struct
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TRACE_DST_PORT = 33434
+ICMP_DEST_UNREACH = 3
+ICMP_TIME_EXCEEDED = 11
+ICMP_PORT_UNREACH = 3
+# Traceroute's annotations for destination-unreachable codes other than "port".
+UNREACH_ANNOTATIONS = {0: "!N", 1: "!H", 2: "!P", 4: "!F", 5: "!S", 6: "!N", 7: "!H", 9: "!X", 10: "!X", 13: "!X"}
+
+Reply = Tuple[str, float, bool, Optional[str]]
+
+
+def parse_icmp_error(packet: bytes) -> Optional[Tuple[int, int, str, int, int]]:
+    """
+    Parse an ICMP time-exceeded / destination-unreachable packet read from a
+    raw IPv4 socket.
+
+    Returns:
+        tuple: (icmp_type, icmp_code, quoted_dst, quoted_udp_sport, quoted_udp_len)
+        or None if the packet does not quote a UDP probe.
+    """
+    if len(packet) < 20:
+        return None
+    ihl = (packet[0] & 0x0F) * 4
+    icmp = packet[ihl:]
+    if len(icmp) < 8 + 20 + 8 or icmp[0] not in (ICMP_TIME_EXCEEDED, ICMP_DEST_UNREACH):
+        return None
+    inner = icmp[8:]
+    inner_ihl = (inner[0] & 0x0F) * 4
+    if inner[9] != socket.IPPROTO_UDP or len(inner) < inner_ihl + 8:
+        return None
+    quoted_dst = socket.inet_ntoa(inner[16:20])
+    sport, _dport, udp_len = struct.unpack("!HHH", inner[inner_ihl:inner_ihl + 6])
+    return icmp[0], icmp[1], quoted_dst, sport, udp_len
+
+
+def reply_status(icmp_type: int, icmp_code: int, hop: str, dst: str) -> Tuple[bool, Optional[str]]:
+    """
+    Classify an ICMP reply to a probe of `dst` sent from `hop`. Only a port
+    unreachable from the destination itself means it was reached; any other
+    unreachable ends the trace at `hop` with a traceroute-style annotation.
+
+    Returns:
+        tuple: (reached, annotation), annotation being None unless the path was cut off
+    """
+    if icmp_type != ICMP_DEST_UNREACH:
+        return False, None
+    if icmp_code == ICMP_PORT_UNREACH and hop == dst:
+        return True, None
+    return False, UNREACH_ANNOTATIONS.get(icmp_code, f"!<{icmp_code}>")
+
+
+class HopCache:
+    """
+    Cache of traced paths. Hops shared by every path seen so far (the local
+    gateway and upstream provider, typically) are not probed again, and targets
+    in a /24 that was already traced only probe the tail of the path. Cached
+    destinations and the last hops before them are never reused, and the
+    prefix is only spliced in once a live probe of its last hop confirms it.
+    """
+
+    TAIL_HOPS = 3
+
+    def __init__(self):
+        self.paths: Dict[str, List[Optional[str]]] = {}
+
+    def add(self, address: str, hops: List[Optional[str]]):
+        self.paths[address] = hops
+
+    def _head(self, address: str, hops: List[Optional[str]]) -> List[Optional[str]]:
+        """The part of a cached path that may be reused: no tail, no destination."""
+        head = list(hops[:-self.TAIL_HOPS])
+        if address in head:
+            head = head[:head.index(address)]
+        while head and head[-1] is None:
+            head.pop()
+        return head
+
+    def shared_prefix(self) -> List[str]:
+        """Hops (from TTL 1) identical across all cached paths; needs at least two paths."""
+        if len(self.paths) < 2:
+            return []
+        heads = [self._head(address, hops) for address, hops in self.paths.items()]
+        prefix = []
+        for hops in zip(*heads):
+            if hops[0] is None or any(h != hops[0] for h in hops):
+                break
+            prefix.append(hops[0])
+        return prefix
+
+    def prefix_for(self, address: str) -> List[Optional[str]]:
+        """Best cached path prefix to splice in front of a probe of `address`."""
+        network = ipaddress.ip_network(f"{address}/24", strict=False)
+        for cached, hops in self.paths.items():
+            if cached != address and ipaddress.ip_address(cached) in network:
+                head = self._head(cached, hops)
+                if head:
+                    return [h for h in head if h != address]
+        return [h for h in self.shared_prefix() if h != address]
+
+
+class ParisTraceroute:
+    """
+    Multi-destination UDP traceroute. All TTLs for all targets are sent at
+    once from one socket with a constant 5-tuple per destination (Paris
+    traceroute style, so ECMP load balancers keep each probe on one path).
+    Probes are told apart by UDP length, which the ICMP error quotes back.
+    Requires a raw ICMP socket (root / CAP_NET_RAW) to read the replies.
+    """
+
+    def __init__(self, max_hops: int = 30, timeout: float = 2.0, pps: int = 2000, cache: HopCache = None):
+        self.max_hops = max_hops
+        self.timeout = timeout
+        self.pps = pps
+        self.cache = cache if cache is not None else HopCache()
+
+    def _probe(self, targets: Dict[str, Iterable[int]]) -> Dict[str, Dict[int, Reply]]:
+        """Send one probe per (address, ttl) and collect {address: {ttl: (hop, rtt_ms, reached, annotation)}}."""
+        recv_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            send_sock.bind(("", 0))
+            sport = send_sock.getsockname()[1]
+            sent_at: Dict[Tuple[str, int], float] = {}
+            replies: Dict[str, Dict[int, Reply]] = {a: {} for a in targets}
+            outstanding = sum(len(ttls) for ttls in targets.values())
+            probes = [(a, ttl) for a, ttls in targets.items() for ttl in ttls]
+            gap = 1.0 / self.pps if self.pps else 0.0
+
+            def drain(deadline: float):
+                while True:
+                    wait = deadline - time.perf_counter()
+                    if wait <= 0 or not select.select([recv_sock], [], [], wait)[0]:
+                        return
+                    packet, _ = recv_sock.recvfrom(65535)
+                    now = time.perf_counter()
+                    parsed = parse_icmp_error(packet)
+                    if parsed is None:
+                        continue
+                    icmp_type, icmp_code, dst, probe_sport, udp_len = parsed
+                    ttl = udp_len - 8
+                    if probe_sport != sport or (dst, ttl) not in sent_at or ttl in replies[dst]:
+                        continue
+                    hop = socket.inet_ntoa(packet[12:16])
+                    rtt = (now - sent_at[(dst, ttl)]) * 1000.0
+                    replies[dst][ttl] = (hop, round(rtt, 3), *reply_status(icmp_type, icmp_code, hop, dst))
+
+            for address, ttl in probes:
+                send_sock.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, ttl)
+                sent_at[(address, ttl)] = time.perf_counter()
+                try:
+                    send_sock.sendto(b"\x00" * ttl, (address, TRACE_DST_PORT))
+                except OSError:
+                    pass
+                if gap:
+                    drain(time.perf_counter() + gap)
+
+            deadline = time.perf_counter() + self.timeout
+            while time.perf_counter() < deadline:
+                if sum(len(r) for r in replies.values()) >= outstanding or all(
+                    self._complete(replies[a], targets[a]) for a in targets
+                ):
+                    break
+                drain(min(deadline, time.perf_counter() + 0.05))
+            return replies
+        finally:
+            recv_sock.close()
+            send_sock.close()
+
+    @staticmethod
+    def _terminal(replies: Dict[int, Reply]) -> Optional[int]:
+        """First TTL that ended the path: the destination, or an annotated unreachable."""
+        return min((ttl for ttl, (_, _, done, note) in replies.items() if done or note), default=None)
+
+    @classmethod
+    def _complete(cls, replies: Dict[int, Reply], planned: Iterable[int]) -> bool:
+        """True once the path ended and every planned TTL before the end answered too."""
+        last = cls._terminal(replies)
+        return last is not None and all(t in replies for t in planned if t <= last)
+
+    def trace_many(self, targets: Iterable[str]) -> List[Dict]:
+        """
+        Trace the route to every target concurrently.
+
+        Returns:
+            list: One dict per target with `hops` (ttl, address, rtt_ms, cached,
+            annotation) and `reached`.
+        """
+        targets = list(dict.fromkeys(targets))
+        addresses: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        for target in targets:
+            try:
+                addresses[target] = socket.gethostbyname(target)
+            except socket.gaierror as e:
+                errors[target] = f"Could not resolve {target}: {e}"
+
+        # First pass: skip TTLs covered by a cached prefix, but probe its last hop.
+        prefixes = {a: self.cache.prefix_for(a)[: self.max_hops - 1] for a in set(addresses.values())}
+        plan = {a: range(max(len(p), 1), self.max_hops + 1) for a, p in prefixes.items()}
+        replies = self._probe(plan)
+
+        # Second pass: re-probe the prefix unless its last hop answered as cached.
+        retry = {}
+        for address, prefix in prefixes.items():
+            if not prefix:
+                continue
+            boundary = replies[address].get(len(prefix))
+            if boundary is None or boundary[2] or boundary[3] or boundary[0] != prefix[-1]:
+                retry[address] = range(1, len(prefix))
+                prefixes[address] = []
+        if retry:
+            for address, extra in self._probe(retry).items():
+                replies[address].update(extra)
+
+        results = []
+        for target in targets:
+            if target in errors:
+                results.append({"target": target, "address": None, "hops": [], "reached": False, "error": errors[target]})
+                continue
+            address = addresses[target]
+            hops, reached = self._assemble(prefixes[address], replies[address])
+            self.cache.add(address, [h["address"] for h in hops])
+            results.append({"target": target, "address": address, "hops": hops, "reached": reached})
+        return results
+
+    def _assemble(self, prefix: List[Optional[str]], replies: Dict[int, Reply]):
+        terminal = self._terminal(replies)
+        last = terminal if terminal is not None else max(replies, default=len(prefix))
+        hops = []
+        for ttl in range(1, last + 1):
+            if ttl <= len(prefix) and ttl not in replies:
+                hops.append({"ttl": ttl, "address": prefix[ttl - 1], "rtt_ms": None, "cached": True, "annotation": None})
+            elif ttl in replies:
+                hop, rtt, _, note = replies[ttl]
+                hops.append({"ttl": ttl, "address": hop, "rtt_ms": rtt, "cached": False, "annotation": note})
+            else:
+                hops.append({"ttl": ttl, "address": None, "rtt_ms": None, "cached": False, "annotation": None})
+        return hops, terminal is not None and replies[terminal][2]
+
+
+def format_trace(result: Dict) -> str:
+    """Render one traceroute result in the skill's "Hop N: addr" style."""
+    lines = [f"Traceroute to {result['target']}:"]
+    if result.get("error"):
+        lines.append(result["error"])
+    for hop in result["hops"]:
+        if hop["address"] is None:
+            lines.append(f"Hop {hop['ttl']}: *")
+        elif hop["cached"]:
+            lines.append(f"Hop {hop['ttl']}: {hop['address']} (cached)")
+        else:
+            note = f" {hop['annotation']}" if hop.get("annotation") else ""
+            lines.append(f"Hop {hop['ttl']}: {hop['address']} {hop['rtt_ms']} ms{note}")
+    if result["hops"] and not result["reached"]:
+        lines.append("Destination not reached.")
+    return "\n".join(lines)
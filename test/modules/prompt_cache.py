@@ -0,0 +1,131 @@
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+PLACEHOLDER = re.compile(r"{{([\w-]+)}}")
+
+
+class FileCache:
+    """
+    File contents cached on (mtime_ns, size). Unchanged files are served from
+    memory after one stat; files that only grew (appended scratchpads, logs)
+    are extended by decoding just the new bytes, after checking that a hash of
+    everything before the old end still matches what was cached.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[int, int, str, "hashlib.blake2b"]] = {}
+        self._lock = threading.Lock()
+        self.reads = 0
+
+    def version(self, path: str) -> Tuple[int, int]:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+
+    def read(self, path: str) -> str:
+        """
+        Current contents of `path`.
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        key = os.path.abspath(path)
+        mtime, size = self.version(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[:2] == (mtime, size):
+                return entry[2]
+            text, digest = self._load(key, entry, size)
+            self._entries[key] = (mtime, size, text, digest)
+            return text
+
+    def _load(self, path: str, entry, size: int) -> Tuple[str, "hashlib.blake2b"]:
+        with open(path, "rb") as f:
+            if entry is not None and size > entry[1]:
+                old_size, old_text, old_digest = entry[1], entry[2], entry[3]
+                digest = hashlib.blake2b(f.read(old_size))
+                if digest.digest() == old_digest.digest():
+                    added = f.read()
+                    try:
+                        text = old_text + added.decode("utf-8")
+                    except UnicodeDecodeError:
+                        pass
+                    else:
+                        self.reads += 1
+                        digest.update(added)
+                        return text, digest
+                f.seek(0)
+            data = f.read()
+        self.reads += 1
+        return data.decode("utf-8"), hashlib.blake2b(data)
+
+
+class PromptTemplate:
+    """
+    A template precompiled into literal and `{{placeholder}}` segments, so
+    rendering is one join instead of a full-text scan per placeholder (and
+    values containing `{{...}}` are never substituted twice).
+    """
+
+    def __init__(self, text: str):
+        self.segments: List[Union[str, Tuple[str]]] = []
+        pos = 0
+        for match in PLACEHOLDER.finditer(text):
+            if match.start() > pos:
+                self.segments.append(text[pos:match.start()])
+            self.segments.append((match.group(1),))
+            pos = match.end()
+        if pos < len(text):
+            self.segments.append(text[pos:])
+        self.placeholders = [s[0] for s in self.segments if isinstance(s, tuple)]
+
+    def render(self, values: Dict[str, str]) -> str:
+        """Fill every placeholder; missing values render as empty strings."""
+        return "".join(values.get(s[0], "") if isinstance(s, tuple) else s for s in self.segments)
+
+
+class PromptLoader:
+    """Compiled templates and file contents, refreshed only when files change."""
+
+    def __init__(self, files: Optional[FileCache] = None):
+        self.files = files or FileCache()
+        self._templates: Dict[str, Tuple[Tuple[int, int], PromptTemplate]] = {}
+        self._blocks: Dict[Tuple, str] = {}
+
+    def template(self, path: str) -> PromptTemplate:
+        version = self.files.version(path)
+        cached = self._templates.get(path)
+        if cached is None or cached[0] != version:
+            cached = (version, PromptTemplate(self.files.read(path)))
+            self._templates[path] = cached
+        return cached[1]
+
+    def read(self, path: str) -> str:
+        return self.files.read(path)
+
+    def context_block(self, paths: Sequence[str]) -> str:
+        """`<context name=...>` wrapper around each file, rebuilt only when one changes."""
+        key = tuple((p, self.files.version(p)) for p in paths)
+        block = self._blocks.get(key)
+        if block is None:
+            block = "".join(
+                f'\t<context name="{os.path.basename(p)}">\n{self.files.read(p)}\n</context>\n\n' for p in paths
+            )
+            self._blocks = {key: block}
+        return block
+
+    def render(self, path: str, values: Dict[str, str]) -> str:
+        return self.template(path).render(values)
+
+
+_loader: Optional[PromptLoader] = None
+
+
+def get_prompt_loader() -> PromptLoader:
+    """Process-wide PromptLoader."""
+    global _loader
+    if _loader is None:
+        _loader = PromptLoader()
+    return _loader
@@ -0,0 +1,243 @@
+import asyncio
+import importlib
+import threading
+import time
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple, Type
+
+Messages = List[Dict[str, str]]
+
+DEFAULT_BRAIN = "deepseek-v3"
+
+_DONE = object()
+
+
+class Provider:
+    """
+    One LLM backend behind a common interface.
+
+    The SDK module is imported on first use, and the module keeps a single
+    long-lived client (see its `_get_client`/`_get_model`), so after
+    `warm()` a request goes straight to the pooled connection. The async
+    methods run the sync client on a worker thread rather than opening a
+    second connection pool.
+    """
+
+    name = ""
+    module_name = ""
+    label = ""
+
+    def __init__(self, model: Optional[str] = None):
+        self.model = model
+        self._module = None
+
+    @property
+    def module(self):
+        if self._module is None:
+            try:
+                self._module = importlib.import_module(self.module_name)
+            except ImportError as e:
+                raise ImportError(f"{self.label} provider not available (missing dependency).") from e
+        return self._module
+
+    def _kwargs(self, system_prompt: Optional[str]) -> Dict:
+        kwargs = {}
+        if self.model:
+            kwargs["model"] = self.model
+        if system_prompt is not None:
+            kwargs["system_prompt"] = system_prompt
+        return kwargs
+
+    def warm(self):
+        """Import the SDK and build the client now instead of on the first request."""
+        if hasattr(self.module, "_get_client"):
+            self.module._get_client()
+
+    def chat(self, messages: Messages, system_prompt: Optional[str] = None) -> str:
+        return self.module.conversational_prompt(messages, **self._kwargs(system_prompt))
+
+    def stream(self, messages: Messages, system_prompt: Optional[str] = None) -> Iterator[str]:
+        return self.module.stream_conversational_prompt(messages, **self._kwargs(system_prompt))
+
+    def prefix(self, prompt: str, prefix: str, no_prefix: bool = False) -> str:
+        """
+        Completion constrained to start with `prefix`; returns 'prefix + response',
+        or just the response with `no_prefix`.
+        """
+        kwargs = {"model": self.model} if self.model else {}
+        response = self.module.prefix_prompt(prompt=prompt, prefix=prefix, **kwargs)
+        # Providers without native prefix completion echo the prefix (or not).
+        if response.startswith(prefix):
+            response = response[len(prefix):]
+        return response if no_prefix else prefix + response
+
+    async def achat(self, messages: Messages, system_prompt: Optional[str] = None) -> str:
+        return await asyncio.to_thread(self.chat, messages, system_prompt)
+
+    async def aprefix(self, prompt: str, prefix: str, no_prefix: bool = False) -> str:
+        return await asyncio.to_thread(self.prefix, prompt, prefix, no_prefix)
+
+    async def astream(self, messages: Messages, system_prompt: Optional[str] = None) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        tokens: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(tokens.put_nowait, item)
+            except RuntimeError:  # the loop is closed, nobody is reading any more
+                stop.set()
+
+        def pump():
+            stream = self.stream(messages, system_prompt)
+            try:
+                for token in stream:
+                    if stop.is_set():
+                        break
+                    put(token)
+            except BaseException as e:
+                put(e)
+            finally:
+                close_stream(stream)
+                put(_DONE)
+
+        pumping = loop.run_in_executor(None, pump)
+        try:
+            while True:
+                token = await tokens.get()
+                if token is _DONE:
+                    break
+                if isinstance(token, BaseException):
+                    raise token
+                yield token
+            await pumping
+        finally:
+            # Closed or cancelled early: the pump stops reading and closes the stream.
+            stop.set()
+
+
+def close_stream(stream):
+    """Close a token iterator (and the SDK response behind it) if it supports closing."""
+    close = getattr(stream, "close", None)
+    if close is not None:
+        close()
+
+
+class DeepSeekProvider(Provider):
+    name, module_name, label = "deepseek", "modules.deepseek", "DeepSeek"
+
+    def prefix(self, prompt: str, prefix: str, no_prefix: bool = False) -> str:
+        # Native prefix completion: the response continues the prefix.
+        kwargs = {"model": self.model} if self.model else {}
+        return self.module.prefix_prompt(prompt=prompt, prefix=prefix, no_prefix=no_prefix, **kwargs)
+
+
+class GeminiProvider(Provider):
+    name, module_name, label = "gemini", "modules.gemini", "Gemini"
+
+    def warm(self):
+        self.module._get_model(self.model or self.module.GEMINI_MODEL)
+
+
+class MistralProvider(Provider):
+    name, module_name, label = "mistral", "modules.mistral", "Mistral"
+
+
+class GroqProvider(Provider):
+    name, module_name, label = "groq", "modules.groq", "Groq"
+
+
+class OllamaProvider(Provider):
+    name, module_name, label = "ollama", "modules.ollama", "Ollama"
+
+    def prefix(self, prompt: str, prefix: str, no_prefix: bool = False) -> str:
+        system_prompt = f"You must always begin your response with the following prefix: '{prefix}'.\n"
+        response = self.chat([{"role": "user", "content": prompt}], system_prompt=system_prompt)
+        if response.startswith(prefix):
+            response = response[len(prefix):]
+        return response if no_prefix else prefix + response
+
+
+class FakeProvider(Provider):
+    """
+    Offline provider for tests and benchmarks. `fake:<ms>` answers after that
+    many milliseconds; `reply`, `first_token` (seconds to the first streamed
+    token) and `error` (raised instead of answering) can be set directly.
+    """
+
+    name, label = "fake", "Fake"
+
+    def __init__(self, model: Optional[str] = None, reply: str = "ok", error: Optional[BaseException] = None):
+        super().__init__(model)
+        self.latency = float(model) / 1000 if model and model.replace(".", "", 1).isdigit() else 0.0
+        self.first_token: Optional[float] = None
+        self.reply = reply
+        self.error = error
+        self.calls = 0
+
+    def warm(self):
+        pass
+
+    def _answer(self, delay: float) -> str:
+        self.calls += 1
+        time.sleep(delay)
+        if self.error is not None:
+            raise self.error
+        return self.reply
+
+    def chat(self, messages: Messages, system_prompt: Optional[str] = None) -> str:
+        return self._answer(self.latency)
+
+    def stream(self, messages: Messages, system_prompt: Optional[str] = None) -> Iterator[str]:
+        first = self.latency if self.first_token is None else self.first_token
+        words = self._answer(first).split(" ")
+        rest = max(self.latency - first, 0.0) / max(len(words) - 1, 1)
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(rest)
+            yield word if i == 0 else " " + word
+
+    def prefix(self, prompt: str, prefix: str, no_prefix: bool = False) -> str:
+        response = self._answer(self.latency)
+        return response if no_prefix else f"{prefix} {response}"
+
+
+PROVIDERS: Dict[str, Type[Provider]] = {}
+_instances: Dict[str, Provider] = {}
+_lock = threading.Lock()
+
+
+def register_provider(cls: Type[Provider]) -> Type[Provider]:
+    """Make `cls` selectable as a brain by its name (usable as a decorator)."""
+    PROVIDERS[cls.name] = cls
+    return cls
+
+
+for _cls in (DeepSeekProvider, GeminiProvider, MistralProvider, GroqProvider, OllamaProvider, FakeProvider):
+    register_provider(_cls)
+
+
+def parse_brain(brain: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a brain setting into (provider name, model). `ollama:<model>` and
+    `<provider>:<model>` select a model; other names match providers by
+    prefix (`deepseek-v3`, `gemini`) and fall back to DeepSeek as before.
+    """
+    brain = (brain or DEFAULT_BRAIN).strip()
+    name, _, model = brain.partition(":")
+    for provider in PROVIDERS:
+        if name.startswith(provider):
+            return provider, model or None
+    return "deepseek", None
+
+
+def get_provider(brain: str) -> Provider:
+    """The process-wide Provider for a brain setting such as 'groq' or 'ollama:phi4'."""
+    provider = _instances.get(brain)
+    if provider is None:
+        name, model = parse_brain(brain)
+        with _lock:
+            provider = _instances.get(brain)
+            if provider is None:
+                provider = PROVIDERS[name](model)
+                _instances[brain] = provider
+    return provider
@@ -0,0 +1,336 @@
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from modules.conversation_memory import estimate_tokens
+from modules.metrics import get_metrics
+from modules.providers import Messages, Provider, close_stream, get_provider
+
+HEDGE_AFTER_MS = 800
+LOCAL_MAX_TOKENS = 400
+EWMA_ALPHA = 0.2
+ERROR_THRESHOLD = 0.5
+RETRY_AFTER = 30.0
+
+_DONE = object()
+
+
+class ProviderStats:
+    """Exponentially weighted latency (seconds) and error rate of one provider."""
+
+    def __init__(self, alpha: float = EWMA_ALPHA):
+        self.alpha = alpha
+        self.latency: Optional[float] = None
+        self.errors = 0.0
+        self.requests = 0
+        self.last_error = 0.0
+        self._lock = threading.Lock()
+
+    def success(self, latency: float):
+        with self._lock:
+            self.requests += 1
+            self.latency = latency if self.latency is None else self.alpha * latency + (1 - self.alpha) * self.latency
+            self.errors = (1 - self.alpha) * self.errors
+
+    def failure(self):
+        with self._lock:
+            self.requests += 1
+            self.errors = self.alpha + (1 - self.alpha) * self.errors
+            self.last_error = time.monotonic()
+
+    @property
+    def healthy(self) -> bool:
+        # A failing provider gets another chance after RETRY_AFTER seconds.
+        return self.errors < ERROR_THRESHOLD or time.monotonic() - self.last_error > RETRY_AFTER
+
+    def as_dict(self) -> Dict:
+        return {"latency": self.latency, "errors": round(self.errors, 3), "requests": self.requests}
+
+
+class Router(Provider):
+    """
+    A brain made of several providers, used like a single one.
+
+    Requests go to the first candidate; if it has not answered (or streamed
+    its first token) within `hedge_after` seconds, or fails, the next one is
+    started as well, and the first good answer wins. Candidates are the
+    primary followed by the fallbacks, with providers whose error EWMA is
+    above ERROR_THRESHOLD moved to the back. Prompts of at most
+    `local_max_tokens` (acknowledgements, short chats) go to `local` first;
+    `local` is also the last resort for everything else.
+    """
+
+    name, label = "router", "Router"
+
+    def __init__(
+        self,
+        primary: Provider,
+        fallbacks: Sequence[Provider] = (),
+        local: Optional[Provider] = None,
+        hedge_after: float = HEDGE_AFTER_MS / 1000,
+        local_max_tokens: int = LOCAL_MAX_TOKENS,
+        logger=None,
+    ):
+        super().__init__()
+        self.primary = primary
+        self.fallbacks = list(fallbacks)
+        self.local = local
+        self.hedge_after = hedge_after
+        self.local_max_tokens = local_max_tokens
+        self.logger = logger
+        self.stats: Dict[int, ProviderStats] = {}
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="router")
+
+    def _stats(self, provider: Provider) -> ProviderStats:
+        return self.stats.setdefault(id(provider), ProviderStats())
+
+    @staticmethod
+    def _label(provider: Provider) -> str:
+        return f"{provider.name}:{provider.model}" if provider.model else provider.name
+
+    def candidates(self, prompt_tokens: int) -> List[Provider]:
+        order = [self.primary] + self.fallbacks
+        if self.local is not None:
+            small = prompt_tokens <= self.local_max_tokens
+            order = [self.local] + order if small else order + [self.local]
+        unique = list(dict.fromkeys(order))
+        return sorted(unique, key=lambda p: not self._stats(p).healthy)
+
+    def report(self) -> Dict[str, Dict]:
+        """Stats per provider, by '<name>[:<model>]'."""
+        providers = list(dict.fromkeys([self.primary] + self.fallbacks + ([self.local] if self.local else [])))
+        return {self._label(p): self._stats(p).as_dict() for p in providers}
+
+    def warm(self):
+        for provider in self.candidates(self.local_max_tokens + 1):
+            try:
+                provider.warm()
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning(f"⚠️ Could not initialize {provider.label} provider: {e}")
+
+    # Hedged calls
+
+    def _call(
+        self,
+        provider: Provider,
+        call: Callable[[Provider], str],
+        prompt_tokens: int,
+        settled: Optional[threading.Event] = None,
+    ) -> str:
+        """Call one provider and record it; once `settled` is set (another call won) nothing is recorded."""
+        stats, metrics, label = self._stats(provider), get_metrics(), self._label(provider)
+        metrics.inc("llm_prompt_tokens_total", prompt_tokens, provider=label)
+        start = time.perf_counter()
+        try:
+            result = call(provider)
+        except Exception:
+            if settled is not None and settled.is_set():
+                raise
+            stats.failure()
+            metrics.inc("llm_errors_total", provider=label)
+            raise
+        if settled is not None and settled.is_set():
+            return result
+        elapsed = time.perf_counter() - start
+        stats.success(elapsed)
+        metrics.observe("llm_seconds", elapsed, provider=label)
+        metrics.inc("llm_completion_tokens_total", estimate_tokens(result), provider=label)
+        return result
+
+    def _stream(
+        self,
+        provider: Provider,
+        messages: Messages,
+        system_prompt: Optional[str],
+        prompt_tokens: int,
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[str]:
+        """
+        Stream from one provider and record it. Closing this generator, or
+        setting `cancel` (another stream won), closes the provider's stream
+        and records nothing further.
+        """
+        def cancelled() -> bool:
+            return cancel is not None and cancel.is_set()
+
+        stats, metrics, label = self._stats(provider), get_metrics(), self._label(provider)
+        metrics.inc("llm_prompt_tokens_total", prompt_tokens, provider=label)
+        start = time.perf_counter()
+        first = True
+        parts = []
+        stream = provider.stream(messages, system_prompt)
+        try:
+            for token in stream:
+                if cancelled():
+                    return
+                if first:
+                    first = False
+                    stats.success(time.perf_counter() - start)
+                    metrics.observe("llm_first_token_seconds", time.perf_counter() - start, provider=label)
+                parts.append(token)
+                yield token
+        except Exception:
+            if cancelled():
+                raise
+            if first:
+                stats.failure()
+            metrics.inc("llm_errors_total", provider=label)
+            raise
+        finally:
+            close_stream(stream)
+        if cancelled():
+            return
+        if first:
+            stats.success(time.perf_counter() - start)
+        metrics.observe("llm_seconds", time.perf_counter() - start, provider=label)
+        metrics.inc("llm_completion_tokens_total", estimate_tokens("".join(parts)), provider=label)
+
+    def _hedged(self, call: Callable[[Provider], str], prompt_tokens: int) -> str:
+        candidates = self.candidates(prompt_tokens)
+        if len(candidates) == 1:
+            return self._call(candidates[0], call, prompt_tokens)
+        pending = {}
+        error: Optional[BaseException] = None
+        settled = threading.Event()
+
+        def launch():
+            provider = candidates.pop(0)
+            pending[self._executor.submit(self._call, provider, call, prompt_tokens, settled)] = provider
+
+        launch()
+        try:
+            while pending:
+                done, _ = wait(pending, timeout=self.hedge_after if candidates else None, return_when=FIRST_COMPLETED)
+                if not done:
+                    if self.logger:
+                        self.logger.info(f"⏱️ No answer after {self.hedge_after:.2f}s, also asking {candidates[0].label}")
+                    launch()
+                    continue
+                for future in done:
+                    provider = pending.pop(future)
+                    try:
+                        return future.result()
+                    except Exception as e:
+                        error = e
+                        if self.logger:
+                            self.logger.warning(f"⚠️ {provider.label} failed: {e}")
+                if candidates:
+                    launch()
+            raise error
+        finally:
+            # Losing requests that have not started are dropped; running ones are no longer counted.
+            settled.set()
+            for future in pending:
+                future.cancel()
+
+    def chat(self, messages: Messages, system_prompt: Optional[str] = None) -> str:
+        tokens = estimate_tokens("".join(m["content"] for m in messages) + (system_prompt or ""))
+        return self._hedged(lambda p: p.chat(messages, system_prompt), tokens)
+
+    def prefix(self, prompt: str, prefix: str, no_prefix: bool = False) -> str:
+        return self._hedged(lambda p: p.prefix(prompt, prefix, no_prefix), estimate_tokens(prompt))
+
+    def stream(self, messages: Messages, system_prompt: Optional[str] = None) -> Iterator[str]:
+        """Hedged on the first token; once a provider has streamed one, the reply is its."""
+        prompt_tokens = estimate_tokens("".join(m["content"] for m in messages) + (system_prompt or ""))
+        candidates = self.candidates(prompt_tokens)
+        if len(candidates) == 1:
+            yield from self._stream(candidates[0], messages, system_prompt, prompt_tokens)
+            return
+        items: "queue.Queue[Tuple[Provider, object]]" = queue.Queue()
+        cancels: Dict[Provider, threading.Event] = {}
+        running = 0
+
+        def pump(provider: Provider, cancel: threading.Event):
+            stream = self._stream(provider, messages, system_prompt, prompt_tokens, cancel)
+            try:
+                for token in stream:
+                    if cancel.is_set():
+                        return
+                    items.put((provider, token))
+            except Exception as e:
+                items.put((provider, e))
+                return
+            finally:
+                stream.close()
+            items.put((provider, _DONE))
+
+        def launch():
+            nonlocal running
+            running += 1
+            provider = candidates.pop(0)
+            cancels[provider] = threading.Event()
+            threading.Thread(target=pump, args=(provider, cancels[provider]), daemon=True, name="router-stream").start()
+
+        launch()
+        winner: Optional[Provider] = None
+        try:
+            while True:
+                try:
+                    provider, item = items.get(timeout=self.hedge_after if candidates and winner is None else None)
+                except queue.Empty:
+                    launch()
+                    continue
+                if winner is not None and provider is not winner:
+                    continue
+                if isinstance(item, Exception):
+                    if winner is not None:
+                        raise item
+                    running -= 1
+                    if candidates:
+                        launch()
+                    elif not running:
+                        raise item
+                    continue
+                if item is _DONE:
+                    return  # the winner finished, or the first to finish had nothing to say
+                if winner is None:
+                    winner = provider
+                    # The losers stop reading, close their streams and count nothing more.
+                    for other, cancel in cancels.items():
+                        if other is not winner:
+                            cancel.set()
+                yield item
+        finally:
+            for cancel in cancels.values():
+                cancel.set()
+
+
+_routers: Dict[Tuple, Provider] = {}
+_lock = threading.Lock()
+
+
+def get_brain(config, section: str, logger=None) -> Provider:
+    """
+    The brain for an assistant section of assistant_config.yml: a Router
+    over its `brain` provider plus `fallback_brains` (list) and
+    `local_brain`, if set. With just `brain` the router calls it directly,
+    only timing it. `hedge_after_ms` and `local_max_tokens` tune the router.
+    """
+    brain = getattr(config, section).brain
+    fallbacks = config.get(f"{section}.fallback_brains", None) or ()
+    if isinstance(fallbacks, str):
+        fallbacks = [fallbacks]
+    local = config.get(f"{section}.local_brain", None)
+    hedge_ms = float(config.get(f"{section}.hedge_after_ms", HEDGE_AFTER_MS))
+    local_max_tokens = int(config.get(f"{section}.local_max_tokens", LOCAL_MAX_TOKENS))
+    primary = get_provider(brain)
+    secondaries = tuple(get_provider(b) for b in fallbacks)
+    local_provider = get_provider(local) if local else None
+    key = (primary, secondaries, local_provider, hedge_ms, local_max_tokens)
+    with _lock:
+        router = _routers.get(key)
+        if router is None:
+            router = Router(
+                primary,
+                secondaries,
+                local_provider,
+                hedge_after=hedge_ms / 1000,
+                local_max_tokens=local_max_tokens,
+                logger=logger,
+            )
+            _routers[key] = router
+    return router
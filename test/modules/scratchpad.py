@@ -0,0 +1,163 @@
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional, Set, Tuple
+
+from modules.typer_schema import keywords, rank
+from modules.utils import write_file_atomic
+
+RECENT = 3
+RELEVANT = 2
+OUTPUT_CHARS = 1200
+ARCHIVE_AFTER = 40
+
+SECTION = re.compile(r"^## ", re.M)
+COMMAND_HEADER = re.compile(r"^## (?P<title>.*\bCommand) \((?P<timestamp>[^)]*)\)[ \t]*$", re.M)
+REQUEST = re.compile(r"^> Request: (.*)$", re.M)
+BASH_BLOCK = re.compile(r"```bash\n(.*?)\n```", re.S)
+OUTPUT_BLOCK = re.compile(r"(\*\*Output:\*\* *\n```\n)(.*?)(```)", re.S)
+
+
+@dataclass
+class Section:
+    """One `## ` section of the scratchpad, kept verbatim in `text`."""
+
+    text: str
+    title: str = ""
+    timestamp: str = ""
+    request: str = ""
+    command: str = ""
+    keywords: Set[str] = field(default_factory=set)
+
+    @property
+    def is_command(self) -> bool:
+        return bool(self.timestamp)
+
+    def truncated(self, max_chars: int) -> str:
+        """The section with a long command output cut down to its head and tail."""
+
+        def shorten(match):
+            output = match.group(2)
+            if len(output) <= max_chars:
+                return match.group(0)
+            head, tail = output[: max_chars * 2 // 3], output[-(max_chars // 3):]
+            omitted = len(output) - len(head) - len(tail)
+            return f"{match.group(1)}{head}\n... [{omitted} characters omitted] ...\n{tail}{match.group(3)}"
+
+        return OUTPUT_BLOCK.sub(shorten, self.text)
+
+
+def parse_section(text: str) -> Section:
+    header = COMMAND_HEADER.match(text)
+    if header is None:
+        return Section(text=text, title=text.split("\n", 1)[0][3:].strip(), keywords=keywords(text))
+    request = REQUEST.search(text)
+    command = BASH_BLOCK.search(text)
+    output = OUTPUT_BLOCK.search(text)
+    section = Section(
+        text=text,
+        title=header.group("title"),
+        timestamp=header.group("timestamp"),
+        request=request.group(1).strip() if request else "",
+        command=command.group(1).strip() if command else "",
+    )
+    # Outputs can be huge; their first lines are enough to match on.
+    summary = output.group(2)[:OUTPUT_CHARS] if output else ""
+    section.keywords = keywords(" ".join((section.request, section.command, summary)))
+    return section
+
+
+def parse(text: str) -> Tuple[str, List[Section]]:
+    """Split scratchpad markdown into the text before the first `## ` header and its sections."""
+    starts = [m.start() for m in SECTION.finditer(text)]
+    if not starts:
+        return text, []
+    bounds = starts + [len(text)]
+    return text[: starts[0]], [parse_section(text[a:b]) for a, b in zip(bounds, bounds[1:])]
+
+
+class ScratchpadIndex:
+    """
+    Parsed sections of a scratchpad, and the window of them that goes into
+    the command-generation prompt.
+
+    The scratchpad only grows between rotations, so when the new text
+    extends the last one only the last section and the appended text are
+    parsed again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._text = ""
+        self._preamble = ""
+        self._sections: List[Section] = []
+
+    def sections(self, text: str) -> Tuple[str, List[Section]]:
+        with self._lock:
+            if text == self._text:
+                return self._preamble, self._sections
+            if self._sections and text.startswith(self._text):
+                last = self._sections[-1]
+                _, tail = parse(text[len(self._text) - len(last.text):])
+                sections = self._sections[:-1] + tail
+                preamble = self._preamble
+            else:
+                preamble, sections = parse(text)
+            self._text, self._preamble, self._sections = text, preamble, sections
+            return preamble, sections
+
+    def window(
+        self,
+        text: str,
+        query: str = "",
+        recent: int = RECENT,
+        relevant: int = RELEVANT,
+        output_chars: int = OUTPUT_CHARS,
+    ) -> str:
+        """
+        The scratchpad for the prompt: the preamble and note sections as
+        written, the `recent` latest command sections, and the `relevant`
+        older command sections most related to `query`, with command outputs
+        longer than `output_chars` truncated.
+        """
+        preamble, sections = self.sections(text)
+        commands = [i for i, s in enumerate(sections) if s.is_command]
+        keep = set(commands[-recent:] if recent > 0 else [])
+        older = [i for i in commands if i not in keep]
+        if relevant > 0 and query and older:
+            keep.update(older[j] for j in rank([sections[i].keywords for i in older], query, relevant))
+        omitted = len(commands) - len(keep)
+
+        parts = [preamble]
+        if omitted:
+            parts.append(f"_({omitted} older command sections omitted)_\n\n")
+        for i, section in enumerate(sections):
+            if not section.is_command:
+                parts.append(section.text)
+            elif i in keep:
+                parts.append(section.truncated(output_chars))
+        return "".join(parts)
+
+
+def rotate(path: str, archive_path: str, archive_after: int = ARCHIVE_AFTER, keep: Optional[int] = None) -> int:
+    """
+    Once the scratchpad holds more than `archive_after` command sections,
+    move all but the latest `keep` (default half) to the end of
+    `archive_path`. Notes stay in place. Returns the number archived.
+    """
+    with open(path) as f:
+        text = f.read()
+    preamble, sections = parse(text)
+    commands = [i for i, s in enumerate(sections) if s.is_command]
+    if len(commands) <= archive_after:
+        return 0
+    keep = archive_after // 2 if keep is None else keep
+    moved = set(commands[: len(commands) - keep])
+
+    os.makedirs(os.path.dirname(archive_path) or ".", exist_ok=True)
+    with open(archive_path, "a") as f:
+        f.write("".join(sections[i].text for i in sorted(moved)))
+    remaining = preamble + "".join(s.text for i, s in enumerate(sections) if i not in moved)
+    write_file_atomic(path, remaining)
+    return len(moved)
@@ -1,6 +1,8 @@
-import subprocess, shutil, os, sys, requests
+import subprocess, shutil, os, sys
 import json
 
+from modules import http_client
+
 def nmap_scan(target: str, flags: str = "-sV -T4") -> str:
     if shutil.which("nmap") is None:
         return "Error: nmap not installed."
@@ -77,7 +79,7 @@ def exploit_search(keyword: str) -> str:
     else:
         try:
             url = f"https://www.exploit-db.com/search?order_by=date_published&order=desc&text={keyword}"
-            resp = requests.get(url, timeout=15)
+            resp = http_client.get(url, timeout=15)
             if resp.status_code == 200:
                 # crude parse for result text
                 return f"Results page: {url} (open in browser for details)"
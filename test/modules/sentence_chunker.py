@@ -0,0 +1,77 @@
+import re
+from typing import Iterable, Iterator, List
+
+MIN_CHARS = 12
+MAX_CHARS = 240
+ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e", "approx", "no"}
+
+# Sentence end: terminal punctuation (optionally closed by quotes/brackets) followed by whitespace.
+_END = re.compile(r"[.!?…]+[\"')\]]*(?=\s)|\n+")
+_SOFT = re.compile(r"[,;:—](?=\s)")
+
+
+class SentenceChunker:
+    """
+    Incremental sentence splitter for streamed LLM tokens.
+
+    `feed()` returns the sentences completed by the new text so speech can
+    start before generation ends. Abbreviations ("Dr.") and decimals ("3.5")
+    are not sentence ends; fragments shorter than `min_chars` are joined to
+    the next sentence, and run-ons longer than `max_chars` are cut at the
+    last comma or space.
+    """
+
+    def __init__(self, min_chars: int = MIN_CHARS, max_chars: int = MAX_CHARS):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+        self._scan = 0
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        sentences = []
+        while True:
+            cut = self._next_cut()
+            if cut is None:
+                break
+            sentence, self._buffer = self._buffer[:cut].strip(), self._buffer[cut:].lstrip()
+            self._scan = 0
+            if sentence:
+                sentences.append(sentence)
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Whatever is left once the stream ends."""
+        rest, self._buffer, self._scan = self._buffer.strip(), "", 0
+        return [rest] if rest else []
+
+    def _next_cut(self):
+        for match in _END.finditer(self._buffer, self._scan):
+            end = match.end()
+            if len(self._buffer[:end].strip()) < self.min_chars:
+                continue
+            if match.group().startswith(".") and self._is_abbreviation(match.start()):
+                continue
+            return end
+        # Nothing complete yet; don't rescan the same prefix on the next token.
+        self._scan = max(0, len(self._buffer) - 8)
+        if len(self._buffer) > self.max_chars:
+            window = self._buffer[:self.max_chars]
+            soft = [m.end() for m in _SOFT.finditer(window)]
+            return soft[-1] if soft else (window.rfind(" ") + 1 or self.max_chars)
+        return None
+
+    def _is_abbreviation(self, dot: int) -> bool:
+        word = re.search(r"([\w.]+)$", self._buffer[:dot])
+        if word is None:
+            return False
+        word = word.group(1).lower()
+        return word in ABBREVIATIONS or len(word) == 1 and word.isalpha()
+
+
+def iter_sentences(tokens: Iterable[str], **kwargs) -> Iterator[str]:
+    """Sentences from a token stream, each yielded as soon as it is complete."""
+    chunker = SentenceChunker(**kwargs)
+    for token in tokens:
+        yield from chunker.feed(token)
+    yield from chunker.flush()
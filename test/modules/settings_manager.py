@@ -1,6 +1,6 @@
 import os
-import yaml
 from dotenv import dotenv_values
+from modules.assistant_config import get_assistant_config
 
 ENV_KEYS = [
     "DEEPSEEK_API_KEY",
@@ -36,14 +36,13 @@ def save_env_keys(new_values):
             f.write(f"{k}={v}\n")
 
 def load_assistant_config():
-    # Reads YAML config and returns dict
+    # Returns the YAML config as a dict, from the shared cached config
     if not os.path.exists(ASSISTANT_CONFIG_PATH):
         return {}
-    with open(ASSISTANT_CONFIG_PATH, "r") as f:
-        config = yaml.safe_load(f)
-    return config
+    return get_assistant_config(ASSISTANT_CONFIG_PATH).as_dict()
 
 def save_assistant_config(new_config):
-    # Overwrites YAML config
-    with open(ASSISTANT_CONFIG_PATH, "w") as f:
-        yaml.dump(new_config, f, default_flow_style=False)
\ No newline at end of file
+    # Validates, atomically replaces the YAML config and reloads the shared config
+    if not os.path.exists(ASSISTANT_CONFIG_PATH):
+        open(ASSISTANT_CONFIG_PATH, "a").close()
+    get_assistant_config(ASSISTANT_CONFIG_PATH).save(new_config)
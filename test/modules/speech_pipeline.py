@@ -0,0 +1,103 @@
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from modules.sentence_chunker import iter_sentences
+
+AUDIO_AHEAD = 2
+_DONE = object()
+
+
+class SentencePipeline:
+    """
+    Speak a token stream sentence by sentence while it is still generating.
+
+    A worker thread consumes the tokens, cuts them into sentences and
+    synthesizes each one (`synthesize(sentence) -> audio`, or the sentence
+    itself when None), staying at most AUDIO_AHEAD sentences ahead of
+    playback; the calling thread plays them in order with `play(audio)`.
+    Setting `interrupt` stops both stages at the next sentence or chunk.
+
+    After `run()`, `text` holds everything generated (the whole stream is
+    drained even when interrupted, so the reply is complete), `sentences`
+    the sentences that were spoken, `first_sentence` the seconds from
+    `run()` to the first complete sentence and `first_audio` the seconds
+    from `run()` to the start of playback.
+    """
+
+    def __init__(
+        self,
+        play: Callable[[object], None],
+        synthesize: Optional[Callable[[str], object]] = None,
+        interrupt: Optional[threading.Event] = None,
+    ):
+        self.play = play
+        self.synthesize = synthesize
+        self.interrupt = interrupt
+        self.text = ""
+        self.sentences: List[str] = []
+        self.first_sentence: Optional[float] = None
+        self.first_audio: Optional[float] = None
+        self._start = 0.0
+        self.error: Optional[BaseException] = None
+        self._stopped = False
+
+    def _interrupted(self) -> bool:
+        return self._stopped or self.interrupt is not None and self.interrupt.is_set()
+
+    def _collect(self, tokens: Iterable[str]) -> Iterator[str]:
+        parts = []
+        try:
+            for token in tokens:
+                parts.append(token)
+                yield token
+        finally:
+            self.text = "".join(parts)
+
+    def _produce(self, tokens: Iterable[str], audio: "queue.Queue"):
+        try:
+            for sentence in iter_sentences(self._collect(tokens)):
+                if self._interrupted():
+                    continue  # keep draining so `text` is complete
+                if self.first_sentence is None:
+                    self.first_sentence = time.perf_counter() - self._start
+                item = self.synthesize(sentence) if self.synthesize else sentence
+                audio.put((sentence, item))
+        except BaseException as e:
+            self.error = e
+        finally:
+            audio.put(_DONE)
+
+    def run(self, tokens: Iterable[str]) -> str:
+        """
+        Speak `tokens` and return the full generated text.
+
+        Raises:
+            Exception: Whatever the token stream, synthesize or play raised
+        """
+        start = self._start = time.perf_counter()
+        audio: "queue.Queue" = queue.Queue(maxsize=AUDIO_AHEAD)
+        worker = threading.Thread(target=self._produce, args=(tokens, audio), daemon=True)
+        worker.start()
+        while True:
+            entry = audio.get()
+            if entry is _DONE:
+                break
+            if self._interrupted():
+                continue
+            sentence, item = entry
+            if self.first_audio is None:
+                self.first_audio = time.perf_counter() - start
+            self.sentences.append(sentence)
+            try:
+                self.play(item)
+            except BaseException:
+                self._stopped = True  # let the worker drain without synthesizing
+                while audio.get() is not _DONE:
+                    pass
+                raise
+        worker.join()
+        if self.error is not None:
+            raise self.error
+        return self.text
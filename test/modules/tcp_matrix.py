@@ -0,0 +1,135 @@
+import asyncio
+import csv
+import socket
+import time
+from typing import Dict, Iterable, List
+
+OPEN, CLOSED, FILTERED, ERROR = "open", "closed", "filtered", "error"
+
+
+def _expand_ports(spec) -> List[int]:
+    if isinstance(spec, int):
+        return [spec]
+    if isinstance(spec, (list, tuple)):
+        return [p for item in spec for p in _expand_ports(item)]
+    ports = []
+    for part in str(spec).split(","):
+        part = part.strip()
+        if "-" in part:
+            low, high = part.split("-", 1)
+            ports.extend(range(int(low), int(high) + 1))
+        elif part:
+            ports.append(int(part))
+    return ports
+
+
+def _rows_to_checks(rows: Iterable[Dict]) -> List[Dict]:
+    checks = []
+    for row in rows:
+        row = {str(k).strip().lower(): v for k, v in row.items() if k is not None}
+        expect = str(row.get("expect", OPEN)).strip().lower()
+        if expect not in (OPEN, CLOSED):
+            raise ValueError(f"Invalid expectation '{expect}' for {row.get('host')} (use open/closed).")
+        for port in _expand_ports(row.get("ports", row.get("port"))):
+            checks.append({
+                "policy": str(row.get("policy") or row.get("source") or "").strip(),
+                "host": str(row["host"]).strip(),
+                "port": port,
+                "expect": expect,
+            })
+    return checks
+
+
+def load_expectations(path: str) -> List[Dict]:
+    """
+    Read connectivity expectations from CSV or YAML.
+
+    CSV columns: host, port, expect (open/closed) and optionally policy.
+    YAML: a list of mappings with the same keys (or under a `checks` key).
+    `port`/`ports` accept single ports, lists, and ranges like "8000-8010".
+
+    Returns:
+        list: {policy, host, port, expect} per host/port pair
+    """
+    if path.lower().endswith((".yml", ".yaml")):
+        import yaml
+        with open(path) as f:
+            data = yaml.safe_load(f) or []
+        if isinstance(data, dict):
+            data = data.get("checks", [])
+        return _rows_to_checks(data)
+    with open(path, newline="") as f:
+        return _rows_to_checks(csv.DictReader(f))
+
+
+async def _resolve(hosts: Iterable[str]) -> Dict[str, object]:
+    loop = asyncio.get_running_loop()
+
+    async def one(host):
+        try:
+            infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+            return host, infos[0][4][0]
+        except socket.gaierror as e:
+            return host, e
+
+    return dict(await asyncio.gather(*(one(h) for h in set(hosts))))
+
+
+async def _probe(address: str, port: int, timeout: float):
+    start = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(address, port), timeout)
+    except ConnectionRefusedError:
+        return CLOSED, round((time.perf_counter() - start) * 1000, 3), ""
+    except asyncio.TimeoutError:
+        return FILTERED, None, ""
+    except OSError as e:
+        return ERROR, None, e.strerror or str(e)
+    latency = round((time.perf_counter() - start) * 1000, 3)
+    writer.close()
+    return OPEN, latency, ""
+
+
+async def check_matrix_async(checks: List[Dict], concurrency: int = 500, timeout: float = 2.0) -> List[Dict]:
+    """
+    Probe every check concurrently (at most `concurrency` connects in flight).
+    Each distinct host name is resolved once up front.
+    """
+    addresses = await _resolve(c["host"] for c in checks)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(check):
+        result = dict(check)
+        address = addresses[check["host"]]
+        if isinstance(address, Exception):
+            result.update(actual=ERROR, latency_ms=None, error=f"Failed to resolve hostname {check['host']}.")
+        else:
+            async with semaphore:
+                actual, latency, error = await _probe(address, check["port"], timeout)
+            result.update(actual=actual, latency_ms=latency, error=error)
+        reachable = result["actual"] == OPEN
+        result["ok"] = reachable if check["expect"] == OPEN else result["actual"] in (CLOSED, FILTERED)
+        return result
+
+    return await asyncio.gather(*(run(c) for c in checks))
+
+
+def check_matrix(checks: List[Dict], concurrency: int = 500, timeout: float = 2.0) -> List[Dict]:
+    """Synchronous wrapper around check_matrix_async."""
+    return asyncio.run(check_matrix_async(checks, concurrency, timeout))
+
+
+def format_matrix(results: List[Dict], seconds: float = None, show_all: bool = False) -> str:
+    """Summary line plus one line per deviation (or per check with `show_all`)."""
+    deviations = [r for r in results if not r["ok"]]
+    summary = f"{len(results)} checks, {len(deviations)} deviation(s)"
+    if seconds is not None:
+        summary += f" in {seconds:.2f}s"
+    lines = [summary]
+    for r in results if show_all else deviations:
+        label = f"[{r['policy']}] " if r["policy"] else ""
+        latency = f" ({r['latency_ms']} ms)" if r["latency_ms"] is not None else ""
+        status = "OK  " if r["ok"] else "DEV "
+        detail = f" - {r['error']}" if r["error"] else ""
+        lines.append(f"{status}{label}{r['host']}:{r['port']} expected {r['expect']}, got {r['actual']}{latency}{detail}")
+    return "\n".join(lines)
@@ -0,0 +1,231 @@
+import os
+import socket
+import struct
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_PORT = 5201
+BUFFER_SIZE = 256 * 1024
+
+# Per-stream handshake: magic, direction (0 = client sends, 1 = server sends), duration.
+_HEADER = struct.Struct("!4sBd")
+_MAGIC = b"NTB1"
+_TOTAL = struct.Struct("!Q")
+CLIENT_SENDS, SERVER_SENDS = 0, 1
+
+
+class _Payload:
+    """
+    A reusable send buffer. On Linux the bytes live in an unlinked temp file
+    and go out with sendfile (no copy through Python); elsewhere one
+    memoryview over a preallocated bytearray is resent.
+    """
+
+    def __init__(self, size: int = BUFFER_SIZE):
+        self.size = size
+        self.view = memoryview(bytearray(os.urandom(64)) * (size // 64 + 1))[:size]
+        self.file = None
+        if hasattr(os, "sendfile"):
+            self.file = tempfile.TemporaryFile()
+            self.file.write(self.view)
+            self.file.flush()
+
+    def send_until(self, sock: socket.socket, deadline: float, counter: List[int], slot: int):
+        while time.monotonic() < deadline:
+            if self.file:
+                sent = sock.sendfile(self.file, 0, self.size)
+            else:
+                sent = sock.send(self.view)
+            counter[slot] += sent
+
+    def close(self):
+        if self.file:
+            self.file.close()
+        self.view.release()
+
+
+def _recv_all(sock: socket.socket, buf: memoryview, counter: List[int], slot: int):
+    while True:
+        n = sock.recv_into(buf)
+        if not n:
+            return
+        counter[slot] += n
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Peer closed the connection during handshake.")
+        data += chunk
+    return data
+
+
+class ThroughputServer:
+    """
+    Bundled receiver/sender for throughput tests. Each accepted connection is
+    one stream; the client's handshake says which side sends and for how long.
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port: int = DEFAULT_PORT, buffer_size: int = BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self.sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.listen(64)
+        self.address = self.sock.getsockname()[:2]
+        self._payload = _Payload(buffer_size)
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def start(self) -> "ThroughputServer":
+        """Accept streams on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        while not self._closed:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn: socket.socket):
+        with conn:
+            try:
+                magic, direction, duration = _HEADER.unpack(_recv_exact(conn, _HEADER.size))
+                if magic != _MAGIC:
+                    return
+                counter = [0]
+                if direction == SERVER_SENDS:
+                    self._payload.send_until(conn, time.monotonic() + duration, counter, 0)
+                    conn.shutdown(socket.SHUT_WR)
+                else:
+                    buf = memoryview(bytearray(self.buffer_size))
+                    _recv_all(conn, buf, counter, 0)
+                    conn.sendall(_TOTAL.pack(counter[0]))
+            except (OSError, ConnectionError):
+                pass
+
+    def close(self):
+        self._closed = True
+        self.sock.close()
+        self._payload.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_client(
+    host: str,
+    port: int = DEFAULT_PORT,
+    streams: int = 4,
+    duration: float = 10.0,
+    interval: float = 1.0,
+    reverse: bool = False,
+    buffer_size: int = BUFFER_SIZE,
+    on_interval: Optional[Callable[[Dict], None]] = None,
+) -> Dict:
+    """
+    Run a multi-stream TCP throughput test against a ThroughputServer.
+    By default the client sends (upload); `reverse` has the server send.
+
+    Returns:
+        dict: direction, streams, seconds, bytes, mbps, per_stream (bytes),
+        and intervals [{start, end, bytes, mbps}].
+    """
+    direction = SERVER_SENDS if reverse else CLIENT_SENDS
+    counters = [0] * streams
+    received = [0] * streams
+    errors: List[str] = []
+    payload = None if reverse else _Payload(buffer_size)
+    conns = [socket.create_connection((host, port), timeout=10) for _ in range(streams)]
+
+    def stream(i: int, conn: socket.socket, deadline: float):
+        try:
+            conn.settimeout(duration + 10)
+            conn.sendall(_HEADER.pack(_MAGIC, direction, duration))
+            if reverse:
+                _recv_all(conn, memoryview(bytearray(buffer_size)), counters, i)
+                received[i] = counters[i]
+            else:
+                payload.send_until(conn, deadline, counters, i)
+                conn.shutdown(socket.SHUT_WR)
+                received[i] = _TOTAL.unpack(_recv_exact(conn, _TOTAL.size))[0]
+        except (OSError, ConnectionError) as e:
+            errors.append(f"stream {i}: {e}")
+        finally:
+            conn.close()
+
+    start = time.monotonic()
+    deadline = start + duration
+    threads = [threading.Thread(target=stream, args=(i, c, deadline), daemon=True) for i, c in enumerate(conns)]
+    for t in threads:
+        t.start()
+
+    intervals = []
+    last_time, last_bytes = start, 0
+    while any(t.is_alive() for t in threads):
+        alive = next(t for t in threads if t.is_alive())
+        alive.join(max(0.0, last_time + interval - time.monotonic()))
+        now = time.monotonic()
+        if now - last_time < interval and any(t.is_alive() for t in threads):
+            continue
+        total = sum(counters)
+        if total > last_bytes:
+            report = {
+                "start": round(last_time - start, 3),
+                "end": round(now - start, 3),
+                "bytes": total - last_bytes,
+                "mbps": round((total - last_bytes) * 8 / (now - last_time) / 1e6, 2),
+            }
+            intervals.append(report)
+            if on_interval:
+                on_interval(report)
+        last_time, last_bytes = now, total
+    elapsed = time.monotonic() - start
+    if payload:
+        payload.close()
+
+    total = sum(received)
+    result = {
+        "direction": "download" if reverse else "upload",
+        "streams": streams,
+        "seconds": round(elapsed, 3),
+        "bytes": total,
+        "mbps": round(total * 8 / min(elapsed, duration) / 1e6, 2) if elapsed else 0.0,
+        "per_stream": received,
+        "intervals": intervals,
+    }
+    if errors:
+        result["errors"] = errors
+    return result
+
+
+def loopback_benchmark(streams: int = 4, duration: float = 5.0, interval: float = 1.0,
+                       buffer_size: int = BUFFER_SIZE, on_interval=None) -> List[Dict]:
+    """Start a bundled server on 127.0.0.1 and measure upload then download."""
+    with ThroughputServer("127.0.0.1", 0, buffer_size) as server:
+        host, port = server.address
+        return [
+            run_client(host, port, streams, duration, interval, reverse, buffer_size, on_interval)
+            for reverse in (False, True)
+        ]
+
+
+def format_result(result: Dict) -> str:
+    """Render one direction's result as plain text."""
+    lines = [f"[{result['direction']}] {result['streams']} stream(s), {result['seconds']}s"]
+    lines += [f"  {r['start']:6.2f}-{r['end']:6.2f}s  {r['bytes'] / 1e6:10.1f} MB  {r['mbps']:10.2f} Mbps"
+              for r in result["intervals"]]
+    lines.append(f"  total: {result['bytes'] / 1e6:.1f} MB, {result['mbps']:.2f} Mbps")
+    lines += [f"  error: {e}" for e in result.get("errors", [])]
+    return "\n".join(lines)
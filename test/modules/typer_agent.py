@@ -1,34 +1,32 @@
-from typing import List
+from typing import List, Optional, Tuple
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
 import os
 import logging
 from datetime import datetime
-from modules.assistant_config import get_config
+from modules.assistant_config import get_assistant_config
 from modules.utils import (
     build_file_name_session,
+    build_file_path,
     create_session_logger_id,
     setup_logging,
 )
-from modules.deepseek import prefix_prompt as deepseek_prefix_prompt
-
-# New LLM providers
-try:
-    from modules.gemini import prefix_prompt as gemini_prefix_prompt
-except ImportError:
-    gemini_prefix_prompt = None
-try:
-    from modules.mistral import prefix_prompt as mistral_prefix_prompt
-except ImportError:
-    mistral_prefix_prompt = None
-try:
-    from modules.groq import prefix_prompt as groq_prefix_prompt
-except ImportError:
-    groq_prefix_prompt = None
-from modules.execute_python import execute_uv_python, execute
+from modules.router import get_brain
+from modules.metrics import get_metrics, write_session_metrics
+from modules.execute_python import CommandFailed, execute_uv_python, execute_typer_command
+from modules.prompt_cache import get_prompt_loader
+from modules.acknowledgements import AcknowledgementCache
+from modules.command_cache import CommandCache
+from modules.typer_schema import get_typer_schema
+from modules.scratchpad import ScratchpadIndex, rotate
 from elevenlabs import play
 from elevenlabs.client import ElevenLabs
 import time
 
 
+ACKNOWLEDGEMENTS = ("Command generated", "Command generated and executed")
+
+
 class TyperAgent:
     def __init__(self, logger: logging.Logger, session_id: str):
         self.logger = logger
@@ -37,6 +35,52 @@ class TyperAgent:
         self.elevenlabs_client = ElevenLabs(api_key=os.getenv("ELEVEN_API_KEY"))
         self.previous_successful_requests = []
         self.previous_responses = []
+        self._scratchpad_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scratchpad")
+        self._last_write: Optional[Future] = None
+        self.scratchpad_index = ScratchpadIndex()
+        self.config = get_assistant_config()
+        self._warm_provider()
+        self.acknowledgements = self._build_acknowledgements()
+        self.command_cache = CommandCache(
+            path=build_file_path("command_cache.json"),
+            embed=self._command_embedder(),
+        )
+
+    def brain(self):
+        """The configured brain: one provider, or a router when fallbacks are set"""
+        return get_brain(self.config, "typer_assistant", self.logger)
+
+    def _warm_provider(self):
+        """Create the brain's client up front so the first request skips setup"""
+        try:
+            self.brain().warm()
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not initialize {self.config.typer_assistant.brain} provider: {e}")
+
+    def _command_embedder(self):
+        """Embedding for command cache lookups: `typer_assistant.command_cache_embeddings` or hashed trigrams"""
+        spec = self.config.get("typer_assistant.command_cache_embeddings", None)
+        if not spec:
+            return None
+        if not spec.startswith("ollama:"):
+            raise ValueError(f"Unsupported command_cache_embeddings provider: {spec} (use ollama:<model>)")
+        from modules.ollama import embed
+        model = spec.split(":", 1)[1]
+        return lambda text: embed(text, model=model)
+
+    def _build_acknowledgements(self) -> AcknowledgementCache:
+        """Pooled acknowledgement phrasings and audio, warmed in the background"""
+        settings = self.config.typer_assistant
+        voice = f"elevenlabs:{settings.elevenlabs_voice}" if self.elevenlabs_client else "local"
+        cache = AcknowledgementCache(
+            generate=self._generate_acknowledgement,
+            render=self._render_speech,
+            voice=voice,
+            directory=build_file_path("acknowledgements"),
+            logger=self.logger,
+        )
+        cache.warm(ACKNOWLEDGEMENTS, settings.assistant_name, settings.human_companion_name)
+        return cache
 
     def _validate_markdown(self, file_path: str) -> bool:
         """Validate that file is markdown and has expected structure"""
@@ -82,43 +126,47 @@ class TyperAgent:
     ) -> str:
         """Build and format the prompt template with current state"""
         try:
-            # Load typer file
-            self.logger.info("📂 Loading typer file...")
-            with open(typer_file, "r") as f:
-                typer_content = f.read()
+            # File contents and the compiled template are cached and only
+            # re-read when their mtime/size changes.
+            prompts = get_prompt_loader()
+            # Only the commands' compact schema (names, arguments, options,
+            # one-line help) goes into the prompt, not the implementations.
+            self.logger.info("📂 Loading typer command schema...")
+            typer_content = get_typer_schema().render(
+                typer_file,
+                query=prompt_text,
+                top_k=int(self.config.get("typer_assistant.schema_top_k", 0) or 0),
+            )
 
-            # Load scratchpad file
             self.logger.info("📝 Loading scratchpad file...")
             if not os.path.exists(scratchpad):
                 self.logger.error(f"📄 Scratchpad file {scratchpad} does not exist")
                 raise FileNotFoundError(f"Scratchpad file {scratchpad} does not exist")
+            # Notes plus the recent and request-related command sections only,
+            # so long execute sessions don't grow every prompt.
+            scratchpad_content = self.scratchpad_index.window(
+                prompts.read(scratchpad),
+                prompt_text,
+                recent=int(self.config.get("typer_assistant.scratchpad_recent", 3)),
+                relevant=int(self.config.get("typer_assistant.scratchpad_relevant", 2)),
+                output_chars=int(self.config.get("typer_assistant.scratchpad_output_chars", 1200)),
+            )
 
-            with open(scratchpad, "r") as f:
-                scratchpad_content = f.read()
-
-            # Load context files
-            context_content = ""
             for file_path in context_files:
                 if not os.path.exists(file_path):
                     self.logger.error(f"📄 Context file {file_path} does not exist")
                     raise FileNotFoundError(f"Context file {file_path} does not exist")
+            context_content = prompts.context_block(context_files)
 
-                with open(file_path, "r") as f:
-                    file_content = f.read()
-                    file_name = os.path.basename(file_path)
-                    context_content += f'\t<context name="{file_name}">\n{file_content}\n</context>\n\n'
-
-            # Load and format prompt template
             self.logger.info("📝 Loading prompt template...")
-            with open("prompts/typer-commands.xml", "r") as f:
-                prompt_template = f.read()
-
-            # Replace template placeholders
-            formatted_prompt = (
-                prompt_template.replace("{{typer-commands}}", typer_content)
-                .replace("{{scratch_pad}}", scratchpad_content)
-                .replace("{{context_files}}", context_content)
-                .replace("{{natural_language_request}}", prompt_text)
+            formatted_prompt = prompts.render(
+                "prompts/typer-commands.xml",
+                {
+                    "typer-commands": typer_content,
+                    "scratch_pad": scratchpad_content,
+                    "context_files": context_content,
+                    "natural_language_request": prompt_text,
+                },
             )
 
             # Log the filled prompt template to file only (not stdout)
@@ -143,103 +191,191 @@ class TyperAgent:
     ) -> str:
         """Process text input and handle based on execution mode"""
         try:
-            # Build fresh prompt with current state
-            formatted_prompt = self.build_prompt(
-                typer_file, scratchpad, context_files, text
+            return asyncio.run(
+                self.process_text_async(text, typer_file, scratchpad, context_files, mode)
             )
+        finally:
+            write_session_metrics(self.session_id, self.logger)
 
-            # Choose brain for command-generation
-            brain = get_config("typer_assistant.brain") if "typer_assistant.brain" in open("assistant_config.yml").read() else "deepseek-v3"
+    async def process_text_async(
+        self,
+        text: str,
+        typer_file: str,
+        scratchpad: str,
+        context_files: List[str],
+        mode: str,
+    ) -> str:
+        """
+        Async form of process_text. The spoken acknowledgement is generated
+        and synthesized while the command runs, and scratchpad writes happen
+        in the background, so a turn takes about max(command, acknowledgement)
+        plus playback instead of their sum.
+        """
+        start = time.perf_counter()
+        metrics = get_metrics()
+        try:
+            if mode not in ("default", "execute", "execute-no-scratch"):
+                self.think_speak(f"I had trouble running that command")
+                raise ValueError(f"Invalid mode: {mode}")
+
+            settings = self.config.typer_assistant
             prefix = f"uv run python {typer_file}"
 
-            if brain.startswith("gemini"):
-                if gemini_prefix_prompt is None:
-                    raise ImportError("Gemini provider not available (missing dependency).")
-                command = gemini_prefix_prompt(prompt=formatted_prompt, prefix=prefix)
-            elif brain.startswith("mistral"):
-                if mistral_prefix_prompt is None:
-                    raise ImportError("Mistral provider not available (missing dependency).")
-                command = mistral_prefix_prompt(prompt=formatted_prompt, prefix=prefix)
-            elif brain.startswith("groq"):
-                if groq_prefix_prompt is None:
-                    raise ImportError("Groq provider not available (missing dependency).")
-                command = groq_prefix_prompt(prompt=formatted_prompt, prefix=prefix)
-            else:  # deepseek fallback
-                command = deepseek_prefix_prompt(prompt=formatted_prompt, prefix=prefix)
+            # Repeated requests reuse their validated command without an LLM call
+            cached = self.command_cache.lookup(text, typer_file, settings.assistant_name)
+            generated = cached is None
+            if cached is not None:
+                command, similarity = cached
+                metrics.inc("cache_hits_total", cache="command")
+                self.logger.info(f"⚡ Command cache hit ({similarity:.2f}): `{command}`")
+            else:
+                metrics.inc("cache_misses_total", cache="command")
+                # Build fresh prompt with current state (after earlier scratchpad writes land)
+                self.flush_scratchpad()
+                formatted_prompt = self.build_prompt(
+                    typer_file, scratchpad, context_files, text
+                )
+
+                # Choose brain for command-generation
+                command = await self.brain().aprefix(prompt=formatted_prompt, prefix=prefix)
 
             if command == prefix.strip():
                 self.logger.info(f"🤖 Command not found for '{text}'")
-                self.speak("I couldn't find that command")
+                await asyncio.to_thread(self.speak, "I couldn't find that command")
                 return "Command not found"
 
             # Handle different modes with markdown formatting
-            assistant_name = get_config("typer_assistant.assistant_name")
+            assistant_name = settings.assistant_name
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
             # command_with_prefix = f"uv run python {typer_file} {command}"
             command_with_prefix = command
 
             if mode == "default":
+                # Not cached: only commands that ran successfully are worth repeating
+                acknowledgement = asyncio.create_task(self._prepare_acknowledgement("Command generated"))
                 result = (
                     f"\n## {assistant_name} Generated Command ({timestamp})\n\n"
                     f"> Request: {text}\n\n"
                     f"```bash\n{command_with_prefix}\n```"
                 )
-                with open(scratchpad, "a") as f:
-                    f.write(result)
-                self.think_speak(f"Command generated")
+                self.append_scratchpad(scratchpad, result)
+                await self._respond(acknowledgement, start)
                 return result
 
-            elif mode == "execute":
-                self.logger.info(f"⚡ Executing command: `{command_with_prefix}`")
-                output = execute(command)
+            # Execute modes: prepare what to say while the command runs
+            acknowledgement = asyncio.create_task(
+                self._prepare_acknowledgement("Command generated and executed")
+            )
+            self.logger.info(f"⚡ Executing command: `{command_with_prefix}`")
+            try:
+                with metrics.time("command_seconds"):
+                    output = await asyncio.to_thread(execute_typer_command, command, typer_file)
+            except CommandFailed as e:
+                # Report what the command printed, but never serve it from the cache again
+                self.logger.warning(f"⚠️ Command exited with status {e.exit_code}: `{command}`")
+                self.command_cache.invalidate(text, settings.assistant_name, command)
+                output = e.output
+            except Exception:
+                acknowledgement.cancel()
+                self.command_cache.invalidate(text, settings.assistant_name, command)
+                raise
+            except BaseException:
+                acknowledgement.cancel()
+                raise
+            else:
+                # Only commands that ran successfully are worth repeating
+                if generated:
+                    self.command_cache.store(text, typer_file, command, settings.assistant_name)
 
+            if mode == "execute":
                 result = (
                     f"\n\n## {assistant_name} Executed Command ({timestamp})\n\n"
                     f"> Request: {text}\n\n"
                     f"**{assistant_name}'s Command:** \n```bash\n{command_with_prefix}\n```\n\n"
                     f"**Output:** \n```\n{output}```"
                 )
-                with open(scratchpad, "a") as f:
-                    f.write(result)
-                self.think_speak(f"Command generated and executed")
-                return output
-
-            elif mode == "execute-no-scratch":
-                self.logger.info(f"⚡ Executing command: `{command_with_prefix}`")
-                output = execute(command)
-                self.think_speak(f"Command generated and executed")
-                return output
-
-            else:
-                self.think_speak(f"I had trouble running that command")
-                raise ValueError(f"Invalid mode: {mode}")
+                self.append_scratchpad(scratchpad, result)
+            await self._respond(acknowledgement, start)
+            return output
 
         except Exception as e:
             self.logger.error(f"❌ Error occurred: {str(e)}")
             raise
 
-    def think_speak(self, text: str):
-        response_prompt_base = ""
-        with open("prompts/concise-assistant-response.xml", "r") as f:
-            response_prompt_base = f.read()
-
-        assistant_name = get_config("typer_assistant.assistant_name")
-        human_companion_name = get_config("typer_assistant.human_companion_name")
-
-        response_prompt = response_prompt_base.replace("{{latest_action}}", text)
-        response_prompt = response_prompt.replace(
-            "{{human_companion_name}}", human_companion_name
-        )
-        response_prompt = response_prompt.replace(
-            "{{personal_ai_assistant_name}}", assistant_name
+    def append_scratchpad(self, scratchpad: str, text: str) -> Future:
+        """Append to the scratchpad on the writer thread (writes stay in order)"""
+        self._last_write = self._scratchpad_writer.submit(self._append_file, scratchpad, text)
+        return self._last_write
+
+    def _append_file(self, path: str, text: str):
+        with open(path, "a") as f:
+            f.write(text)
+        archive_after = int(self.config.get("typer_assistant.scratchpad_archive_after", 40))
+        if archive_after > 0:
+            name = os.path.splitext(os.path.basename(path))[0]
+            archived = rotate(path, build_file_path(f"{name}-archive.md"), archive_after)
+            if archived:
+                self.logger.info(f"🗄️ Archived {archived} old scratchpad sections")
+
+    def flush_scratchpad(self):
+        """Wait for pending scratchpad writes, re-raising a failed one"""
+        if self._last_write is not None:
+            self._last_write.result()
+
+    def _generate_acknowledgement(self, text: str, assistant_name: str, human_companion_name: str) -> str:
+        """One LLM-written phrasing of the acknowledgement for `text`"""
+        response_prompt = get_prompt_loader().render(
+            "prompts/concise-assistant-response.xml",
+            {
+                "latest_action": text,
+                "human_companion_name": human_companion_name,
+                "personal_ai_assistant_name": assistant_name,
+            },
         )
         prompt_prefix = f"Your Conversational Response: "
-        response = prefix_prompt(
+        return self.brain().prefix(
             prompt=response_prompt, prefix=prompt_prefix, no_prefix=True
         )
+
+    def _acknowledgement(self, text: str) -> Tuple[str, Optional[bytes]]:
+        """Spoken response and its audio for `text`, from the cache when warm"""
+        settings = self.config.typer_assistant
+        names = (settings.assistant_name, settings.human_companion_name)
+        cached = self.acknowledgements.get(text, *names)
+        if cached is not None:
+            get_metrics().inc("cache_hits_total", cache="acknowledgement")
+            self.logger.info(f"🤖 Response (cached): '{cached[0]}'")
+            return cached
+        get_metrics().inc("cache_misses_total", cache="acknowledgement")
+        try:
+            response = self._generate_acknowledgement(text, *names)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not generate a response ({e}); saying '{text}' instead.")
+            return text, self._synthesize_reply(text)
         self.logger.info(f"🤖 Response: '{response}'")
-        self.speak(response)
+        audio = self._synthesize_reply(response)
+        self.acknowledgements.add(text, *names, response, audio)
+        return response, audio
+
+    async def _prepare_acknowledgement(self, text: str) -> Tuple[str, Optional[bytes]]:
+        """Generate and synthesize the spoken response to `text` off the event loop"""
+        return await asyncio.to_thread(self._acknowledgement, text)
+
+    async def _play_acknowledgement(self, prepared: Tuple[str, Optional[bytes]]):
+        await asyncio.to_thread(self._play_speech, *prepared)
+
+    async def _respond(self, acknowledgement: "asyncio.Task", start: float):
+        """Play the acknowledgement once ready, recording how long the user waited for it"""
+        ready = time.perf_counter()
+        prepared = await acknowledgement
+        metrics = get_metrics()
+        metrics.observe("acknowledgement_wait_seconds", time.perf_counter() - ready, assistant="typer")
+        metrics.observe("request_seconds", time.perf_counter() - start, assistant="typer")
+        await self._play_acknowledgement(prepared)
+
+    def think_speak(self, text: str):
+        self._play_speech(*self._acknowledgement(text))
 
     def _ensure_local_tts_initialized(self):
         if not hasattr(self, "engine") or self.engine is None:
@@ -249,29 +385,43 @@ class TyperAgent:
             self.engine.setProperty("rate", 150)
             self.engine.setProperty("volume", 1.0)
 
-    def speak(self, text: str):
-        # If ElevenLabs is set, try; on any error, fallback to local. Only init engine once.
+    def _synthesize_reply(self, text: str) -> Optional[bytes]:
+        """_render_speech for a reply the user is waiting on, recorded as tts_first_audio_seconds"""
+        if getattr(self, "elevenlabs_client", None) is None:
+            return None
+        with get_metrics().time("tts_first_audio_seconds", assistant="typer"):
+            return self._render_speech(text)
+
+    def _render_speech(self, text: str) -> Optional[bytes]:
+        """ElevenLabs audio for `text`, or None when the local engine should speak it"""
         model = "eleven_flash_v2_5"
-        voice = get_config("typer_assistant.elevenlabs_voice")
-        use_elevenlabs = hasattr(self, "elevenlabs_client") and self.elevenlabs_client is not None
+        voice = self.config.typer_assistant.elevenlabs_voice
+        if getattr(self, "elevenlabs_client", None) is None:
+            return None
+        try:
+            start_time = time.time()
+            audio_generator = self.elevenlabs_client.generate(
+                text=text,
+                voice=voice,
+                model=model,
+                stream=False,
+            )
+            audio_bytes = b"".join(list(audio_generator))
+            duration = time.time() - start_time
+            self.logger.info(f"Model {model} completed tts in {duration:.2f} seconds")
+            return audio_bytes
+        except Exception as e:
+            self.logger.warning(f"⚠️ ElevenLabs TTS failed ({e}); falling back to local TTS.")
+            self.elevenlabs_client = None  # Avoid reusing broken client
+            return None
 
-        if use_elevenlabs:
+    def _play_speech(self, text: str, audio: Optional[bytes]):
+        if audio is not None:
             try:
-                start_time = time.time()
-                audio_generator = self.elevenlabs_client.generate(
-                    text=text,
-                    voice=voice,
-                    model=model,
-                    stream=False,
-                )
-                audio_bytes = b"".join(list(audio_generator))
-                duration = time.time() - start_time
-                self.logger.info(f"Model {model} completed tts in {duration:.2f} seconds")
-                play(audio_bytes)
+                play(audio)
                 return
             except Exception as e:
-                self.logger.warning(f"⚠️ ElevenLabs TTS failed ({e}); falling back to local TTS.")
-                self.elevenlabs_client = None  # Avoid reusing broken client
+                self.logger.warning(f"⚠️ Audio playback failed ({e}); falling back to local TTS.")
 
         # Fallback to local TTS
         self._ensure_local_tts_initialized()
@@ -280,3 +430,7 @@ class TyperAgent:
             self.engine.runAndWait()
         except Exception as e2:
             self.logger.error(f"❌ Local TTS error (fallback): {e2}")
+
+    def speak(self, text: str):
+        # If ElevenLabs is set, try; on any error, fallback to local. Only init engine once.
+        self._play_speech(text, self._synthesize_reply(text))
@@ -0,0 +1,199 @@
+import hashlib
+import importlib.util
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+WORD = re.compile(r"[a-z0-9]+")
+SUFFIXES = ("ing", "es", "ed", "s")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do for from how i in is it me my of on or our please "
+    "run show tell that the this to up use using what with you your".split()
+)
+
+
+@dataclass
+class ParamSchema:
+    name: str
+    kind: str  # "argument" or "option"
+    opts: List[str]
+    type: str
+    default: object = None
+    required: bool = False
+    is_flag: bool = False
+    help: str = ""
+
+    def usage(self) -> str:
+        if self.kind == "argument":
+            text = self.name.upper()
+            return text if self.required else f"[{text}]"
+        opt = self.opts[0]
+        if self.is_flag:
+            return f"[{opt}]"
+        if self.required:
+            return f"{opt} {self.type.upper()}"
+        default = self.default
+        if isinstance(default, str) and (" " in default or not default):
+            default = repr(default)
+        return f"[{opt}={default}]" if default is not None else f"[{opt} {self.type.upper()}]"
+
+    def label(self) -> str:
+        return self.name.upper() if self.kind == "argument" else self.opts[0]
+
+
+@dataclass
+class CommandSchema:
+    name: str
+    help: str
+    params: List[ParamSchema] = field(default_factory=list)
+
+    def render(self) -> str:
+        usage = " ".join([self.name] + [p.usage() for p in self.params])
+        lines = [f"{usage}  # {self.help}" if self.help else usage]
+        details = [f"{p.label()}: {p.help}" for p in self.params if p.help]
+        if details:
+            lines.append("    " + " | ".join(details))
+        return "\n".join(lines)
+
+    def keywords(self) -> Set[str]:
+        return keywords(" ".join([self.name, self.help] + [f"{p.name} {p.help}" for p in self.params]))
+
+
+def _stem(word: str) -> str:
+    for suffix in SUFFIXES:
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[: -len(suffix)]
+    return word
+
+
+def keywords(text: str) -> Set[str]:
+    """Stemmed content words of `text`, for relevance ranking."""
+    return {_stem(w) for w in WORD.findall(text.lower().replace("_", " ")) if w not in STOPWORDS}
+
+
+def rank(documents: Sequence[Set[str]], query: str, top_k: int) -> List[int]:
+    """
+    Indices of the `top_k` documents (keyword sets) sharing the most
+    idf-weighted keywords with `query`, best first; those sharing none are
+    left out.
+    """
+    query_words = keywords(query)
+    frequency = Counter(w for doc in documents for w in doc)
+    scores = [
+        sum(math.log(1 + len(documents) / frequency[w]) for w in query_words & doc)
+        for doc in documents
+    ]
+    ranked = sorted((i for i, score in enumerate(scores) if score > 0), key=lambda i: scores[i], reverse=True)
+    return ranked[:top_k]
+
+
+def _first_line(text: Optional[str]) -> str:
+    return (text or "").strip().split("\n", 1)[0].strip()
+
+
+def extract(typer_file: str) -> List[CommandSchema]:
+    """
+    Load the typer app in `typer_file` and describe each command: name,
+    one-line help, and its arguments/options with types and defaults.
+    Later definitions of a duplicated command replace earlier ones, as in
+    the CLI itself.
+    """
+    import typer.main
+
+    key = hashlib.sha1(os.path.abspath(typer_file).encode()).hexdigest()[:8]
+    spec = importlib.util.spec_from_file_location(f"ada_typer_schema_{key}", typer_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    group = typer.main.get_command(module.app)
+    commands = getattr(group, "commands", {group.name: group})
+    schema = []
+    for name, command in commands.items():
+        params = []
+        for param in command.params:
+            if param.name == "help" or getattr(param, "hidden", False):
+                continue
+            params.append(ParamSchema(
+                name=param.name,
+                kind=param.param_type_name,
+                opts=list(param.opts),
+                type=getattr(param.type, "name", "text"),
+                default=param.default if not callable(param.default) else None,
+                required=param.required,
+                is_flag=bool(getattr(param, "is_flag", False)),
+                help=_first_line(getattr(param, "help", "")),
+            ))
+        schema.append(CommandSchema(name, _first_line(command.help or command.short_help), params))
+    return schema
+
+
+class TyperSchemaCache:
+    """
+    Compact command schemas for the command-generation prompt, extracted
+    once per typer file contents (keyed by SHA-1; the hash is recomputed
+    only when mtime/size change). When the app cannot be loaded the raw
+    source is used, as before.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._schemas: Dict[str, Tuple[List[CommandSchema], Optional[str]]] = {}
+        self.extractions = 0
+
+    def _load(self, typer_file: str) -> Tuple[List[CommandSchema], Optional[str]]:
+        path = os.path.abspath(typer_file)
+        st = os.stat(path)
+        version = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            known = self._versions.get(path)
+            if known is not None and known[0] == version:
+                return self._schemas[known[1]]
+            with open(path, "rb") as f:
+                source = f.read()
+            digest = hashlib.sha1(source).hexdigest()
+            if digest not in self._schemas:
+                try:
+                    self._schemas[digest] = (extract(path), None)
+                except Exception:
+                    self._schemas[digest] = ([], source.decode("utf-8", "replace"))
+                self.extractions += 1
+            self._versions[path] = (version, digest)
+            return self._schemas[digest]
+
+    def commands(self, typer_file: str) -> List[CommandSchema]:
+        return self._load(typer_file)[0]
+
+    def relevant(self, commands: List[CommandSchema], query: str, top_k: int) -> List[CommandSchema]:
+        """The top_k commands most related to the query, in file order."""
+        ranked = rank([c.keywords() for c in commands], query, top_k)
+        if not ranked:
+            return commands  # nothing to go on; let the model choose from everything
+        return [commands[i] for i in sorted(ranked)]
+
+    def render(self, typer_file: str, query: str = "", top_k: int = 0) -> str:
+        """
+        The schema text for `{{typer-commands}}`: every command, or only the
+        `top_k` most relevant to `query`.
+        """
+        commands, source = self._load(typer_file)
+        if source is not None:
+            return source
+        if top_k and query and top_k < len(commands):
+            commands = self.relevant(commands, query, top_k)
+        header = f"# Commands of {typer_file}. Usage: uv run python {typer_file} COMMAND [ARGS] [OPTIONS]"
+        return "\n".join([header] + [c.render() for c in commands])
+
+
+_cache: Optional[TyperSchemaCache] = None
+
+
+def get_typer_schema() -> TyperSchemaCache:
+    """Process-wide TyperSchemaCache."""
+    global _cache
+    if _cache is None:
+        _cache = TyperSchemaCache()
+    return _cache
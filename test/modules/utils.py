@@ -1,6 +1,7 @@
 import datetime
 import json
 import os
+import threading
 from typing import Union, Dict, List
 import uuid
 
@@ -19,6 +20,22 @@ def build_file_name_session(name: str, session_id: str):
     return os.path.join(session_dir, f"{name}")
 
 
+def write_file_atomic(path: str, data: Union[str, bytes]):
+    """
+    Write `data` to `path` through a temporary file in the same directory and
+    os.replace, so concurrent readers see the old file or the new one, never half.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb" if isinstance(data, bytes) else "w") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
 def to_json_file_pretty(name: str, content: Union[Dict, List]):
     def default_serializer(obj):
         if hasattr(obj, "model_dump"):
@@ -0,0 +1,409 @@
+import logging
+import math
+import os
+import random
+import shutil
+import struct
+import tempfile
+import time
+import wave
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from modules.metrics import SttTimer, get_metrics, percentile
+from modules.providers import FakeProvider, get_provider, register_provider
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_RATE = 16000
+CHUNK_SECONDS = 0.032
+
+TYPER_UTTERANCES = (
+    ("typer-ping", "Ada, ping the server.", 1.4),
+    ("typer-ping-wait", "Ada, ping the server and wait for a response.", 2.4),
+    ("typer-list-viewers", "Ada, list users that are viewers.", 1.8),
+)
+BASE_UTTERANCES = (
+    ("base-greeting", "Ada, how are you doing today?", 1.6),
+    ("base-question", "Ada, what's a good way to learn about networking?", 2.6),
+)
+
+# Stages reported per flow: metric name (or "end_to_end") -> label.
+STAGES = (
+    ("stt_seconds", "stt"),
+    ("llm_first_token_seconds", "llm first token"),
+    ("llm_seconds", "llm total"),
+    ("command_seconds", "command"),
+    ("acknowledgement_wait_seconds", "ack wait"),
+    ("tts_first_audio_seconds", "tts first audio"),
+    ("request_seconds", "request to audio"),
+    ("end_to_end", "end to end"),
+)
+
+COMMANDS = '''import typer
+
+app = typer.Typer()
+
+
+@app.command()
+def ping(wait: bool = typer.Option(False, "--wait", help="Wait for a response")):
+    """Ping the server."""
+
+
+@app.command()
+def list_users(role: str = typer.Option("", "--role", help="Only users with this role")):
+    """List users."""
+'''
+
+
+@dataclass
+class Fixture:
+    """A recorded (or synthetic) utterance: 16-bit mono WAV plus its transcript."""
+
+    name: str
+    path: str
+    text: str
+
+    def pcm(self) -> Tuple[bytes, int]:
+        with wave.open(self.path, "rb") as f:
+            if f.getsampwidth() != 2 or f.getnchannels() != 1:
+                raise ValueError(f"{self.path}: expected 16-bit mono PCM")
+            return f.readframes(f.getnframes()), f.getframerate()
+
+    def chunks(self) -> Iterator[bytes]:
+        data, rate = self.pcm()
+        size = int(rate * CHUNK_SECONDS) * 2
+        for start in range(0, len(data), size):
+            yield data[start:start + size]
+
+
+def write_fixture(path: str, seconds: float, rate: int = SAMPLE_RATE, seed: int = 0):
+    """
+    A speech-like WAV: leading silence, `seconds` of syllable-rate modulated
+    voiced sound, then trailing silence so voice activity detection ends
+    the recording. Only useful for timing; it doesn't transcribe to words.
+    """
+    rng = random.Random(seed)
+    pitch = rng.uniform(100, 200)
+    frames = bytearray()
+    total = int(rate * (0.3 + seconds + 1.0))
+    for i in range(total):
+        t = i / rate - 0.3
+        sample = 0.0
+        if 0 <= t < seconds:
+            envelope = 0.5 * (1 - math.cos(2 * math.pi * 4 * t))  # ~4 syllables a second
+            voiced = sum(math.sin(2 * math.pi * pitch * h * t) / h for h in (1, 2, 3))
+            sample = 0.3 * envelope * voiced + 0.02 * rng.uniform(-1, 1)
+        frames += struct.pack("<h", int(max(-1.0, min(1.0, sample)) * 32767))
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(bytes(frames))
+
+
+def ensure_fixtures(directory: str, utterances=TYPER_UTTERANCES + BASE_UTTERANCES) -> str:
+    """Create synthetic `<name>.wav`/`<name>.txt` fixtures that don't exist yet."""
+    os.makedirs(directory, exist_ok=True)
+    for seed, (name, text, seconds) in enumerate(utterances):
+        wav_path = os.path.join(directory, f"{name}.wav")
+        if not os.path.exists(wav_path):
+            write_fixture(wav_path, seconds, seed=seed)
+            with open(os.path.join(directory, f"{name}.txt"), "w") as f:
+                f.write(text)
+    return directory
+
+
+def load_fixtures(directory: str, prefix: str = "") -> List[Fixture]:
+    """`<name>.wav` files in `directory` with their `<name>.txt` transcripts (empty if missing)."""
+    fixtures = []
+    for entry in sorted(os.listdir(directory), key=lambda e: os.path.splitext(e)[0]):
+        name, ext = os.path.splitext(entry)
+        if ext.lower() != ".wav" or not name.startswith(prefix):
+            continue
+        transcript = os.path.join(directory, f"{name}.txt")
+        text = open(transcript).read().strip() if os.path.exists(transcript) else ""
+        fixtures.append(Fixture(name, os.path.join(directory, entry), text))
+    return fixtures
+
+
+class FixtureTranscriber:
+    """Offline STT stand-in: the fixture's transcript after `latency` seconds."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.description = f"stubbed, fixture transcript after {latency * 1000:g} ms"
+
+    def transcribe(self, fixture: Fixture, stt: SttTimer) -> Tuple[str, float]:
+        """(transcript, perf_counter() at the end of the utterance)"""
+        utterance_end = time.perf_counter()
+        stt.recording_stopped()
+        time.sleep(self.latency)
+        stt.transcribed()
+        return fixture.text, utterance_end
+
+
+class RealtimeSttTranscriber:
+    """
+    Feeds fixture audio to RealtimeSTT's AudioToTextRecorder instead of the
+    microphone, at real-time pace so its voice activity detection behaves
+    as it does live. Runs the model on CPU.
+    """
+
+    def __init__(self, model: str = "tiny.en", realtime_pace: bool = True):
+        try:
+            from RealtimeSTT import AudioToTextRecorder
+        except ImportError as e:
+            raise ImportError("RealtimeSTT is required for --stt realtime (missing dependency).") from e
+        self.realtime_pace = realtime_pace
+        self.description = f"RealtimeSTT {model} on CPU"
+        self._stt: Optional[SttTimer] = None
+        self.recorder = AudioToTextRecorder(
+            use_microphone=False,
+            spinner=False,
+            model=model,
+            language="en",
+            device="cpu",
+            compute_type="int8",
+            post_speech_silence_duration=0.6,
+            on_recording_stop=self._recording_stopped,
+        )
+
+    def _recording_stopped(self):
+        if self._stt is not None:
+            self._stt.recording_stopped()
+
+    def transcribe(self, fixture: Fixture, stt: SttTimer) -> Tuple[str, float]:
+        """(transcript, perf_counter() at the end of the utterance)"""
+        self._stt = stt
+        _, rate = fixture.pcm()
+        for chunk in fixture.chunks():
+            self.recorder.feed_audio(chunk, original_sample_rate=rate)
+            if self.realtime_pace:
+                time.sleep(len(chunk) / 2 / rate)
+        utterance_end = time.perf_counter()
+        text = self.recorder.text()
+        stt.transcribed()
+        return text, utterance_end
+
+    def shutdown(self):
+        self.recorder.shutdown()
+
+
+class NullAudioSink:
+    """
+    Stands in for the local TTS engine and speakers (pyttsx3's say /
+    runAndWait / stop): waits `latency` seconds as synthesis would, then
+    notes when the first audio would have started. Nothing is played.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.spoken: List[str] = []
+        self.first_audio: Optional[float] = None
+
+    def say(self, text: str):
+        self.spoken.append(text)
+
+    def runAndWait(self):
+        time.sleep(self.latency)
+        if self.first_audio is None:
+            self.first_audio = time.perf_counter()
+
+    def stop(self):
+        pass
+
+    def reset(self):
+        self.first_audio = None
+
+
+@register_provider
+class BenchProvider(FakeProvider):
+    """
+    FakeProvider answering like a real brain would: a typer command for
+    command prompts, a short acknowledgement for other prefix prompts and
+    a two-sentence reply for chats.
+    """
+
+    name, label = "bench", "Bench"
+    command = "ping"
+    acknowledgement = "Done, the server answered."
+
+    def __init__(self, model: Optional[str] = None):
+        super().__init__(model, reply="Doing well, thanks for asking. What should we work on next?")
+
+    def prefix(self, prompt: str, prefix: str, no_prefix: bool = False) -> str:
+        self._answer(self.latency)
+        response = self.command if prefix.startswith("uv run") else self.acknowledgement
+        return response if no_prefix else f"{prefix} {response}"
+
+
+@dataclass
+class BenchmarkSettings:
+    """
+    Stub latencies, in seconds, and how many passes over the fixtures to
+    measure. With `command_cache` repeated typer requests reuse their cached
+    command; by default every request generates it with the LLM.
+    """
+
+    stt: float = 0.15
+    llm: float = 0.6
+    first_token: float = 0.25
+    command: float = 0.3
+    tts: float = 0.1
+    runs: int = 5
+    warmup: int = 1
+    mode: str = "execute"
+    command_cache: bool = False
+
+
+@dataclass
+class FlowReport:
+    flow: str
+    requests: int = 0
+    stages: Dict[str, Dict[str, Optional[float]]] = field(default_factory=dict)
+    counters: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    notes: Dict[str, str] = field(default_factory=dict)
+    skipped: str = ""
+
+    def as_dict(self) -> Dict:
+        return {
+            "flow": self.flow,
+            "requests": self.requests,
+            "stages": self.stages,
+            "counters": self.counters,
+            "notes": self.notes,
+            "skipped": self.skipped,
+        }
+
+    def format(self) -> str:
+        if self.skipped:
+            return f"{self.flow}: skipped ({self.skipped})"
+        lines = [f"{self.flow} ({self.requests} requests)"]
+        lines += [f"  {name}: {note}" for name, note in self.notes.items()]
+        lines.append(f"  {'stage':<18}{'p50 ms':>10}{'p95 ms':>10}{'n':>6}")
+        for _, label in STAGES:
+            stage = self.stages.get(label)
+            if stage:
+                lines.append(f"  {label:<18}{stage['p50'] * 1000:>10.1f}{stage['p95'] * 1000:>10.1f}{stage['count']:>6}")
+        return "\n".join(lines)
+
+
+def _stage(values: List[float]) -> Dict[str, Optional[float]]:
+    return {"p50": percentile(values, 50), "p95": percentile(values, 95), "count": len(values)}
+
+
+@contextmanager
+def _workspace(settings: BenchmarkSettings):
+    """A scratch working directory with prompts, config, commands and scratchpad."""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="voice-benchmark-") as directory:
+        shutil.copytree(os.path.join(ROOT, "prompts"), os.path.join(directory, "prompts"))
+        brain = f"bench:{settings.llm * 1000:g}"
+        section = f"  brain: {brain}\n  voice: local\n"
+        with open(os.path.join(directory, "assistant_config.yml"), "w") as f:
+            f.write(f"typer_assistant:\n{section}base_assistant:\n{section}")
+        with open(os.path.join(directory, "commands.py"), "w") as f:
+            f.write(COMMANDS)
+        with open(os.path.join(directory, "scratchpad.md"), "w") as f:
+            f.write("# Scratchpad\n")
+        provider = get_provider(brain)
+        provider.first_token = settings.first_token
+        os.chdir(directory)
+        try:
+            yield directory
+        finally:
+            os.chdir(previous)
+
+
+def _logger() -> logging.Logger:
+    logger = logging.getLogger("voice_benchmark")
+    logger.propagate = False
+    if not logger.handlers:
+        logger.addHandler(logging.NullHandler())
+    return logger
+
+
+def _measure(flow: str, fixtures: List[Fixture], transcriber, sink: NullAudioSink, respond, settings: BenchmarkSettings) -> FlowReport:
+    """Run utterance -> transcript -> response for every fixture, `warmup` + `runs` times."""
+    metrics = get_metrics()
+    stt = SttTimer(assistant=flow)
+    end_to_end = []
+    report = FlowReport(flow, notes={"stt": getattr(transcriber, "description", type(transcriber).__name__)})
+    for run in range(settings.warmup + settings.runs):
+        if run == settings.warmup:
+            metrics.reset()
+            end_to_end.clear()
+        for fixture in fixtures:
+            sink.reset()
+            text, utterance_end = transcriber.transcribe(fixture, stt)
+            respond(text)
+            if sink.first_audio is not None:
+                end_to_end.append(sink.first_audio - utterance_end)
+            if run >= settings.warmup:
+                report.requests += 1
+    for metric, label in STAGES:
+        values = end_to_end if metric == "end_to_end" else metrics.samples(metric)
+        if values:
+            report.stages[label] = _stage(values)
+    summary = metrics.summary()["counters"]
+    report.counters = {k: v for k, v in summary.items() if k.startswith("cache_") or k.startswith("llm_")}
+    return report
+
+
+def run_typer_flow(fixtures: List[Fixture], transcriber, settings: BenchmarkSettings) -> FlowReport:
+    """main_typer_assistant: transcript -> TyperAgent.process_text -> spoken acknowledgement."""
+    try:
+        from modules import typer_agent
+    except ImportError as e:
+        return FlowReport("typer", skipped=f"missing dependency: {e}")
+
+    sink = NullAudioSink(settings.tts)
+
+    class BenchTyperAgent(typer_agent.TyperAgent):
+        def _ensure_local_tts_initialized(self):
+            self.engine = sink
+
+    def execute(command: str, typer_file: str) -> str:
+        time.sleep(settings.command)
+        return "Server pinged.\n"
+
+    with _workspace(settings):
+        real_execute = typer_agent.execute_typer_command
+        typer_agent.execute_typer_command = execute
+        try:
+            agent = BenchTyperAgent(_logger(), "voice-benchmark")
+            agent.elevenlabs_client = None
+
+            def respond(text: str):
+                agent.process_text(text, "commands.py", "scratchpad.md", [], settings.mode)
+                if not settings.command_cache:
+                    agent.command_cache.invalidate(text, agent.config.typer_assistant.assistant_name)
+
+            report = _measure("typer", fixtures, transcriber, sink, respond, settings)
+            report.notes["command cache"] = "on (repeats skip the LLM)" if settings.command_cache else "cold"
+            agent.flush_scratchpad()
+            agent.acknowledgements.wait()
+        finally:
+            typer_agent.execute_typer_command = real_execute
+    return report
+
+
+def run_base_flow(fixtures: List[Fixture], transcriber, settings: BenchmarkSettings) -> FlowReport:
+    """main_base_assistant: transcript -> PlainAssistant.process_text -> streamed, spoken reply."""
+    try:
+        from modules import base_assistant
+    except ImportError as e:
+        return FlowReport("base", skipped=f"missing dependency: {e}")
+
+    sink = NullAudioSink(settings.tts)
+
+    class BenchPlainAssistant(base_assistant.PlainAssistant):
+        def _ensure_local_tts_initialized(self):
+            self.engine = sink
+
+    with _workspace(settings):
+        assistant = BenchPlainAssistant(_logger(), "voice-benchmark")
+        report = _measure("base", fixtures, transcriber, sink, assistant.process_text, settings)
+        assistant.memory.wait()
+    return report
@@ -3,6 +3,8 @@ import queue
 import logging
 import time
 
+from modules.metrics import SttTimer
+
 try:
     import sounddevice as sd
     import numpy as np
@@ -28,6 +30,7 @@ class VoiceListener:
         self.logger = logging.getLogger("VoiceListener")
         self._porcupine = None
         self._stream = None
+        self.stt = SttTimer(assistant="base")
 
     def start(self):
         if not PORCUPINE_AVAILABLE or AudioToTextRecorder is None:
@@ -94,10 +97,17 @@ class VoiceListener:
                 time.sleep(0.1)
         # Convert frames to bytes for AudioToTextRecorder (optional, as fallback)
         if AudioToTextRecorder is not None:
-            rec = AudioToTextRecorder(spinner=False, model="tiny.en", language="en", print_transcription_time=False)
+            rec = AudioToTextRecorder(
+                spinner=False,
+                model="tiny.en",
+                language="en",
+                print_transcription_time=False,
+                on_recording_stop=self.stt.recording_stopped,
+            )
             rec.start()
             # Let RealtimeSTT record until silence
             transcript = rec.text(lambda text: text, stop_on_silence=True, silence_time=silence_limit)
+            self.stt.transcribed()
             rec.stop()
         else:
             self.logger.warning("RealtimeSTT not installed; skipping transcription.")
@@ -3,32 +3,30 @@ import platform
 import socket
 import subprocess
 import time
-from dns import resolver
-
-import psutil
-import requests
-from scapy.all import (
-    ARP,
-    Ether,
-    ICMP,
-    IP,
-    IPerror,
-    TCP,
-    UDP,
-    sniff,
-    sr1,
-    srp,
-    traceroute,
+
+# scapy, psutil, dnspython and requests (and the asyncio-based engines) are
+# imported inside the methods that need them: scapy alone takes most of a
+# second to load, and most skills never touch it.
+from modules import netlink
+from modules.packet_capture import StreamingCapture, format_capture_stats
+from modules.paris_traceroute import HopCache, ParisTraceroute
+from modules.throughput import (
+    DEFAULT_PORT as DEFAULT_THROUGHPUT_PORT, ThroughputServer, format_result as format_throughput,
+    loopback_benchmark, run_client,
 )
 
 class NetworkDiagnosticSkill:
     def __init__(self):
         self.os = platform.system()
+        self.hop_cache = HopCache()
 
     def ping(self, target_ip: str, packet_size: int = 56, count: int = 1, timeout: int = 1) -> str:
         """
         Perform a ping operation on the target IP address.
 
+        Uses the native ICMP engine (modules.icmp_ping) when ICMP sockets are
+        available and falls back to the system ping binary otherwise.
+
         Args:
             target_ip (str): The IP address to ping.
             packet_size (int): Size of the ping packet (default: 56 bytes).
@@ -38,31 +36,71 @@ class NetworkDiagnosticSkill:
         Returns:
             str: Plain text output of the ping results.
         """
+        stats = self.ping_many([target_ip], packet_size=packet_size, count=count, timeout=timeout)[0]
+        if stats["sent"]:
+            from modules.icmp_ping import format_stats
+            return format_stats(stats)
+
         if self.os == "Windows":
-            ping_cmd = f"ping -n {count} -l {packet_size} -w {timeout*1000} {target_ip}"
+            ping_cmd = ["ping", "-n", str(count), "-l", str(packet_size), "-w", str(timeout * 1000), target_ip]
         else:
-            ping_cmd = f"ping -c {count} -s {packet_size} -W {timeout} {target_ip}"
+            ping_cmd = ["ping", "-c", str(count), "-s", str(packet_size), "-W", str(timeout), target_ip]
 
         try:
-            result = subprocess.run(ping_cmd, shell=True, check=True, text=True, capture_output=True)
+            result = subprocess.run(ping_cmd, check=True, text=True, capture_output=True)
             return result.stdout
         except subprocess.CalledProcessError as e:
             return f"Error: {e.stderr}"
+        except FileNotFoundError:
+            return "Error: ping command not found and ICMP sockets are not permitted."
+
+    def ping_many(self, targets: list, packet_size: int = 56, count: int = 1, timeout: float = 1, interval: float = 0.2) -> list:
+        """
+        Ping many targets concurrently from a single event loop.
+
+        Args:
+            targets (list): Hostnames or IP addresses to ping.
+            packet_size (int): ICMP payload size (default: 56 bytes).
+            count (int): Echo requests per target (default: 1).
+            timeout (float): Seconds to wait for replies after the last round (default: 1).
+            interval (float): Seconds between rounds (default: 0.2).
+
+        Returns:
+            list: One dict per target with sent/received counts, loss_pct and
+            rtt_min/avg/max/mdev in milliseconds.
+        """
+        from modules.icmp_ping import ping_many
+        return ping_many(targets, count=count, timeout=timeout, packet_size=packet_size, interval=interval)
 
     def traceroute(self, target_ip: str, max_hops: int = 30, packet_size: int = 40) -> str:
         """
         Perform a traceroute operation to the target IP address.
 
+        Uses the Paris-style multi-destination tracer (all TTLs at once) and
+        falls back to scapy's traceroute when raw sockets are unavailable.
+
         Args:
             target_ip (str): The IP address to trace the route to.
             max_hops (int): Maximum number of hops to attempt (default: 30).
-            packet_size (int): Size of the probe packets (default: 40 bytes).
+            packet_size (int): Size of the probe packets for the scapy fallback (default: 40 bytes).
 
         Returns:
             str: Plain text output of the traceroute results.
         """
+        try:
+            result = self.traceroute_many([target_ip], max_hops=max_hops)[0]
+            output = "Traceroute Results:\n"
+            for hop in result["hops"]:
+                output += f"Hop {hop['ttl']}: {hop['address'] or '*'}\n"
+            if not result["hops"]:
+                output += result.get("error", "No successful hops. Check target or permissions.") + "\n"
+            return output
+        except PermissionError:
+            pass
+
         # Note: scapy's traceroute might require root/admin privileges
         try:
+            from scapy.all import traceroute
             ans, unans = traceroute(target_ip, maxttl=max_hops, psize=packet_size, verbose=0)
             output = "Traceroute Results:\n"
             # Process ans for a more standard output if needed, here's a simple way
@@ -78,6 +116,27 @@ class NetworkDiagnosticSkill:
         except Exception as e:
             return f"Traceroute failed: {e}. (Scapy traceroute might require root/admin privileges)"
 
+    def traceroute_many(self, targets: list, max_hops: int = 30, timeout: float = 2.0) -> list:
+        """
+        Trace routes to many targets concurrently, Paris-traceroute style.
+
+        Path prefixes learnt by earlier calls on this skill instance are cached,
+        so repeated or neighbouring destinations only probe the hops that differ.
+
+        Args:
+            targets (list): Hostnames or IPv4 addresses.
+            max_hops (int): Maximum TTL to probe (default: 30).
+            timeout (float): Seconds to wait for replies after sending (default: 2).
+
+        Returns:
+            list: One dict per target with `hops` (ttl, address, rtt_ms, cached) and `reached`.
+
+        Raises:
+            PermissionError: If raw ICMP sockets are not permitted.
+        """
+        tracer = ParisTraceroute(max_hops=max_hops, timeout=timeout, cache=self.hop_cache)
+        return tracer.trace_many(targets)
+
     def help(self) -> str:
         """
         Return help text for the network diagnostic skill.
@@ -87,8 +146,12 @@ class NetworkDiagnosticSkill:
             "-----------------------\n"
             "1. ping(target_ip, packet_size=56, count=1, timeout=1)\n"
             "   Perform a ping operation on the target IP address.\n"
-            "2. traceroute(target_ip, max_hops=30, packet_size=40)\n"
+            "2. ping_many(targets, packet_size=56, count=1, timeout=1, interval=0.2)\n"
+            "   Ping many targets concurrently and return RTT/loss statistics.\n"
+            "3. traceroute(target_ip, max_hops=30, packet_size=40)\n"
             "   Perform a traceroute operation to the target IP address.\n"
+            "4. traceroute_many(targets, max_hops=30, timeout=2.0)\n"
+            "   Trace many targets concurrently with a shared hop cache.\n"
         )
 
     def describe(self) -> str:
@@ -103,20 +166,59 @@ class NetworkDiagnosticSkill:
 
 
 class DNSLookupSkill:
+    def __init__(self):
+        self.cache = None
+        self._resolvers = {}
+
+    def _cache(self):
+        if self.cache is None:
+            from modules.async_dns import DNSCache
+            self.cache = DNSCache()
+        return self.cache
+
+    def _resolver(self, dns_server):
+        if dns_server not in self._resolvers:
+            from dns import resolver
+            res = resolver.Resolver(configure=False)
+            res.nameservers = [dns_server]
+            res.cache = resolver.LRUCache()
+            self._resolvers[dns_server] = res
+        return self._resolvers[dns_server]
+
     def lookup(self, domain, record_type='A', dns_server='8.8.8.8'):
         try:
-            res = resolver.Resolver()
-            res.nameservers = [dns_server]
+            res = self._resolver(dns_server)
             answer = res.resolve(domain, record_type) # Changed from query to resolve for consistency
             return f"DNS {record_type} records for {domain}:\n" + '\n'.join([str(r) for r in answer])
         except Exception as e:
             return f"DNS lookup failed: {e}"
 
+    def bulk_lookup(self, domains, record_types=('A',), dns_server='8.8.8.8', port=53) -> list:
+        """
+        Resolve every domain for every record type concurrently over a pool of
+        pipelined UDP sockets. Answers are cached in-process for their TTL.
+
+        Returns:
+            list: One dict per (domain, type) with records, ttl, cached and error.
+        """
+        from modules.async_dns import bulk_resolve
+        return bulk_resolve(domains, record_types, nameservers=[dns_server], port=port, cache=self._cache())
+
+    def reverse_sweep(self, ip_range, dns_server='8.8.8.8', port=53) -> list:
+        """
+        PTR lookups for every address in a CIDR / comma-separated list (or a
+        list of addresses, e.g. the hosts found by an ARP or port scan).
+        """
+        from modules.async_dns import expand_targets, reverse_sweep
+        addresses = expand_targets(ip_range) if isinstance(ip_range, str) else list(ip_range)
+        return reverse_sweep(addresses, nameservers=[dns_server], port=port, cache=self._cache())
+
 
 class PortScannerSkill:
     def scan(self, target_ip, start_port=1, end_port=1024):
         open_ports = []
         try:
+            from scapy.all import IP, TCP, sr1
             for port in range(start_port, end_port + 1):
                 # Constructing IP/TCP packet for port scanning
                 # SYN packet is sent (flags='S')
@@ -142,7 +244,13 @@ class PortScannerSkill:
 
 class NetworkInterfaceSkill:
     def get_info(self):
+        if platform.system() == "Linux":
+            try:
+                return self._get_info_netlink()
+            except OSError:
+                pass
         try:
+            import psutil
             info = {}
             for interface, snics in psutil.net_if_addrs().items():
                 info[interface] = []
@@ -157,15 +265,40 @@ class NetworkInterfaceSkill:
         except Exception as e:
             return f"Failed to get interface info: {e}"
 
+    def _get_info_netlink(self):
+        """Interface info from the shared netlink snapshot (kept current by kernel notifications)."""
+        snapshot = netlink.shared_reader().current()
+        info = {}
+        for link in snapshot.get_links():
+            info[link['name']] = [{
+                'family': str(socket.AddressFamily.AF_PACKET),
+                'address': link['mac'],
+                'netmask': None,
+                'broadcast': 'ff:ff:ff:ff:ff:ff' if link['mac'] else None,
+                'mtu': link['mtu'],
+                'up': link['up'],
+            }]
+        for addr in snapshot.get_addresses():
+            info.setdefault(addr['interface'], []).append({
+                'family': str(socket.AddressFamily(addr['family'])),
+                'address': addr['address'],
+                'netmask': netlink.prefix_to_netmask(addr['family'], addr['prefixlen']),
+                'broadcast': addr['broadcast'],
+                'prefixlen': addr['prefixlen'],
+            })
+        return info
+
 
 class BandwidthTestSkill:
     def test(self, download_url='http://speedtest.ftp.otenet.gr/files/test100Mb.db', upload_url='http://httpbin.org/post'):
         try:
+            from modules import http_client
             # Download test
             start_time = time.time()
-            response = requests.get(download_url, stream=True)
+            session = http_client.get_session()
+            response = session.get(download_url, stream=True, timeout=60)
             size = 0
-            for chunk in response.iter_content(1024):
+            for chunk in response.iter_content(256 * 1024):
                 size += len(chunk)
             download_time = time.time() - start_time
             download_speed_mbps = (size * 8 / (1024 * 1024)) / download_time if download_time > 0 else 0 # in Mbps
@@ -174,7 +307,7 @@ class BandwidthTestSkill:
             dummy_payload_size = 1 * 1024 * 1024  # 1MB
             dummy_payload = {'file': ('dummy.bin', b'0' * dummy_payload_size)}
             start_time = time.time()
-            requests.post(upload_url, files=dummy_payload)
+            session.post(upload_url, files=dummy_payload, timeout=60)
             upload_time = time.time() - start_time
             upload_speed_mbps = (dummy_payload_size * 8 / (1024 * 1024)) / upload_time if upload_time > 0 else 0 # in Mbps
 
@@ -182,12 +315,47 @@ class BandwidthTestSkill:
         except Exception as e:
             return f"Bandwidth test failed: {e}"
 
+    def local_test(self, host=None, port=DEFAULT_THROUGHPUT_PORT, streams=4, duration=10, interval=1, reverse=False, on_interval=None):
+        """
+        Multi-stream TCP throughput test against a bundled server, without
+        third-party endpoints. With no `host` a server is started on loopback
+        and both directions are measured; otherwise `host` must be running
+        `serve()` and one direction is measured (`reverse` = server sends).
+
+        Returns:
+            str: Per-interval and total throughput text.
+        """
+        try:
+            if host is None:
+                results = loopback_benchmark(streams, duration, interval, on_interval=on_interval)
+            else:
+                results = [run_client(host, port, streams, duration, interval, reverse, on_interval=on_interval)]
+            return "\n".join(format_throughput(r) for r in results)
+        except Exception as e:
+            return f"Local bandwidth test failed: {e}"
+
+    def serve(self, host='0.0.0.0', port=DEFAULT_THROUGHPUT_PORT):
+        """Run the throughput server in the foreground until interrupted."""
+        try:
+            server = ThroughputServer(host, port)
+        except OSError as e:
+            return f"Failed to start throughput server: {e}"
+        print(f"Throughput server listening on {server.address[0]}:{server.address[1]}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+        return "Throughput server stopped."
+
 
 class PacketSnifferSkill:
     def sniff(self, filter_expr='', count=10, timeout=None): # Added timeout
         try:
             # Ensure user knows this might need privileges
             print("Attempting to sniff packets. This may require administrative/root privileges.")
+            from scapy.all import sniff
             packets = sniff(filter=filter_expr, count=count, timeout=timeout)
             if packets:
                 return "\n".join([packet.summary() for packet in packets])
@@ -198,11 +366,35 @@ class PacketSnifferSkill:
         except Exception as e:
             return f"Packet sniffing failed: {e}"
 
+    def capture(self, filter_expr='', duration=10, count=0, iface=None, pcap_path=None, ring_slots=4096, snaplen=256, top=10):
+        """
+        High-rate streaming capture (Linux). Frames are read through a
+        BPF-filtered AF_PACKET socket into a bounded ring buffer and reduced to
+        rolling aggregates (top talkers, ports, protocols) instead of being
+        kept as scapy packets; optionally spilled to a pcap file.
+
+        Returns:
+            str: Aggregate summary text.
+        """
+        try:
+            cap = StreamingCapture(iface=iface, filter_expr=filter_expr, ring_slots=ring_slots,
+                                   snaplen=snaplen, pcap_path=pcap_path)
+            cap.run(count=count, duration=duration)
+            summary = format_capture_stats(cap.stats(top))
+            if pcap_path:
+                summary += f"\nFrames written to {pcap_path}"
+            return summary
+        except PermissionError:
+            return "Packet capture failed: Permission denied. Please run as administrator/root."
+        except Exception as e:
+            return f"Packet capture failed: {e}"
+
 
 class ARPScanSkill:
     def scan(self, ip_range='192.168.1.0/24'):
         clients = []
         try:
+            from scapy.all import ARP, Ether, srp
             arp_request = ARP(pdst=ip_range)
             broadcast = Ether(dst='ff:ff:ff:ff:ff:ff')
             arp_request_broadcast = broadcast/arp_request
@@ -239,36 +431,85 @@ class TCPConnectionTestSkill:
             if 'sock' in locals():
                 sock.close()
 
+    def test_matrix(self, path: str, concurrency: int = 500, timeout: float = 2.0, show_all: bool = False) -> str:
+        """
+        Verify a CSV/YAML matrix of expected-open/expected-closed host:port
+        pairs concurrently and report deviations (every check with `show_all`).
+        """
+        from modules.tcp_matrix import check_matrix, format_matrix, load_expectations
+        try:
+            checks = load_expectations(path)
+        except FileNotFoundError:
+            return f"Expectation file not found: {path}"
+        except (KeyError, ValueError) as e:
+            return f"Invalid expectation file {path}: {e}"
+        start = time.time()
+        results = check_matrix(checks, concurrency=concurrency, timeout=timeout)
+        return format_matrix(results, time.time() - start, show_all)
+
 class LatencyMonitorSkill:
+    def __init__(self):
+        self.monitor_obj = None
+
     def monitor(self, target_ip: str, interval: int = 60, duration: int = 3600) -> list:
         """
-        Monitors latency to a target IP over a duration.
-        This is a placeholder and would typically involve repeated pings.
+        Monitors latency to a target IP over a duration (blocking).
+        Returns one line per probe followed by a percentile summary.
         """
-        # This is a simplified placeholder. A real implementation would
-        # involve a loop, sleeping, and pinging, then collecting results.
-        results = []
-        end_time = time.time() + duration
-        count = 0
-        nd_skill = NetworkDiagnosticSkill()
+        from modules.latency_store import LatencyMonitor, format_snapshot
         print(f"Starting latency monitoring for {target_ip} for {duration}s with {interval}s interval.")
-        while time.time() < end_time:
-            count += 1
-            ping_result = nd_skill.ping(target_ip, count=1, timeout=max(1, interval -1)) # Ensure timeout is less than interval
-            results.append(f"Ping {count} at {time.strftime('%Y-%m-%d %H:%M:%S')}: {ping_result.strip()}")
-            if time.time() + interval < end_time:
-                 time.sleep(interval)
-            else:
-                break # Avoid sleeping past duration
+        mon = LatencyMonitor([target_ip], interval=interval, timeout=max(1, interval - 1))
+        mon.start(duration=duration)
+        mon.wait()
+        series = mon.series[target_ip]
+        results = []
+        for count, (ts, rtt) in enumerate(series.samples(), start=1):
+            stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts))
+            outcome = f"{rtt:.3f} ms" if rtt is not None else "timeout"
+            results.append(f"Ping {count} at {stamp}: {outcome}")
+        if results:
+            results.append(format_snapshot(mon.snapshot()))
         return results if results else ["No latency data collected."]
 
+    def start(self, targets: list, interval: float = 1.0, timeout: float = 1.0, capacity: int = 3600,
+              duration: float = None, status_path: str = None, csv_path: str = None) -> str:
+        """
+        Start a background monitor probing all targets concurrently.
+        Replaces any monitor already started by this skill.
+        """
+        from modules.latency_store import LatencyMonitor
+        self.stop()
+        self.monitor_obj = LatencyMonitor(targets, interval=interval, timeout=timeout, capacity=capacity,
+                                          status_path=status_path, csv_path=csv_path)
+        self.monitor_obj.start(duration=duration)
+        return f"Latency monitor started for {len(self.monitor_obj.targets)} target(s) every {interval}s."
+
+    def stop(self) -> str:
+        """Stop the background monitor, keeping its collected samples."""
+        if self.monitor_obj is None or not self.monitor_obj.is_running():
+            return "No latency monitor running."
+        self.monitor_obj.stop()
+        return "Latency monitor stopped."
+
+    def status(self) -> dict:
+        """Live statistics (loss, last RTT, p50/p95/p99, jitter) for every monitored target."""
+        if self.monitor_obj is None:
+            return {}
+        return self.monitor_obj.snapshot()
+
 
 class RouteTableSkill:
     def get_routes(self) -> list:
         """
         Retrieves the system's route table.
-        This is a placeholder. A real implementation would parse OS-specific commands.
+        On Linux the main table is read over rtnetlink; other systems parse
+        `route print` / `netstat -rn`.
         """
+        if platform.system() == "Linux":
+            try:
+                return self._get_routes_netlink()
+            except OSError:
+                pass
         routes = []
         try:
             if platform.system() == "Windows":
@@ -340,4 +581,35 @@ class RouteTableSkill:
         
         if not routes:
             return [{'destination': 'N/A', 'gateway': 'N/A', 'netmask': 'N/A', 'interface': 'N/A', 'status': 'No routes found or failed to parse'}]
-        return routes
\ No newline at end of file
+        return routes
+
+    def _get_routes_netlink(self) -> list:
+        snapshot = netlink.shared_reader().current()
+        routes = []
+        for route in snapshot.get_routes():
+            if route['type'] != netlink.RTN_UNICAST:
+                continue
+            unspecified = "0.0.0.0" if route['family'] == socket.AF_INET else "::"
+            routes.append({
+                'destination': route['destination'],
+                'gateway': route['gateway'] or unspecified,
+                'netmask': netlink.prefix_to_netmask(route['family'], route['prefixlen']),
+                'interface': route['interface'],
+                'prefixlen': route['prefixlen'],
+                'metric': route['metric'],
+                'family': 'inet' if route['family'] == socket.AF_INET else 'inet6',
+            })
+        if not routes:
+            return [{'destination': 'N/A', 'gateway': 'N/A', 'netmask': 'N/A', 'interface': 'N/A', 'status': 'No routes found or failed to parse'}]
+        return routes
+
+    def get_neighbours(self) -> list:
+        """ARP/NDP neighbour table (Linux, via rtnetlink)."""
+        try:
+            snapshot = netlink.shared_reader().current()
+        except OSError as e:
+            return [{'error': f'Failed to read neighbours: {e}'}]
+        return [
+            {'address': n['address'], 'mac': n['mac'], 'interface': n['interface'], 'state': n['state']}
+            for n in snapshot.get_neighbours() if n['state'] != 'noarp'
+        ]
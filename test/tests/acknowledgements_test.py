@@ -0,0 +1,82 @@
+import itertools
+import threading
+
+from modules.acknowledgements import AcknowledgementCache
+
+
+def _generator():
+    counter = itertools.count(1)
+    calls = []
+
+    def generate(action, assistant_name, human_name):
+        calls.append(action)
+        return f"{action}, {human_name} #{next(counter)}"
+
+    return generate, calls
+
+
+def test_hot_path_serves_pool_without_generating(tmp_path):
+    """A warm pool is served in rotation; generation only runs in the background"""
+    generate, calls = _generator()
+    cache = AcknowledgementCache(generate, render=lambda text: text.encode(), pool_size=3,
+                                 refresh_every=100, directory=str(tmp_path))
+    cache.warm(["Command generated"], "Ada", "Dan")
+    cache.wait()
+    assert len(calls) == 3
+
+    served = [cache.get("Command generated", "Ada", "Dan") for _ in range(4)]
+    assert [text for text, _ in served] == [
+        "Command generated, Dan #1", "Command generated, Dan #2", "Command generated, Dan #3",
+        "Command generated, Dan #1",
+    ]
+    assert served[0][1] == b"Command generated, Dan #1"
+    assert len(calls) == 3
+    assert cache.get("Command generated", "Ada", "Sam") is None
+
+
+def test_cold_miss_is_generated_once():
+    """A cold miss generates nothing itself; the caller's phrasing seeds the pool"""
+    generate, calls = _generator()
+    cache = AcknowledgementCache(generate, pool_size=3)
+    assert cache.get("Command generated", "Ada", "Dan") is None
+    cache.wait()
+    assert calls == []
+
+    cache.add("Command generated", "Ada", "Dan", "Done, Dan.", None)
+    cache.wait()
+    assert len(calls) == 2
+    texts = {cache.get("Command generated", "Ada", "Dan")[0] for _ in range(3)}
+    assert "Done, Dan." in texts and len(texts) == 3
+
+
+def test_refresh_replaces_oldest_variant():
+    """After refresh_every uses one variant is regenerated in the background"""
+    generate, calls = _generator()
+    cache = AcknowledgementCache(generate, pool_size=2, refresh_every=3)
+    cache.warm(["Command generated and executed"], "Ada", "Dan")
+    cache.wait()
+    for _ in range(3):
+        cache.get("Command generated and executed", "Ada", "Dan")
+    cache.wait()
+
+    texts = {cache.get("Command generated and executed", "Ada", "Dan")[0] for _ in range(2)}
+    assert texts == {"Command generated and executed, Dan #2", "Command generated and executed, Dan #3"}
+
+
+def test_pools_and_audio_persist(tmp_path):
+    """A new cache over the same directory starts warm, audio included"""
+    generate, _ = _generator()
+    first = AcknowledgementCache(generate, render=lambda text: b"mp3:" + text.encode(),
+                                 voice="v1", pool_size=1, directory=str(tmp_path))
+    first.warm(["Command generated"], "Ada", "Dan")
+    first.wait()
+
+    blocked = threading.Event()
+    second = AcknowledgementCache(lambda *args: blocked.wait(), voice="v1", pool_size=1,
+                                  directory=str(tmp_path))
+    assert second.get("Command generated", "Ada", "Dan") == (
+        "Command generated, Dan #1", b"mp3:Command generated, Dan #1"
+    )
+    other_voice = AcknowledgementCache(generate, voice="v2", pool_size=1, directory=str(tmp_path))
+    assert other_voice.get("Command generated", "Ada", "Dan") is None
+    blocked.set()
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from modules.assistant_config import AssistantConfig, get_config
+
+CONFIG = """typer_assistant:
+  assistant_name: Ada
+  brain: gemini
+  voice: local
+base_assistant:
+  human_companion_name: Dan
+extra:
+  nested:
+    key: 3
+"""
+
+
+def _write(path, text, ns):
+    path.write_text(text)
+    os.utime(path, ns=(ns, ns))
+
+
+def test_dotted_access_with_typed_defaults(tmp_path):
+    """Dotted keys resolve from one parse; missing fields take section defaults"""
+    path = tmp_path / "assistant_config.yml"
+    path.write_text(CONFIG)
+    config = AssistantConfig(str(path))
+
+    assert config.get("typer_assistant.brain") == "gemini"
+    assert config.get("base_assistant.brain") == "gemini"
+    assert config.get("typer_assistant.human_companion_name") == "Dan"
+    assert config.get("extra.nested.key") == 3
+    assert config.get("extra.nested") == {"key": 3}
+    assert config.typer_assistant.voice == "local"
+    assert config.get("typer_assistant.missing", "fallback") == "fallback"
+    with pytest.raises(KeyError):
+        config.get("typer_assistant.missing")
+    assert "ears" not in config.as_dict()["typer_assistant"]
+
+
+def test_reloads_on_change_and_keeps_last_good(tmp_path):
+    """Edits are picked up by mtime; an invalid edit keeps the previous snapshot"""
+    path = tmp_path / "assistant_config.yml"
+    _write(path, CONFIG, 10**18)
+    config = AssistantConfig(str(path), check_interval=0)
+    first = config.snapshot()
+    assert config.snapshot() is first
+
+    _write(path, CONFIG.replace("brain: gemini", "brain: groq"), 10**18 + 1)
+    assert config.typer_assistant.brain == "groq"
+
+    _write(path, CONFIG.replace("voice: local", "voice: shouting"), 10**18 + 2)
+    assert config.typer_assistant.brain == "groq"
+    assert isinstance(config.last_error, ValueError)
+
+
+def test_save_validates_and_replaces(tmp_path):
+    """save() rejects invalid data and otherwise swaps the file in atomically"""
+    path = tmp_path / "assistant_config.yml"
+    path.write_text(CONFIG)
+    config = AssistantConfig(str(path))
+
+    with pytest.raises(ValueError):
+        config.save({"typer_assistant": {"voice": "shouting"}})
+    assert config.typer_assistant.brain == "gemini"
+
+    data = config.as_dict()
+    data["typer_assistant"]["brain"] = "mistral"
+    config.save(data)
+    assert config.get("typer_assistant.brain") == "mistral"
+    assert os.listdir(tmp_path) == ["assistant_config.yml"]
+
+
+def test_get_config_shares_one_instance(tmp_path, monkeypatch):
+    """get_config resolves against the working directory and raises for missing files"""
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(FileNotFoundError):
+        get_config("typer_assistant.brain")
+    (tmp_path / "assistant_config.yml").write_text(CONFIG)
+    assert get_config("typer_assistant.assistant_name") == "Ada"
@@ -0,0 +1,88 @@
+import socket
+import threading
+
+import pytest
+
+dns = pytest.importorskip("dns")
+import dns.message
+import dns.rcode
+import dns.rrset
+import dns.rdatatype
+
+from modules.async_dns import DNSCache, bulk_resolve, expand_targets, reverse_sweep
+
+
+class StubDNSServer:
+    """Tiny UDP DNS server: hostN.test -> 10.0.0.N, PTR for 10.0.0.0/24, NXDOMAIN otherwise."""
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+        self.queries = 0
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.sock.close()
+
+    def _serve(self):
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(4096)
+            except OSError:
+                return
+            self.queries += 1
+            query = dns.message.from_wire(data)
+            question = query.question[0]
+            name = question.name.to_text()
+            response = dns.message.make_response(query)
+            if question.rdtype == dns.rdatatype.A and name.startswith("host"):
+                n = int(name[4:].split(".")[0])
+                response.answer.append(dns.rrset.from_text(name, 300, "IN", "A", f"10.0.0.{n}"))
+            elif question.rdtype == dns.rdatatype.PTR and name.endswith("0.0.10.in-addr.arpa."):
+                n = name.split(".")[0]
+                response.answer.append(dns.rrset.from_text(name, 300, "IN", "PTR", f"host{n}.test."))
+            else:
+                response.set_rcode(dns.rcode.NXDOMAIN)
+            self.sock.sendto(response.to_wire(), addr)
+
+
+def test_bulk_resolve_concurrently_with_cache():
+    """Hundreds of names resolve in one call and repeat lookups hit the cache"""
+    cache = DNSCache()
+    names = [f"host{i}.test" for i in range(1, 201)] + ["missing.test"]
+    with StubDNSServer() as server:
+        results = bulk_resolve(names, ["A"], nameservers=["127.0.0.1"], port=server.port, cache=cache)
+        assert server.queries == len(names)
+
+        again = bulk_resolve(names[:10], ["A"], nameservers=["127.0.0.1"], port=server.port, cache=cache)
+        assert server.queries == len(names)
+
+    assert results[0]["records"] == ["10.0.0.1"]
+    assert results[199]["records"] == ["10.0.0.200"]
+    assert results[-1]["error"] == "NXDOMAIN"
+    assert all(r["cached"] for r in again)
+    assert cache.hits == 10
+
+
+def test_reverse_sweep_over_range():
+    """PTR sweep over a CIDR keeps each answer paired with its address"""
+    with StubDNSServer() as server:
+        results = reverse_sweep(expand_targets("10.0.0.0/29"), nameservers=["127.0.0.1"], port=server.port)
+
+    assert [r["address"] for r in results] == [f"10.0.0.{i}" for i in range(1, 7)]
+    assert results[2]["records"] == ["host3.test."]
+
+
+def test_cache_respects_ttl():
+    """Entries with a zero TTL are never cached"""
+    cache = DNSCache()
+    cache.put("a.test", "A", {"records": ["1.2.3.4"]}, 0)
+    cache.put("b.test", "A", {"records": ["1.2.3.5"]}, 60)
+
+    assert cache.get("a.test", "A") is None
+    assert cache.get("B.test.", "a")["records"] == ["1.2.3.5"]
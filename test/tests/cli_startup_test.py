@@ -0,0 +1,91 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+typer = pytest.importorskip("typer")
+
+from modules.cli_startup import import_breakdown, parse_importtime, profile_startup, select_command
+
+ROOT = Path(__file__).resolve().parent.parent
+# Extra seconds a simple command may take over a bare interpreter start.
+STARTUP_BUDGET = 0.35
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   encodings.utf_8
+import time:       900 |       1000 | encodings
+import time:      5000 |      30000 |   typer.main
+import time:       400 |      40000 | typer
+import time:       200 |       2000 | modules.utils
+"""
+
+
+def test_import_breakdown_groups_top_level_imports():
+    """Only depth-0 imports are counted, grouped by root package"""
+    entries = parse_importtime(IMPORTTIME)
+    assert entries[0] == ("encodings.utf_8", 100, 100, 1)
+    assert import_breakdown(entries) == {"typer": 40000, "modules": 2000, "encodings": 1000}
+
+
+def test_select_command_keeps_only_invoked_command():
+    """The invoked command is the only one built; top-level help keeps them all"""
+    app = typer.Typer()
+
+    @app.callback()
+    def main():
+        pass
+
+    @app.command()
+    def network_ping():
+        pass
+
+    @app.command()
+    def network_tcp_test():
+        pass
+
+    assert select_command(app, ["--help"]) is None
+    assert select_command(app, ["--help", "network-ping"]) is None
+    assert select_command(app, ["unknown"]) is None
+    assert len(app.registered_commands) == 2
+    assert select_command(app, ["network-tcp-test", "127.0.0.1"]) == "network-tcp-test"
+    assert [c.callback for c in app.registered_commands] == [network_tcp_test]
+
+
+def test_profile_startup_never_runs_the_command(tmp_path):
+    """Profiling loads the command with --help instead of running it"""
+    marker = tmp_path / "ran"
+    script = tmp_path / "commands" / "cli.py"
+    script.parent.mkdir()
+    script.write_text(
+        "import typer\n"
+        "app = typer.Typer()\n"
+        "@app.callback()\n"
+        "def main():\n"
+        "    pass\n"
+        "@app.command()\n"
+        "def touch(path: str):\n"
+        "    open(path, 'w').close()\n"
+        "app()\n"
+    )
+    report = profile_startup(str(script), ["touch", str(marker)])
+    assert report.startswith("Startup profile: touch --help")
+    assert "typer" in report
+    assert not marker.exists()
+
+
+def _best_of(cmd, runs=3):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=ROOT, capture_output=True, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_simple_command_cold_start_within_budget():
+    """`network-tcp-test` starts within the budget over a bare interpreter"""
+    baseline = _best_of([sys.executable, "-c", "pass"])
+    command = _best_of([sys.executable, "commands/template.py", "network-tcp-test", "127.0.0.1", "9", "--timeout", "1"])
+    assert command - baseline < STARTUP_BUDGET, f"cold start {command:.3f}s vs baseline {baseline:.3f}s"
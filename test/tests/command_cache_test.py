@@ -0,0 +1,80 @@
+import os
+
+from modules.command_cache import CommandCache, command_names, normalize
+
+TYPER = '''import typer
+
+app = typer.Typer()
+
+
+@app.command()
+def network_ping(host: str):
+    pass
+
+
+@app.command(name="scan")
+def port_scan(host: str, ports: str = "common"):
+    pass
+'''
+
+
+def _typer_file(tmp_path, source=TYPER):
+    path = tmp_path / "commands.py"
+    path.write_text(source)
+    return str(path)
+
+
+def test_normalize_and_command_names():
+    """Wake word, fillers, articles and punctuation don't change the key"""
+    assert normalize("Hey Ada, could you ping the server please?", "Ada") == "ping server"
+    assert normalize("ping 8.8.8.8.", "Ada") == "ping 8.8.8.8"
+    assert command_names(TYPER) == {"network-ping", "scan"}
+
+
+def test_exact_and_similar_hits(tmp_path):
+    """Rephrasings hit only when their literal arguments are the same"""
+    typer_file = _typer_file(tmp_path)
+    cache = CommandCache()
+    command = f"uv run python {typer_file} network-ping 8.8.8.8"
+
+    assert cache.lookup("Ada, ping 8.8.8.8", typer_file, "Ada") is None
+    assert cache.store("Ada, ping 8.8.8.8", typer_file, command, "Ada")
+    assert cache.lookup("ping 8.8.8.8 please", typer_file, "Ada") == (command, 1.0)
+
+    scan = f"uv run python {typer_file} scan 192.168.1.0/24"
+    assert cache.store("scan network at 192.168.1.0/24 using common ports", typer_file, scan)
+    hit = cache.lookup("scan network 192.168.1.0/24 using common ports", typer_file)
+    assert hit[0] == scan and 0.9 <= hit[1] < 1.0
+    assert cache.lookup("scan network at 10.0.0.0/24 using common ports", typer_file) is None
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_rejects_invalid_and_invalidates_on_change(tmp_path):
+    """Unknown commands are never cached; editing the typer file drops entries"""
+    typer_file = _typer_file(tmp_path)
+    path = str(tmp_path / "command_cache.json")
+    cache = CommandCache(path=path)
+
+    assert not cache.store("trace it", typer_file, f"uv run python {typer_file} network-trace x")
+    assert not cache.store("ping it", typer_file, "rm -rf /")
+    command = f"uv run python {typer_file} network-ping a.example && uv run python {typer_file} scan a.example"
+    assert cache.store("ping and scan a.example", typer_file, command)
+    assert CommandCache(path=path).lookup("ping and scan a.example", typer_file)[0] == command
+
+    _typer_file(tmp_path, TYPER + "\n# changed\n")
+    os.utime(typer_file, ns=(10**18, 10**18))
+    assert cache.lookup("ping and scan a.example", typer_file) is None
+
+
+def test_similar_requests_with_other_words_miss(tmp_path):
+    """Opposite or different requests never share a command, failed ones are forgotten"""
+    typer_file = _typer_file(tmp_path)
+    cache = CommandCache()
+    stop = f"uv run python {typer_file} network-ping stop-monitor"
+    assert cache.store("stop the latency monitor", typer_file, stop)
+
+    assert cache.lookup("start the latency monitor", typer_file) is None
+    assert cache.lookup("latency monitor stop", typer_file)[0] == stop
+
+    cache.invalidate("latency monitor stop", command=stop)
+    assert cache.lookup("stop the latency monitor", typer_file) is None
@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("typer")
+
+from modules import command_server
+from modules.command_server import CommandServer, parse_invocation, request, run_command, send
+
+COMMANDS = '''import typer
+
+app = typer.Typer()
+
+@app.callback()
+def main():
+    pass
+
+@app.command()
+def greet(name: str):
+    typer.echo(f"{GREETING}, {name}")
+'''
+
+
+def test_parse_invocation():
+    """Plain invocations of the typer file are parsed; shell constructs are not"""
+    f = "commands/template.py"
+    assert parse_invocation("uv run python commands/template.py network-ping 8.8.8.8", f) == ["network-ping", "8.8.8.8"]
+    assert parse_invocation("python ./commands/template.py dns 'a b'", f) == ["dns", "a b"]
+    assert parse_invocation("uv run python commands/template.py a && rm -rf x", f) is None
+    assert parse_invocation("uv run python commands/template.py a | grep b", f) is None
+    assert parse_invocation("uv run python commands/template.py $(whoami)", f) is None
+    assert parse_invocation("uv run python other.py a", f) is None
+
+
+def test_server_runs_commands_in_process_and_reloads(tmp_path):
+    """Commands run over the socket and edits to the file are picked up"""
+    typer_file = tmp_path / "commands.py"
+    typer_file.write_text(COMMANDS.replace("{GREETING}", "Hello"))
+    socket_path = str(tmp_path / "cmd.sock")
+    server = CommandServer(str(typer_file), socket_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        assert send(["greet", "Ada"], socket_path) == "Hello, Ada\n"
+        output, exit_code = request(["greet"], socket_path)
+        assert "Missing argument" in output and exit_code != 0
+        assert request(["greet", "Ada"], socket_path) == ("Hello, Ada\n", 0)
+
+        time.sleep(0.01)
+        typer_file.write_text(COMMANDS.replace("{GREETING}", "Hi"))
+        os.utime(typer_file, ns=(time.time_ns(), time.time_ns() + 10**9))
+        assert send(["greet", "Ada"], socket_path) == "Hi, Ada\n"
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert not os.path.exists(socket_path)
+
+
+def test_failed_start_falls_back_quickly_and_backs_off(tmp_path, monkeypatch):
+    """A server that dies on startup is noticed at once and not restarted for every command"""
+    typer_file = tmp_path / "commands.py"
+    typer_file.write_text("import does_not_exist\n")
+    socket_path = str(tmp_path / "cmd.sock")
+    monkeypatch.setattr(command_server, "_failed_starts", {})
+    popen = command_server.subprocess.Popen
+    starts = []
+
+    def counting_popen(*args, **kwargs):
+        starts.append(args)
+        return popen(*args, **kwargs)
+
+    monkeypatch.setattr(command_server.subprocess, "Popen", counting_popen)
+    command = f"uv run python {typer_file} greet Ada"
+
+    start = time.monotonic()
+    assert run_command(command, str(typer_file), socket_path) is None
+    assert time.monotonic() - start < 5
+    assert run_command(command, str(typer_file), socket_path) is None
+    assert len(starts) == 1
+    assert command_server.start_backed_off(str(typer_file))
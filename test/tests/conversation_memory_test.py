@@ -0,0 +1,73 @@
+import threading
+
+from modules.conversation_memory import ConversationMemory, message_tokens
+
+
+def _total(messages):
+    return sum(message_tokens(m) for m in messages)
+
+
+def test_prompt_size_stays_bounded():
+    """A long session folds old turns into the summary and stays within budget"""
+    prompts = []
+
+    def summarize(prompt):
+        prompts.append(prompt)
+        return f"summary {len(prompts)}"
+
+    memory = ConversationMemory(summarize=summarize, token_budget=200, recent_budget=100, summary_budget=50)
+    for i in range(200):
+        memory.add("user", f"question {i} " + "x" * 40)
+        memory.add("assistant", f"answer {i} " + "y" * 40)
+        assert _total(memory.messages()) <= 200
+    memory.wait()
+
+    messages = memory.messages()
+    assert messages[0]["role"] == "system"
+    assert messages[0]["content"].endswith(f"summary {len(prompts)}")
+    assert messages[-1]["content"].startswith("answer 199")
+    assert "question 0" in prompts[0]
+
+
+def test_turn_does_not_wait_for_summary():
+    """Folded messages are served verbatim while the summarizer is still running"""
+    release = threading.Event()
+
+    def summarize(prompt):
+        release.wait(5)
+        return "folded"
+
+    memory = ConversationMemory(summarize=summarize, token_budget=300, recent_budget=40, summary_budget=50)
+    memory.add("user", "my name is Dan " + "z" * 100)
+    memory.add("assistant", "hello Dan")
+    memory.add("user", "what is my name?")
+
+    contents = [m["content"] for m in memory.messages()]
+    assert contents[0].startswith("my name is Dan")
+    release.set()
+    memory.wait()
+    assert memory.messages()[0]["content"].endswith("folded")
+
+
+def test_failed_summary_keeps_extract_and_retrieval():
+    """Summarizer errors fall back to an extract; embeddings bring back related turns"""
+    vocab = ["router", "printer", "weather"]
+
+    def embed(text):
+        return [float(word in text) for word in vocab]
+
+    def summarize(prompt):
+        raise RuntimeError("provider down")
+
+    memory = ConversationMemory(summarize=summarize, embed=embed, token_budget=400,
+                                recent_budget=30, summary_budget=50, retrieve_k=1)
+    memory.add("user", "the router is in the hallway cupboard")
+    memory.add("user", "the printer needs toner")
+    memory.add("user", "the weather is nice today " + "w" * 60)
+    memory.add("assistant", "ok")
+    memory.wait()
+
+    assert "toner" in memory.summary
+    assert memory.retrieve("where is the router?")[0]["content"].startswith("the router")
+    contents = [m["content"] for m in memory.messages(query="where is the router?")]
+    assert any(c.startswith("Relevant earlier messages") and "hallway" in c for c in contents)
@@ -0,0 +1,79 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from modules import http_client
+from modules.http_client import AddrInfoCache
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        type(self).connections += 1
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_session_reuses_keep_alive_connection():
+    """Repeated requests to one host share a single pooled TCP connection"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    try:
+        responses = [http_client.get(url) for _ in range(5)]
+    finally:
+        server.shutdown()
+        server.server_close()
+        http_client.close()
+
+    assert [r.text for r in responses] == ["ok"] * 5
+    assert _Handler.connections == 1
+
+
+def test_addrinfo_cache_skips_repeat_lookups():
+    """Host names are resolved once per TTL; IP literals bypass the cache"""
+    calls = []
+
+    def resolver(host, port, *args):
+        calls.append(host)
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("192.0.2.7", port))]
+
+    cache = AddrInfoCache(resolver, ttl=60)
+    first = cache("api.example.test", 443)
+    second = cache("api.example.test", 443)
+    cache("192.0.2.7", 443)
+    cache("192.0.2.7", 443)
+
+    assert first == second
+    assert calls == ["api.example.test", "192.0.2.7", "192.0.2.7"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_dns_cache_is_opt_in(monkeypatch):
+    """The pooled clients leave getaddrinfo alone unless HTTP_DNS_CACHE_TTL is set"""
+    original = socket.getaddrinfo
+    monkeypatch.delenv("HTTP_DNS_CACHE_TTL", raising=False)
+    http_client.get_session()
+    http_client.close()
+    assert socket.getaddrinfo is original
+
+    monkeypatch.setenv("HTTP_DNS_CACHE_TTL", "30")
+    try:
+        http_client.get_session()
+        assert isinstance(socket.getaddrinfo, AddrInfoCache)
+        assert socket.getaddrinfo.ttl == 30
+    finally:
+        http_client.close()
+        http_client.uninstall_dns_cache()
+    assert socket.getaddrinfo is original
@@ -0,0 +1,54 @@
+import socket
+import struct
+
+import pytest
+from modules.icmp_ping import (
+    _checksum,
+    build_echo_request,
+    open_icmp_socket,
+    parse_echo_reply,
+    ping_many,
+    summarize,
+)
+
+
+def test_echo_request_checksum_is_valid():
+    """A built IPv4 echo request checksums to zero"""
+    packet = build_echo_request(0x1234, 7, b"payload")
+    assert _checksum(packet) == 0
+    assert packet[0] == 8
+
+
+def test_parse_echo_reply_strips_raw_ip_header():
+    """Raw IPv4 replies carry the IP header, datagram replies do not"""
+    icmp = struct.pack("!BBHHH", 0, 0, 0, 0x1234, 7) + b"data"
+    ip_header = bytes([0x45]) + bytes(19)
+    assert parse_echo_reply(icmp, raw=False) == (0x1234, 7)
+    assert parse_echo_reply(ip_header + icmp, raw=True) == (0x1234, 7)
+    # Echo requests (e.g. our own on loopback) are ignored
+    assert parse_echo_reply(build_echo_request(1, 1, b""), raw=False) is None
+
+
+def test_summarize_statistics():
+    """Loss and RTT statistics are computed from the collected samples"""
+    stats = summarize("host", "10.0.0.1", 4, [1.0, 2.0, 3.0])
+    assert stats["received"] == 3
+    assert stats["loss_pct"] == 25.0
+    assert stats["rtt_min"] == 1.0
+    assert stats["rtt_avg"] == 2.0
+    assert stats["rtt_max"] == 3.0
+
+
+def test_ping_many_loopback():
+    """Ping loopback concurrently through the native engine"""
+    try:
+        open_icmp_socket(socket.AF_INET)[0].close()
+    except PermissionError:
+        pytest.skip("ICMP sockets are not permitted in this environment")
+
+    results = ping_many(["127.0.0.1", "localhost"], count=2, timeout=1.0, interval=0.01)
+    assert [r["target"] for r in results] == ["127.0.0.1", "localhost"]
+    for r in results:
+        assert r["sent"] == 2
+        assert r["received"] == 2
+        assert r["rtt_avg"] is not None
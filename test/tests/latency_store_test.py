@@ -0,0 +1,78 @@
+import random
+import socket
+
+import pytest
+from modules.icmp_ping import open_icmp_socket
+from modules.latency_store import LatencyMonitor, LatencySeries, P2Quantile
+
+
+def test_series_ring_buffer_wraps():
+    """The ring keeps only the newest `capacity` samples"""
+    series = LatencySeries(capacity=4)
+    for i in range(10):
+        series.add(float(i), float(i))
+
+    samples = series.samples()
+    assert [ts for ts, _ in samples] == [6.0, 7.0, 8.0, 9.0]
+    assert series.sent == 10
+    assert series.stats()["window"]["min"] == 6.0
+
+
+def test_series_counts_loss_and_jitter():
+    """Lost probes count towards loss and are skipped by jitter"""
+    series = LatencySeries(capacity=8)
+    series.add(0.0, 10.0)
+    series.add(1.0, None)
+    series.add(2.0, 26.0)
+
+    stats = series.stats()
+    assert stats["received"] == 2
+    assert stats["loss_pct"] == pytest.approx(33.33)
+    assert stats["jitter"] == pytest.approx(1.0)
+
+
+def test_p2_quantile_tracks_exact_percentile():
+    """P-square estimates stay close to the true percentile"""
+    rng = random.Random(42)
+    values = [rng.uniform(0, 100) for _ in range(20000)]
+    estimator = P2Quantile(0.95)
+    for v in values:
+        estimator.add(v)
+
+    exact = sorted(values)[int(0.95 * len(values))]
+    assert estimator.value() == pytest.approx(exact, abs=1.5)
+
+
+def test_monitor_snapshot_while_running(tmp_path):
+    """The monitor can be queried live and writes a status file"""
+    try:
+        open_icmp_socket(socket.AF_INET)[0].close()
+    except PermissionError:
+        pytest.skip("ICMP sockets are not permitted in this environment")
+
+    status_path = tmp_path / "status.json"
+    monitor = LatencyMonitor(["127.0.0.1"], interval=0.05, timeout=0.05, status_path=str(status_path))
+    monitor.start(duration=0.3)
+    monitor.wait(5)
+
+    snapshot = monitor.snapshot()
+    stats = snapshot["targets"]["127.0.0.1"]
+    assert not snapshot["running"]
+    assert stats["received"] >= 2
+    assert stats["window"]["p50"] is not None
+    assert status_path.exists()
+
+
+def test_monitor_clears_running_when_ping_fails(monkeypatch):
+    """A failing round stops the monitor instead of leaving it marked running"""
+    async def boom(self, targets, count=1):
+        raise OSError("network unreachable")
+
+    monkeypatch.setattr("modules.latency_store.IcmpPinger.ping_many", boom)
+    monitor = LatencyMonitor(["127.0.0.1"], interval=0.05, timeout=0.05)
+    monitor.start(duration=1)
+    monitor.wait(5)
+
+    assert not monitor.is_running()
+    assert monitor.error == "network unreachable"
+    assert monitor.snapshot()["error"] == "network unreachable"
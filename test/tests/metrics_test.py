@@ -0,0 +1,115 @@
+import json
+import time
+import urllib.request
+
+import pytest
+
+from modules.metrics import Metrics, SttTimer, get_metrics, percentile, serve_metrics, write_session_metrics
+from modules.providers import FakeProvider
+from modules.router import Router
+
+
+def test_percentiles():
+    """Nearest-rank percentiles over the recorded samples"""
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile([], 50) is None
+
+
+def test_prometheus_text():
+    """Histograms and counters render in the Prometheus text format"""
+    metrics = Metrics()
+    metrics.observe("llm_seconds", 0.2, provider="deepseek")
+    metrics.observe("llm_seconds", 4.0, provider="deepseek")
+    metrics.inc("cache_hits_total", cache="command")
+    metrics.inc("llm_prompt_tokens_total", 1200, provider="deepseek")
+    text = metrics.prometheus()
+
+    assert "# TYPE assistant_llm_seconds histogram" in text
+    assert 'assistant_llm_seconds_bucket{provider="deepseek",le="0.25"} 1' in text
+    assert 'assistant_llm_seconds_bucket{provider="deepseek",le="5"} 2' in text
+    assert 'assistant_llm_seconds_bucket{provider="deepseek",le="+Inf"} 2' in text
+    assert 'assistant_llm_seconds_count{provider="deepseek"} 2' in text
+    assert 'assistant_cache_hits_total{cache="command"} 1' in text
+    assert 'assistant_llm_prompt_tokens_total{provider="deepseek"} 1200' in text
+    assert "stt_seconds" not in text
+
+
+def test_unknown_metric_is_rejected():
+    """Only the declared metrics can be recorded"""
+    with pytest.raises(KeyError):
+        Metrics().observe("llm_latency", 1.0)
+    with pytest.raises(KeyError):
+        Metrics().inc("llm_seconds")
+
+
+def test_session_summary(tmp_path):
+    """The JSON summary has p50/p95 per series"""
+    metrics = Metrics()
+    for value in (0.1, 0.2, 0.3, 0.4):
+        metrics.observe("command_seconds", value)
+    with metrics.time("tts_first_audio_seconds", assistant="typer"):
+        pass
+    path = tmp_path / "metrics.json"
+    metrics.write_summary(str(path))
+    summary = json.loads(path.read_text())
+
+    assert summary["histograms"]["command_seconds"][""]["p50"] == 0.2
+    assert summary["histograms"]["command_seconds"][""]["p95"] == 0.4
+    assert summary["histograms"]["tts_first_audio_seconds"]["assistant=typer"]["count"] == 1
+
+
+def test_write_session_metrics(tmp_path, monkeypatch):
+    """Both assistants save the shared summary under output/<session_id>/"""
+    monkeypatch.chdir(tmp_path)
+    get_metrics().observe("command_seconds", 0.5)
+    write_session_metrics("session-1")
+
+    summary = json.loads((tmp_path / "output" / "session-1" / "metrics.json").read_text())
+    assert summary["histograms"]["command_seconds"][""]["count"] >= 1
+
+
+def test_stt_timer():
+    """Transcription is timed from the end of recording"""
+    metrics = Metrics()
+    stt = SttTimer(metrics, assistant="typer")
+    stt.transcribed()  # no recording yet
+    stt.recording_stopped()
+    time.sleep(0.02)
+    stt.transcribed()
+
+    histogram = metrics.histogram("stt_seconds", assistant="typer")
+    assert histogram.count == 1 and histogram.sum >= 0.02
+
+
+def test_router_records_llm_metrics():
+    """Every brain call records latency, first token and estimated tokens"""
+    metrics = get_metrics()
+    provider = FakeProvider("0", reply="one two three four")
+    provider.name = "fake-metrics"
+    router = Router(provider)
+    messages = [{"role": "user", "content": "x" * 400}]
+    tokens = metrics.value("llm_prompt_tokens_total", provider="fake-metrics:0")
+
+    router.chat(messages)
+    "".join(router.stream(messages))
+
+    assert metrics.value("llm_prompt_tokens_total", provider="fake-metrics:0") == tokens + 200
+    assert metrics.histogram("llm_seconds", provider="fake-metrics:0").count == 2
+    assert metrics.histogram("llm_first_token_seconds", provider="fake-metrics:0").count == 1
+
+
+def test_metrics_endpoint():
+    """GET /metrics serves the Prometheus text"""
+    metrics = Metrics()
+    metrics.inc("cache_misses_total", cache="command")
+    server = serve_metrics(0, metrics=metrics)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode()
+            assert response.headers["Content-Type"].startswith("text/plain")
+        assert 'assistant_cache_misses_total{cache="command"} 1' in body
+    finally:
+        server.shutdown()
@@ -0,0 +1,65 @@
+import socket
+import struct
+
+import pytest
+from modules.netlink import (
+    RTM_DELADDR, RTM_NEWADDR, RTM_NEWLINK, RTM_NEWROUTE, NetlinkReader, NetlinkSnapshot,
+    parse_message, prefix_to_netmask, primary_network,
+)
+
+
+def _attr(kind: int, payload: bytes) -> bytes:
+    data = struct.pack("=HH", 4 + len(payload), kind) + payload
+    return data + b"\0" * (-len(data) % 4)
+
+
+def _link(index: int, name: str) -> bytes:
+    return (struct.pack("=BxHiII", 0, 1, index, 1, 0)
+            + _attr(3, name.encode() + b"\0") + _attr(1, b"\x02\x00\x00\x00\x00\x01"))
+
+
+def _addr(index: int, address: str, prefixlen: int) -> bytes:
+    return struct.pack("=BBBBI", socket.AF_INET, prefixlen, 0, 0, index) + _attr(2, socket.inet_aton(address))
+
+
+def _default_route(index: int, gateway: str) -> bytes:
+    return (struct.pack("=BBBBBBBBI", socket.AF_INET, 0, 0, 0, 254, 3, 0, 1, 0)
+            + _attr(5, socket.inet_aton(gateway)) + _attr(4, struct.pack("=I", index)))
+
+
+def test_parse_and_apply_messages():
+    """Synthetic link/address/route messages build a named snapshot"""
+    snapshot = NetlinkSnapshot()
+    snapshot.apply(RTM_NEWLINK, parse_message(RTM_NEWLINK, _link(2, "eth0")))
+    snapshot.apply(RTM_NEWADDR, parse_message(RTM_NEWADDR, _addr(2, "192.168.7.20", 23)))
+    snapshot.apply(RTM_NEWROUTE, parse_message(RTM_NEWROUTE, _default_route(2, "192.168.6.1")))
+
+    assert snapshot.get_links()[0]["mac"] == "02:00:00:00:00:01"
+    route = snapshot.get_routes()[0]
+    assert (route["destination"], route["gateway"], route["interface"]) == ("0.0.0.0", "192.168.6.1", "eth0")
+    assert primary_network(snapshot) == {
+        "interface": "eth0", "address": "192.168.7.20", "network": "192.168.6.0/23", "gateway": "192.168.6.1",
+    }
+
+    copy = snapshot.copy()
+    snapshot.apply(RTM_DELADDR, parse_message(RTM_DELADDR, _addr(2, "192.168.7.20", 23)))
+    assert snapshot.get_addresses() == []
+    assert copy.get_addresses()[0]["address"] == "192.168.7.20"
+    assert primary_network(snapshot) is None
+
+
+def test_prefix_to_netmask():
+    """Prefix lengths convert to dotted and IPv6 netmasks"""
+    assert prefix_to_netmask(socket.AF_INET, 20) == "255.255.240.0"
+    assert prefix_to_netmask(socket.AF_INET6, 64) == "ffff:ffff:ffff:ffff::"
+
+
+def test_live_dump_has_loopback():
+    """A real dump includes the loopback interface and its address"""
+    try:
+        snapshot = NetlinkReader().dump()
+    except OSError as e:
+        pytest.skip(f"rtnetlink is not available: {e}")
+
+    assert "lo" in [link["name"] for link in snapshot.get_links()]
+    assert any(a["address"] == "127.0.0.1" for a in snapshot.get_addresses())
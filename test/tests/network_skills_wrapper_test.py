@@ -0,0 +1,26 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from modules import network_skills_wrapper
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_get_skill_returns_shared_instance():
+    """Skills are created once per process and reused"""
+    first = network_skills_wrapper.get_skill("DNSLookupSkill")
+    assert network_skills_wrapper.get_skill("DNSLookupSkill") is first
+    assert network_skills_wrapper.get_skill("TCPConnectionTestSkill") is not first
+
+
+def test_light_skills_do_not_import_heavy_dependencies():
+    """A TCP test loads neither scapy, psutil, dnspython nor requests"""
+    code = (
+        "import sys\n"
+        "from modules import network_skills_wrapper as w\n"
+        "w.tcp_test('127.0.0.1', 9, timeout=1)\n"
+        "print(sorted(m for m in ('scapy', 'psutil', 'dns', 'requests') if m in sys.modules))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
@@ -0,0 +1,85 @@
+import socket
+import struct
+import threading
+import time
+
+import pytest
+from modules.packet_capture import PcapWriter, StreamingCapture, parse_frame
+
+
+def _udp_frame(src: str, dst: str, sport: int, dport: int, vlan: bool = False) -> bytes:
+    eth = b"\x00" * 12 + (struct.pack("!HH", 0x8100, 10) if vlan else b"") + struct.pack("!H", 0x0800)
+    ip = struct.pack("!BBHHHBBH4s4s", 0x45, 0, 28, 0, 0, 64, 17, 0,
+                     socket.inet_aton(src), socket.inet_aton(dst))
+    udp = struct.pack("!HHHH", sport, dport, 8, 0)
+    return eth + ip + udp
+
+
+def test_parse_frame_ipv4_udp():
+    """Headers are parsed in place, including behind a VLAN tag"""
+    for vlan in (False, True):
+        frame = _udp_frame("10.0.0.1", "10.0.0.2", 5353, 53, vlan=vlan)
+        assert parse_frame(memoryview(frame), len(frame)) == ("UDP", "10.0.0.1", "10.0.0.2", 5353, 53)
+
+
+def test_aggregates_are_bounded():
+    """Talker counters are trimmed once they exceed max_keys"""
+    cap = StreamingCapture(max_keys=8)
+    for i in range(100):
+        frame = _udp_frame(f"10.0.1.{i}", "10.0.0.2", 40000 + i, 53)
+        cap._record(memoryview(frame), len(frame), len(frame), 0.0)
+
+    stats = cap.stats(top=3)
+    assert stats["packets"] == 100
+    assert len(cap.talkers) <= 8
+    assert stats["top_talkers"][0][0] == "10.0.0.2"
+    assert stats["top_ports"] == [("UDP/53", 100)]
+
+
+def test_pcap_writer_header_and_records(tmp_path):
+    """Spilled frames use the standard pcap layout"""
+    path = tmp_path / "out.pcap"
+    writer = PcapWriter(str(path), snaplen=128)
+    frame = _udp_frame("10.0.0.1", "10.0.0.2", 1, 2)
+    writer.write(1.5, frame, len(frame))
+    writer.close()
+
+    data = path.read_bytes()
+    assert struct.unpack_from("<I", data, 0)[0] == 0xA1B2C3D4
+    assert struct.unpack_from("<IIII", data, 24) == (1, 500000, len(frame), len(frame))
+    assert data[40:] == frame
+
+
+def test_failed_socket_leaves_no_pcap(tmp_path, monkeypatch):
+    """The pcap file is only created once the capture socket is open"""
+    path = tmp_path / "out.pcap"
+    cap = StreamingCapture(pcap_path=str(path))
+
+    def refuse():
+        raise PermissionError("Operation not permitted")
+
+    monkeypatch.setattr(cap, "_open_socket", refuse)
+    with pytest.raises(PermissionError):
+        cap.run(count=1)
+    assert cap.pcap is None
+    assert not path.exists()
+
+
+def test_capture_loopback():
+    """Capture real frames on loopback when AF_PACKET is permitted"""
+    try:
+        socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(3)).close()
+    except (AttributeError, PermissionError):
+        pytest.skip("AF_PACKET sockets are not permitted in this environment")
+
+    def send():
+        time.sleep(0.1)
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            for _ in range(50):
+                s.sendto(b"x" * 16, ("127.0.0.1", 9))
+
+    threading.Thread(target=send, daemon=True).start()
+    cap = StreamingCapture(iface="lo", ring_slots=16).run(duration=0.5)
+
+    assert cap.stats()["protocols"].get("UDP", 0) >= 50
+    assert len(cap.recent(100)) == 16
@@ -0,0 +1,132 @@
+import socket
+import struct
+
+import pytest
+from modules.paris_traceroute import (ICMP_DEST_UNREACH, ICMP_TIME_EXCEEDED, HopCache, ParisTraceroute,
+                                      format_trace, parse_icmp_error, reply_status)
+
+
+def _ip_header(src: str, dst: str, proto: int) -> bytes:
+    return struct.pack("!BBHHHBBH4s4s", 0x45, 0, 0, 0, 0, 64, proto, 0,
+                       socket.inet_aton(src), socket.inet_aton(dst))
+
+
+def test_parse_icmp_error_reads_quoted_probe():
+    """The quoted UDP header identifies destination, flow and TTL"""
+    quoted = _ip_header("10.0.0.2", "203.0.113.9", socket.IPPROTO_UDP) + struct.pack("!HHHH", 40000, 33434, 8 + 5, 0)
+    icmp = struct.pack("!BBHI", 11, 0, 0, 0) + quoted
+    packet = _ip_header("192.0.2.1", "10.0.0.2", socket.IPPROTO_ICMP) + icmp
+
+    assert parse_icmp_error(packet) == (11, 0, "203.0.113.9", 40000, 13)
+
+
+def test_hop_cache_prefixes():
+    """Shared hops are reused for everyone, /24 neighbours reuse more"""
+    cache = HopCache()
+    cache.add("198.51.100.10", ["10.0.0.1", "100.64.0.1", "a", "b", "c", "198.51.100.10"])
+    cache.add("203.0.113.5", ["10.0.0.1", "100.64.0.1", "x", "y", "z", "203.0.113.5"])
+
+    assert cache.shared_prefix() == ["10.0.0.1", "100.64.0.1"]
+    assert cache.prefix_for("198.51.100.77") == ["10.0.0.1", "100.64.0.1", "a"]
+    assert cache.prefix_for("192.0.2.1") == ["10.0.0.1", "100.64.0.1"]
+
+
+def test_hop_cache_single_path_is_not_shared():
+    """One cached path is not evidence of a shared prefix"""
+    cache = HopCache()
+    cache.add("198.51.100.10", ["10.0.0.1", "100.64.0.1", "a", "b", "c", "198.51.100.10"])
+
+    assert cache.shared_prefix() == []
+    assert cache.prefix_for("192.0.2.1") == []
+
+
+def test_hop_cache_retrace_never_reuses_destination():
+    """Re-tracing a cached target does not splice in its own destination"""
+    cache = HopCache()
+    cache.add("198.51.100.10", ["10.0.0.1", "198.51.100.10"])
+    cache.add("198.51.100.20", ["10.0.0.1", "100.64.0.1", "a", "b", "c", "198.51.100.20"])
+
+    assert cache.prefix_for("198.51.100.10") == ["10.0.0.1", "100.64.0.1", "a"]
+    assert cache.prefix_for("198.51.100.20") == []
+    assert "198.51.100.10" not in cache.shared_prefix()
+
+
+def _fake_probe(paths, calls, codes=None):
+    """Each path's last hop answers with a destination unreachable (port, unless `codes` overrides it)."""
+    codes = codes or {}
+
+    def reply(address, hops, ttl):
+        hop = hops[ttl - 1]
+        if ttl < len(hops):
+            return (hop, 1.0, *reply_status(ICMP_TIME_EXCEEDED, 0, hop, address))
+        return (hop, 1.0, *reply_status(ICMP_DEST_UNREACH, codes.get(address, 3), hop, address))
+
+    def probe(targets):
+        calls.append({a: list(ttls) for a, ttls in targets.items()})
+        return {
+            address: {ttl: reply(address, paths[address], ttl) for ttl in ttls if ttl <= len(paths[address])}
+            for address, ttls in targets.items()
+        }
+    return probe
+
+
+def test_trace_many_confirms_boundary_before_splicing():
+    """The last cached hop is probed live; a mismatch re-probes the prefix"""
+    cache = HopCache()
+    cache.add("198.51.100.10", ["10.0.0.1", "100.64.0.1", "a", "b", "c", "198.51.100.10"])
+    cache.add("203.0.113.5", ["10.0.0.1", "100.64.0.1", "x", "y", "z", "203.0.113.5"])
+    paths = {
+        "192.0.2.1": ["10.0.0.1", "100.64.0.1", "m", "192.0.2.1"],
+        "192.0.2.200": ["10.0.0.1", "100.64.9.9", "n", "192.0.2.200"],
+    }
+
+    calls = []
+    tracer = ParisTraceroute(max_hops=6, cache=cache)
+    tracer._probe = _fake_probe(paths, calls)
+    result = tracer.trace_many(["192.0.2.1"])[0]
+    assert calls == [{"192.0.2.1": [2, 3, 4, 5, 6]}]
+    assert [h["address"] for h in result["hops"]] == paths["192.0.2.1"]
+    assert [h["cached"] for h in result["hops"]] == [True, False, False, False]
+
+    calls.clear()
+    cache.paths.pop("192.0.2.1")
+    result = tracer.trace_many(["192.0.2.200"])[0]
+    assert calls[1] == {"192.0.2.200": [1]}
+    assert [h["address"] for h in result["hops"]] == paths["192.0.2.200"]
+    assert not any(h["cached"] for h in result["hops"])
+
+
+def test_reply_status_only_port_unreachable_from_destination_is_reached():
+    """Other unreachable codes, or a port unreachable from elsewhere, are annotated"""
+    assert reply_status(ICMP_TIME_EXCEEDED, 0, "10.0.0.1", "192.0.2.1") == (False, None)
+    assert reply_status(ICMP_DEST_UNREACH, 3, "192.0.2.1", "192.0.2.1") == (True, None)
+    assert reply_status(ICMP_DEST_UNREACH, 1, "10.0.0.1", "192.0.2.1") == (False, "!H")
+    assert reply_status(ICMP_DEST_UNREACH, 3, "10.0.0.1", "192.0.2.1") == (False, "!<3>")
+
+
+def test_trace_many_stops_at_admin_prohibited_middle_hop():
+    """A code-13 unreachable from a middle hop ends the trace unreached, marked !X"""
+    paths = {"192.0.2.1": ["10.0.0.1", "100.64.0.1"]}
+    tracer = ParisTraceroute(max_hops=6)
+    tracer._probe = _fake_probe(paths, [], codes={"192.0.2.1": 13})
+    result = tracer.trace_many(["192.0.2.1"])[0]
+    assert not result["reached"]
+    assert [h["address"] for h in result["hops"]] == ["10.0.0.1", "100.64.0.1"]
+    assert result["hops"][-1]["annotation"] == "!X"
+    assert tracer._complete({1: ("10.0.0.1", 1.0, False, None), 2: ("100.64.0.1", 1.0, False, "!X")}, range(1, 7))
+    text = format_trace(result)
+    assert "Hop 2: 100.64.0.1 1.0 ms !X" in text
+    assert "Destination not reached." in text
+
+
+def test_trace_many_loopback():
+    """Loopback destinations are reached at the first hop"""
+    try:
+        socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP).close()
+    except PermissionError:
+        pytest.skip("Raw ICMP sockets are not permitted in this environment")
+
+    results = ParisTraceroute(max_hops=4, timeout=1.0).trace_many(["127.0.0.1", "127.0.0.2"])
+    for result in results:
+        assert result["reached"]
+        assert result["hops"][0]["address"] == result["address"]
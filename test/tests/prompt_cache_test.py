@@ -0,0 +1,60 @@
+import os
+
+from modules.prompt_cache import FileCache, PromptLoader, PromptTemplate
+
+
+def _touch(path, ns):
+    os.utime(path, ns=(ns, ns))
+
+
+def test_file_cache_rereads_only_on_change(tmp_path):
+    """Unchanged files come from memory; appends read only the new bytes"""
+    path = tmp_path / "scratchpad.md"
+    path.write_text("## First\n")
+    cache = FileCache()
+
+    assert cache.read(str(path)) == "## First\n"
+    assert cache.read(str(path)) == "## First\n"
+    assert cache.reads == 1
+
+    with open(path, "a") as f:
+        f.write("## Second\n")
+    assert cache.read(str(path)) == "## First\n## Second\n"
+    assert cache.reads == 2
+
+    path.write_text("rewritten")
+    _touch(path, 10**18)
+    assert cache.read(str(path)) == "rewritten"
+
+
+def test_file_cache_append_after_early_edit_rereads(tmp_path):
+    """A same-length edit early in the file is caught even when only the end grew"""
+    path = tmp_path / "scratchpad.md"
+    path.write_text("## First\n" + "x" * 200)
+    cache = FileCache()
+    cache.read(str(path))
+
+    path.write_text("## Fixed\n" + "x" * 200 + "\n## Second\n")
+    assert cache.read(str(path)) == "## Fixed\n" + "x" * 200 + "\n## Second\n"
+
+
+def test_template_segments_render_once():
+    """Placeholders are filled in one pass and values are not re-substituted"""
+    template = PromptTemplate("<a>{{typer-commands}}</a><b>{{scratch_pad}}</b>{{missing}}")
+
+    assert template.placeholders == ["typer-commands", "scratch_pad", "missing"]
+    assert template.render({"typer-commands": "{{scratch_pad}}", "scratch_pad": "notes"}) == (
+        "<a>{{scratch_pad}}</a><b>notes</b>"
+    )
+
+
+def test_loader_recompiles_changed_template(tmp_path):
+    """A template edit is picked up on the next render"""
+    path = tmp_path / "prompt.xml"
+    path.write_text("Hello {{name}}")
+    loader = PromptLoader()
+    assert loader.render(str(path), {"name": "Ada"}) == "Hello Ada"
+
+    path.write_text("Hi {{name}}!")
+    _touch(path, 10**18)
+    assert loader.render(str(path), {"name": "Ada"}) == "Hi Ada!"
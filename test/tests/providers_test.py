@@ -0,0 +1,110 @@
+import asyncio
+import sys
+import threading
+import types
+
+import pytest
+
+from modules import providers
+from modules.providers import Provider, get_provider, parse_brain
+
+
+@pytest.fixture
+def echo_provider(monkeypatch):
+    """A provider backed by an in-memory module instead of a vendor SDK"""
+    module = types.ModuleType("echo_llm")
+    module.clients = 0
+
+    def _get_client():
+        module.clients += 1
+
+    def conversational_prompt(messages, system_prompt="sys", model="echo-1"):
+        return f"{model}:{system_prompt}:{messages[-1]['content']}"
+
+    def stream_conversational_prompt(messages, system_prompt="sys", model="echo-1"):
+        yield from conversational_prompt(messages, system_prompt, model).split(":")
+
+    def prefix_prompt(prompt, prefix="", model="echo-1"):
+        return f"{prefix} {prompt}"
+
+    module.__dict__.update(
+        _get_client=_get_client,
+        conversational_prompt=conversational_prompt,
+        stream_conversational_prompt=stream_conversational_prompt,
+        prefix_prompt=prefix_prompt,
+    )
+    monkeypatch.setitem(sys.modules, "echo_llm", module)
+
+    class EchoProvider(Provider):
+        name, module_name, label = "echo", "echo_llm", "Echo"
+
+    monkeypatch.setitem(providers.PROVIDERS, "echo", EchoProvider)
+    monkeypatch.setattr(providers, "_instances", {})
+    return module
+
+
+def test_parse_brain_matches_existing_settings():
+    """Brain strings from assistant_config.yml map to providers and models"""
+    assert parse_brain("deepseek-v3") == ("deepseek", None)
+    assert parse_brain("gemini") == ("gemini", None)
+    assert parse_brain("ollama:llama3:8b") == ("ollama", "llama3:8b")
+    assert parse_brain("something-else") == ("deepseek", None)
+
+
+def test_provider_is_shared_and_lazy():
+    """Selecting a provider doesn't import its SDK; instances are reused"""
+    provider = get_provider("mistral")
+    assert provider is get_provider("mistral")
+    assert provider._module is None
+
+
+def test_common_interface(echo_provider):
+    """chat, stream, prefix and their async forms go through one interface"""
+    provider = get_provider("echo:echo-2")
+    provider.warm()
+    messages = [{"role": "user", "content": "hi"}]
+
+    assert echo_provider.clients == 1
+    assert provider.chat(messages) == "echo-2:sys:hi"
+    assert list(provider.stream(messages, system_prompt="s")) == ["echo-2", "s", "hi"]
+    assert provider.prefix("ping", "cmd") == "cmd ping"
+    assert provider.prefix("ping", "cmd", no_prefix=True) == " ping"
+
+    async def run():
+        tokens = [t async for t in provider.astream(messages)]
+        return await provider.achat(messages), tokens
+
+    assert asyncio.run(run()) == ("echo-2:sys:hi", ["echo-2", "sys", "hi"])
+
+
+def test_missing_sdk_raises_import_error(monkeypatch):
+    """A provider whose SDK is missing fails with the usual ImportError"""
+    class Missing(Provider):
+        name, module_name, label = "missing", "no_such_llm_sdk", "Missing"
+
+    with pytest.raises(ImportError, match="Missing provider not available"):
+        Missing().chat([])
+
+
+def test_astream_closes_stream_when_consumer_stops():
+    """Closing astream early stops its pump thread and closes the sync stream"""
+    closed = threading.Event()
+
+    class Slow(providers.FakeProvider):
+        def stream(self, messages, system_prompt=None):
+            try:
+                yield from super().stream(messages, system_prompt)
+            finally:
+                closed.set()
+
+    provider = Slow("3000", reply="one two three four five six")
+    provider.first_token = 0.0
+
+    async def run():
+        tokens = provider.astream([{"role": "user", "content": "hi"}])
+        first = await tokens.__anext__()
+        await tokens.aclose()
+        # Closed after the next token instead of after the whole 3 s reply
+        return first, await asyncio.to_thread(closed.wait, 1.5)
+
+    assert asyncio.run(run()) == ("one", True)
@@ -0,0 +1,138 @@
+import threading
+import time
+
+import pytest
+
+from modules.metrics import get_metrics
+from modules.providers import FakeProvider, get_provider
+from modules.router import ERROR_THRESHOLD, Router
+
+MESSAGES = [{"role": "user", "content": "what's the weather like on the moon today?"}]
+
+
+def fake(latency_ms=0, reply="ok", error=None):
+    return FakeProvider(str(latency_ms), reply=reply, error=error)
+
+
+class ClosingFake(FakeProvider):
+    """FakeProvider that records when its stream is closed"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.closed = threading.Event()
+
+    def stream(self, messages, system_prompt=None):
+        try:
+            yield from super().stream(messages, system_prompt)
+        finally:
+            self.closed.set()
+
+
+def test_fake_provider_from_brain_setting():
+    """`fake:<ms>` is a registered brain answering after that delay"""
+    provider = get_provider("fake:50")
+    start = time.perf_counter()
+    assert provider.prefix("prompt", "uv run") == "uv run ok"
+    assert time.perf_counter() - start >= 0.05
+    assert "".join(provider.stream(MESSAGES)) == "ok"
+
+
+def test_fast_primary_is_not_hedged():
+    """A primary answering within the hedge delay is the only one asked"""
+    primary, secondary = fake(reply="primary"), fake(reply="secondary")
+    router = Router(primary, [secondary], hedge_after=0.2)
+
+    assert router.chat(MESSAGES) == "primary"
+    assert secondary.calls == 0
+
+
+def test_slow_primary_is_hedged():
+    """A slow primary gets a second request in flight; the first answer wins"""
+    primary, secondary = fake(500, reply="primary"), fake(50, reply="secondary")
+    router = Router(primary, [secondary], hedge_after=0.1)
+
+    start = time.perf_counter()
+    assert router.prefix("prompt", "cmd", no_prefix=True) == "secondary"
+    assert time.perf_counter() - start < 0.4
+    assert router.report()["fake:50"]["requests"] == 1
+
+
+def test_failure_falls_back_and_demotes():
+    """A failing primary falls back immediately and is tried last once its error EWMA is high"""
+    primary, secondary = fake(error=ConnectionError("down")), fake(reply="secondary")
+    router = Router(primary, [secondary], hedge_after=1.0)
+
+    for _ in range(4):
+        assert router.chat(MESSAGES) == "secondary"
+    assert router._stats(primary).errors >= ERROR_THRESHOLD
+    assert router.candidates(1000)[0] is secondary
+
+    assert router.chat(MESSAGES) == "secondary"
+    assert primary.calls == 4  # no longer asked first
+
+    with pytest.raises(ConnectionError):
+        Router(primary).chat(MESSAGES)
+
+
+def test_stream_hedges_on_first_token():
+    """The stream comes from whichever provider produces a first token first"""
+    primary, secondary = fake(400, reply="slow primary"), fake(60, reply="quick secondary reply")
+    primary.first_token = 0.4
+    router = Router(primary, [secondary], hedge_after=0.05)
+
+    start = time.perf_counter()
+    tokens = iter(router.stream(MESSAGES))
+    first = next(tokens)
+    assert time.perf_counter() - start < 0.3
+    assert first + "".join(tokens) == "quick secondary reply"
+
+
+def test_small_prompts_go_to_local_model():
+    """Short prompts are answered by the local model, long ones by the primary"""
+    primary, local = fake(reply="remote"), fake(reply="local")
+    router = Router(primary, local=local, local_max_tokens=50)
+
+    assert router.chat(MESSAGES) == "local"
+    assert router.chat([{"role": "user", "content": "word " * 100}]) == "remote"
+
+    primary.error = TimeoutError("offline")
+    assert router.chat([{"role": "user", "content": "word " * 100}]) == "local"
+
+
+def test_losing_hedges_are_not_counted():
+    """Once a winner is chosen, the loser's late answer is not recorded"""
+    primary, secondary = fake(310, reply="primary"), fake(20, reply="secondary")
+    router = Router(primary, [secondary], hedge_after=0.05)
+
+    assert router.chat(MESSAGES) == "secondary"
+    time.sleep(0.4)
+    assert get_metrics().value("llm_completion_tokens_total", provider="fake:310") == 0
+    assert router.report()["fake:310"]["requests"] == 0
+
+
+def test_losing_stream_is_closed():
+    """The stream that loses the first-token race is closed and not counted"""
+    primary = ClosingFake("620", reply="slow primary with many words to stream")
+    primary.first_token = 0.2
+    secondary = fake(30, reply="quick secondary reply")
+    router = Router(primary, [secondary], hedge_after=0.05)
+
+    assert "".join(router.stream(MESSAGES)) == "quick secondary reply"
+    assert primary.closed.wait(1)
+    assert get_metrics().value("llm_completion_tokens_total", provider="fake:620") == 0
+
+
+def test_late_losing_stream_records_nothing():
+    """A loser whose first token arrives after the winner's records no latency, success or error"""
+    primary = ClosingFake("710", reply="slow primary")
+    primary.first_token = 0.25
+    secondary = fake(300, reply="quick secondary reply that keeps streaming for a while")
+    secondary.first_token = 0.06
+    router = Router(primary, [secondary], hedge_after=0.05)
+
+    assert "".join(router.stream(MESSAGES)) == secondary.reply
+    assert primary.closed.wait(1)
+    metrics = get_metrics()
+    assert metrics.histogram("llm_first_token_seconds", provider="fake:710") is None
+    assert metrics.value("llm_errors_total", provider="fake:710") == 0
+    assert router.report()["fake:710"]["requests"] == 0
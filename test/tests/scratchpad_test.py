@@ -0,0 +1,75 @@
+from modules.scratchpad import ScratchpadIndex, parse, rotate
+
+PREAMBLE = "# Personal AI Assistant Scratchpad\n"
+NOTES = "\n## Update User Block\nAlex - viewer\n"
+
+
+def command_section(i, request="list users", command="list-users", output="ok\n"):
+    return (
+        f"\n\n## Ada Executed Command (2025-01-11 13:{i:02d}:00)\n\n"
+        f"> Request: {request}\n\n"
+        f"**Ada's Command:** \n```bash\nuv run python commands/template.py {command}\n```\n\n"
+        f"**Output:** \n```\n{output}```"
+    )
+
+
+def test_parse_round_trips():
+    """Sections split on `## ` headers and join back to the same text"""
+    text = PREAMBLE + command_section(1) + NOTES + command_section(2, "ping it", "ping-server")
+    preamble, sections = parse(text)
+
+    assert preamble == PREAMBLE + "\n\n"
+    assert preamble + "".join(s.text for s in sections) == text
+    assert [s.is_command for s in sections] == [True, False, True]
+    assert sections[2].timestamp == "2025-01-11 13:02:00"
+    assert sections[2].request == "ping it"
+    assert sections[2].command == "uv run python commands/template.py ping-server"
+
+
+def test_window_keeps_recent_relevant_and_notes():
+    """Old command sections are dropped unless related to the request"""
+    text = PREAMBLE + NOTES + command_section(1, "scan 10.0.0.0/24 for open ports", "ip-port-scan 10.0.0.0/24")
+    text += "".join(command_section(i) for i in range(2, 8))
+    window = ScratchpadIndex().window(text, "rescan those open ports", recent=2, relevant=1)
+
+    assert "Alex - viewer" in window
+    assert "ip-port-scan 10.0.0.0/24" in window
+    assert "13:07:00" in window and "13:06:00" in window
+    assert "13:05:00" not in window
+    assert "_(4 older command sections omitted)_" in window
+
+
+def test_window_truncates_long_outputs():
+    """Command outputs are cut to their head and tail"""
+    output = "".join(f"line {i}\n" for i in range(1000))
+    window = ScratchpadIndex().window(PREAMBLE + command_section(1, output=output), output_chars=300)
+
+    assert "line 0\n" in window and "line 999\n" in window
+    assert "line 500\n" not in window
+    assert "characters omitted" in window
+
+
+def test_index_reparses_only_appended_text():
+    """Appending to the scratchpad extends the parsed sections"""
+    index = ScratchpadIndex()
+    text = PREAMBLE + command_section(1) + command_section(2)
+    _, first = index.sections(text)
+    _, sections = index.sections(text + command_section(3))
+
+    assert sections[0] is first[0]
+    assert [s.timestamp[-8:] for s in sections] == ["13:01:00", "13:02:00", "13:03:00"]
+
+
+def test_rotate_archives_old_sections(tmp_path):
+    """Old command sections move to the archive in order, notes stay"""
+    path, archive = tmp_path / "scratchpad.md", tmp_path / "output" / "scratchpad-archive.md"
+    path.write_text(PREAMBLE + NOTES + "".join(command_section(i) for i in range(1, 6)))
+
+    assert rotate(str(path), str(archive), archive_after=5) == 0
+    path.write_text(path.read_text() + command_section(6))
+    assert rotate(str(path), str(archive), archive_after=5, keep=2) == 4
+
+    remaining, archived = path.read_text(), archive.read_text()
+    assert remaining.startswith(PREAMBLE + NOTES)
+    assert "13:05:00" in remaining and "13:06:00" in remaining and "13:04:00" not in remaining
+    assert archived.index("13:01:00") < archived.index("13:04:00")
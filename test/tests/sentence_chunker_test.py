@@ -0,0 +1,31 @@
+from modules.sentence_chunker import SentenceChunker, iter_sentences
+
+
+def _tokens(text, size=3):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_sentences_complete_as_tokens_arrive():
+    """A sentence is emitted as soon as the token after its end arrives"""
+    chunker = SentenceChunker()
+    assert chunker.feed("The router is up") == []
+    assert chunker.feed(" again. Next") == ["The router is up again."]
+    assert chunker.flush() == ["Next"]
+
+
+def test_abbreviations_decimals_and_short_fragments():
+    """Abbreviations and decimals don't split; short fragments join the next sentence"""
+    text = "Sure! Dr. Smith measured 3.5 ms of latency. Ok. That is fine, right? Done"
+    assert list(iter_sentences(_tokens(text))) == [
+        "Sure! Dr. Smith measured 3.5 ms of latency.",
+        "Ok. That is fine, right?",
+        "Done",
+    ]
+
+
+def test_run_on_text_is_cut_at_soft_breaks():
+    """Text with no sentence end is cut at the last comma within max_chars"""
+    text = "one two three, four five six seven eight nine ten eleven twelve"
+    sentences = list(iter_sentences(_tokens(text), max_chars=40))
+    assert sentences[0] == "one two three,"
+    assert " ".join(sentences) == text
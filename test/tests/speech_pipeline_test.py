@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pytest
+
+from modules.speech_pipeline import SentencePipeline
+
+
+def _slow_tokens(text, delay):
+    for word in text.split(" "):
+        time.sleep(delay)
+        yield word + " "
+
+
+def test_first_sentence_plays_before_generation_ends():
+    """Playback starts after the first sentence, not after the whole response"""
+    played = []
+    text = "The scan finished without errors. " * 3 + "Four hosts answered on port twenty two."
+    pipeline = SentencePipeline(played.append, synthesize=lambda s: s.upper())
+
+    start = time.perf_counter()
+    result = pipeline.run(_slow_tokens(text, 0.01))
+    elapsed = time.perf_counter() - start
+
+    assert result.strip() == text.strip()
+    assert played[0] == "THE SCAN FINISHED WITHOUT ERRORS."
+    assert len(played) == 4
+    assert pipeline.first_audio < elapsed / 2
+    assert 0 < pipeline.first_sentence <= pipeline.first_audio
+
+
+def test_interrupt_stops_speech_but_keeps_text():
+    """An interrupt stops playback while the full reply is still collected"""
+    interrupt = threading.Event()
+    played = []
+
+    def play(sentence):
+        played.append(sentence)
+        interrupt.set()
+
+    pipeline = SentencePipeline(play, interrupt=interrupt)
+    result = pipeline.run(_slow_tokens("First sentence here. Second sentence here. Third one too.", 0))
+
+    assert played == ["First sentence here."]
+    assert result.strip().endswith("Third one too.")
+
+
+def test_errors_propagate():
+    """Errors from the token stream or from playback are raised by run()"""
+    def broken():
+        yield "Hello there, this is fine. "
+        raise RuntimeError("stream dropped")
+
+    with pytest.raises(RuntimeError, match="stream dropped"):
+        SentencePipeline(lambda s: None).run(broken())
+
+    def fail(sentence):
+        raise OSError("no audio device")
+
+    with pytest.raises(OSError):
+        SentencePipeline(fail).run(_slow_tokens("One sentence is here. And another one here.", 0))
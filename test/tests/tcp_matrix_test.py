@@ -0,0 +1,50 @@
+import socket
+
+from modules.tcp_matrix import check_matrix, format_matrix, load_expectations
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_load_expectations_csv_and_yaml(tmp_path):
+    """CSV and YAML rows expand port lists and ranges"""
+    csv_file = tmp_path / "matrix.csv"
+    csv_file.write_text("policy,host,port,expect\ndmz,10.0.0.1,\"22,8000-8002\",closed\n,10.0.0.2,443,open\n")
+    yaml_file = tmp_path / "matrix.yml"
+    yaml_file.write_text("checks:\n  - {host: 10.0.0.3, ports: [80, 443], expect: open}\n")
+
+    checks = load_expectations(str(csv_file))
+    assert [(c["host"], c["port"], c["expect"]) for c in checks] == [
+        ("10.0.0.1", 22, "closed"), ("10.0.0.1", 8000, "closed"), ("10.0.0.1", 8001, "closed"),
+        ("10.0.0.1", 8002, "closed"), ("10.0.0.2", 443, "open"),
+    ]
+    assert checks[0]["policy"] == "dmz"
+    assert [c["port"] for c in load_expectations(str(yaml_file))] == [80, 443]
+
+
+def test_check_matrix_reports_only_deviations():
+    """A listening port expected closed and a closed port expected open are the deviations"""
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(16)
+    open_port, closed_port = listener.getsockname()[1], _free_port()
+    checks = [
+        {"policy": "", "host": "127.0.0.1", "port": open_port, "expect": "open"},
+        {"policy": "", "host": "127.0.0.1", "port": closed_port, "expect": "closed"},
+        {"policy": "lan", "host": "127.0.0.1", "port": open_port, "expect": "closed"},
+        {"policy": "lan", "host": "127.0.0.1", "port": closed_port, "expect": "open"},
+    ]
+    try:
+        results = check_matrix(checks, timeout=1.0)
+    finally:
+        listener.close()
+
+    assert [r["ok"] for r in results] == [True, True, False, False]
+    assert results[0]["actual"] == "open" and results[0]["latency_ms"] is not None
+    assert results[1]["actual"] == "closed"
+    report = format_matrix(results).splitlines()
+    assert report[0] == "4 checks, 2 deviation(s)"
+    assert len(report) == 3 and all(line.startswith("DEV [lan]") for line in report[1:])
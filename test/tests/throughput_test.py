@@ -0,0 +1,25 @@
+from modules.throughput import ThroughputServer, format_result, loopback_benchmark, run_client
+
+
+def test_loopback_benchmark_both_directions():
+    """Bundled server and client measure upload then download over loopback"""
+    intervals = []
+    upload, download = loopback_benchmark(streams=3, duration=0.6, interval=0.2, on_interval=intervals.append)
+
+    assert (upload["direction"], download["direction"]) == ("upload", "download")
+    for result in (upload, download):
+        assert "errors" not in result
+        assert len(result["per_stream"]) == 3
+        assert all(n > 0 for n in result["per_stream"])
+        assert result["bytes"] == sum(result["per_stream"]) and result["mbps"] > 0
+    assert len(intervals) >= 4
+    assert "total:" in format_result(upload)
+
+
+def test_upload_total_is_what_server_received():
+    """Upload bytes come from the server's receive count, not the client send count"""
+    with ThroughputServer("127.0.0.1", 0, buffer_size=64 * 1024) as server:
+        result = run_client(*server.address, streams=1, duration=0.3, interval=1.0, buffer_size=64 * 1024)
+
+    assert result["bytes"] == result["per_stream"][0] > 0
+    assert sum(r["bytes"] for r in result["intervals"]) >= result["bytes"]
@@ -0,0 +1,131 @@
+import json
+import logging
+import shutil
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("elevenlabs")
+
+from modules import providers, typer_agent  # noqa: E402
+from modules.providers import Provider  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+DELAY = 0.3
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch):
+    """A TyperAgent in a scratch directory with a slow in-memory brain"""
+    shutil.copytree(ROOT / "prompts", tmp_path / "prompts")
+    (tmp_path / "assistant_config.yml").write_text("typer_assistant:\n  brain: slow\n  voice: local\n")
+    (tmp_path / "commands.py").write_text("import typer\n\napp = typer.Typer()\n\n\n@app.command()\ndef ping():\n    pass\n")
+    (tmp_path / "scratchpad.md").write_text("# Scratchpad\n")
+    monkeypatch.chdir(tmp_path)
+
+    module = types.ModuleType("slow_llm")
+    module.calls = 0
+
+    def prefix_prompt(prompt, prefix=""):
+        module.calls += 1
+        time.sleep(DELAY)
+        if "<latest-action>" in prompt:
+            return "Done, Dan."
+        return f"{prefix} ping"
+
+    module.prefix_prompt = prefix_prompt
+    monkeypatch.setitem(sys.modules, "slow_llm", module)
+
+    class SlowProvider(Provider):
+        name, module_name, label = "slow", "slow_llm", "Slow"
+
+    monkeypatch.setitem(providers.PROVIDERS, "slow", SlowProvider)
+    monkeypatch.setattr(providers, "_instances", {})
+
+    def execute(command, typer_file):
+        time.sleep(DELAY)
+        return "pong\n"
+
+    monkeypatch.setattr(typer_agent, "execute_typer_command", execute)
+    monkeypatch.setattr(typer_agent, "ACKNOWLEDGEMENTS", ())
+    instance = typer_agent.TyperAgent(logging.getLogger("typer_agent_test"), "test-session")
+    instance.acknowledgements.pool_size = 1
+    instance.llm = module
+    instance.spoken = []
+    instance.elevenlabs_client = None
+    monkeypatch.setattr(instance, "_play_speech", lambda text, audio: instance.spoken.append(text))
+    return instance
+
+
+def test_acknowledgement_overlaps_command(agent):
+    """The response is generated while the command runs instead of after it"""
+    start = time.perf_counter()
+    output = agent.process_text("ping it", "commands.py", "scratchpad.md", [], "execute")
+    elapsed = time.perf_counter() - start
+
+    assert output == "pong\n"
+    assert agent.spoken == ["Done, Dan."]
+    assert agent.acknowledgements.get("Command generated and executed", "Ada", "Dan")[0] == "Done, Dan."
+    # command generation + max(command, acknowledgement), not the sum of all three
+    assert elapsed < 3 * DELAY
+    agent.flush_scratchpad()
+    assert "**Output:** \n```\npong\n```" in Path("scratchpad.md").read_text()
+    summary = json.loads(Path("output/test-session/metrics.json").read_text())
+    assert summary["histograms"]["command_seconds"][""]["count"] >= 1
+    assert summary["histograms"]["acknowledgement_wait_seconds"]["assistant=typer"]["count"] >= 1
+    assert summary["histograms"]["llm_seconds"]["provider=slow"]["count"] >= 1
+
+
+def test_scratchpad_writes_stay_ordered(agent):
+    """Background appends land in order and are flushed before the next prompt"""
+    gate = threading.Event()
+    agent._scratchpad_writer.submit(gate.wait)
+    agent.append_scratchpad("scratchpad.md", "\none")
+    agent.append_scratchpad("scratchpad.md", "\ntwo")
+    assert "one" not in Path("scratchpad.md").read_text()
+
+    gate.set()
+    agent.flush_scratchpad()
+    assert Path("scratchpad.md").read_text().endswith("\none\ntwo")
+
+
+def test_repeated_request_skips_generation(agent):
+    """A repeated request reuses the cached command instead of asking the brain"""
+    agent.process_text("Ada, ping it", "commands.py", "scratchpad.md", [], "execute-no-scratch")
+    agent.acknowledgements.wait()
+    calls = agent.llm.calls
+    agent.process_text("ping it please", "commands.py", "scratchpad.md", [], "execute-no-scratch")
+
+    assert agent.llm.calls == calls
+    assert agent.command_cache.hits == 1
+
+
+def test_failed_command_is_not_cached(agent, monkeypatch):
+    """A command that exits non-zero is reported but generated again next time"""
+    def fail(command, typer_file):
+        raise typer_agent.CommandFailed("Error: host unreachable\n", 1)
+
+    monkeypatch.setattr(typer_agent, "execute_typer_command", fail)
+    output = agent.process_text("ping it", "commands.py", "scratchpad.md", [], "execute-no-scratch")
+    agent.acknowledgements.wait()
+    calls = agent.llm.calls
+    agent.process_text("ping it", "commands.py", "scratchpad.md", [], "execute-no-scratch")
+
+    assert output == "Error: host unreachable\n"
+    assert agent.command_cache.hits == 0
+    assert agent.llm.calls > calls
+
+
+def test_generated_only_command_is_not_cached(agent):
+    """Default mode never runs the command, so it is not reused by later requests"""
+    agent.process_text("ping it", "commands.py", "scratchpad.md", [], "default")
+    agent.acknowledgements.wait()
+    calls = agent.llm.calls
+    agent.process_text("ping it", "commands.py", "scratchpad.md", [], "execute-no-scratch")
+
+    assert agent.command_cache.hits == 0
+    assert agent.llm.calls > calls
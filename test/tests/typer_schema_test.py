@@ -0,0 +1,77 @@
+import os
+
+from modules.typer_schema import TyperSchemaCache
+
+COMMANDS = '''import typer
+
+app = typer.Typer()
+
+
+@app.command()
+def network_ping(ip: str = typer.Argument(..., help="Target IP to ping"),
+                 count: int = typer.Option(1, help="Number of packets")):
+    """Ping a host."""
+    print("a long implementation that should not reach the prompt")
+
+
+@app.command()
+def dns_lookup(domain: str = typer.Argument(..., help="Domain to query"),
+               verbose: bool = typer.Option(False, "--verbose", help="Show everything")):
+    """DNS lookup."""
+
+
+@app.command()
+def disk_usage(path: str = "/"):
+    """Show disk usage."""
+'''
+
+
+def write(tmp_path, source=COMMANDS):
+    path = tmp_path / "commands.py"
+    path.write_text(source)
+    return str(path)
+
+
+def test_schema_is_compact(tmp_path):
+    """Commands are described by usage and help, without their bodies"""
+    typer_file = write(tmp_path)
+    schema = TyperSchemaCache().render(typer_file)
+
+    assert "network-ping IP [--count=1]  # Ping a host." in schema
+    assert "IP: Target IP to ping | --count: Number of packets" in schema
+    assert "dns-lookup DOMAIN [--verbose]  # DNS lookup." in schema
+    assert "disk-usage [--path=/]  # Show disk usage." in schema
+    assert "implementation" not in schema
+    assert f"uv run python {typer_file}" in schema
+
+
+def test_schema_cached_by_content(tmp_path):
+    """The app is only loaded again when the file's contents change"""
+    typer_file = write(tmp_path)
+    cache = TyperSchemaCache()
+    cache.render(typer_file)
+    os.utime(typer_file, ns=(0, 0))
+    cache.render(typer_file)
+    assert cache.extractions == 1
+
+    write(tmp_path, COMMANDS.replace("Ping a host.", "Ping one host."))
+    assert "Ping one host." in cache.render(typer_file)
+    assert cache.extractions == 2
+
+
+def test_top_k_keeps_relevant_commands(tmp_path):
+    """Only the commands related to the request are kept, unless none are"""
+    typer_file = write(tmp_path)
+    cache = TyperSchemaCache()
+
+    schema = cache.render(typer_file, "please ping 8.8.8.8 three times", top_k=1)
+    assert "network-ping" in schema
+    assert "dns-lookup" not in schema and "disk-usage" not in schema
+
+    assert "disk-usage" in cache.render(typer_file, "tell me a joke", top_k=1)
+
+
+def test_unloadable_file_falls_back_to_source(tmp_path):
+    """A typer file that cannot be imported is passed through as before"""
+    source = "import missing_dependency_xyz\n"
+    assert TyperSchemaCache().render(write(tmp_path, source)) == source
@@ -0,0 +1,82 @@
+from dataclasses import replace
+
+import pytest
+
+from modules.metrics import SttTimer
+from modules.voice_benchmark import (
+    BenchmarkSettings,
+    FixtureTranscriber,
+    NullAudioSink,
+    ensure_fixtures,
+    load_fixtures,
+    run_base_flow,
+    run_typer_flow,
+)
+
+FAST = BenchmarkSettings(stt=0.01, llm=0.05, first_token=0.02, command=0.05, tts=0.01, runs=2)
+
+
+@pytest.fixture
+def fixtures(tmp_path):
+    return str(ensure_fixtures(str(tmp_path / "fixtures")))
+
+
+def test_synthetic_fixtures(fixtures):
+    """Fixtures are 16 kHz mono WAVs with transcripts, fed in short chunks"""
+    typer_fixtures = load_fixtures(fixtures, "typer-")
+    assert [f.name for f in typer_fixtures] == ["typer-list-viewers", "typer-ping", "typer-ping-wait"]
+
+    fixture = typer_fixtures[1]
+    data, rate = fixture.pcm()
+    assert fixture.text == "Ada, ping the server."
+    assert rate == 16000 and len(data) == 2 * int(rate * (0.3 + 1.4 + 1.0))
+    assert b"".join(fixture.chunks()) == data
+
+
+def test_fixture_transcriber_and_sink(fixtures):
+    """The stub STT and null sink report the configured latencies"""
+    fixture = load_fixtures(fixtures, "base-")[0]
+    text, utterance_end = FixtureTranscriber(0.02).transcribe(fixture, SttTimer())
+    sink = NullAudioSink(0.02)
+    sink.say(text)
+    sink.runAndWait()
+
+    assert text == fixture.text
+    assert sink.spoken == [text]
+    assert sink.first_audio - utterance_end >= 0.04
+
+
+def test_typer_flow(fixtures):
+    """The typer assistant flow reports every stage offline, generating each command"""
+    pytest.importorskip("elevenlabs")
+    report = run_typer_flow(load_fixtures(fixtures, "typer-"), FixtureTranscriber(FAST.stt), FAST)
+
+    assert not report.skipped
+    assert report.requests == 6
+    assert {"stt", "llm total", "command", "request to audio", "end to end"} <= set(report.stages)
+    assert report.stages["end to end"]["p50"] >= FAST.stt + FAST.llm + FAST.command
+    assert report.counters["cache_misses_total"]["cache=command"] == 6
+    assert "cache=command" not in report.counters.get("cache_hits_total", {})
+    assert "stt: stubbed" in report.format()
+    assert "command cache: cold" in report.format()
+
+
+def test_typer_flow_with_command_cache(fixtures):
+    """With the command cache on, repeated requests are reported as cache hits"""
+    pytest.importorskip("elevenlabs")
+    settings = replace(FAST, command_cache=True)
+    report = run_typer_flow(load_fixtures(fixtures, "typer-"), FixtureTranscriber(FAST.stt), settings)
+
+    assert report.counters["cache_hits_total"]["cache=command"] == 6
+    assert "command cache: on" in report.format()
+
+
+def test_base_flow(fixtures):
+    """The base assistant flow streams the stub reply into the null sink"""
+    pytest.importorskip("RealtimeTTS")
+    pytest.importorskip("elevenlabs")
+    report = run_base_flow(load_fixtures(fixtures, "base-"), FixtureTranscriber(FAST.stt), FAST)
+
+    assert not report.skipped
+    assert report.stages["llm first token"]["p50"] >= FAST.first_token
+    assert report.stages["end to end"]["p50"] >= FAST.stt + FAST.first_token
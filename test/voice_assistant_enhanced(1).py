@@ -13,20 +13,19 @@
 # - Better error handling and logging
 #
 # Required libraries:
-# pip install beautifulsoup4 requests speechrecognition pyttsx3 wikipedia pyaudio
+# pip install beautifulsoup4 requests speechrecognition pyttsx3 pyaudio
 # pip install google-api-python-client google-auth-httplib2 google-auth-oauthlib
 # pip install python-dateutil fuzzywuzzy python-levenshtein
 
 import speech_recognition as sr
 import pyttsx3
 import datetime
-import wikipedia
 import webbrowser
 import os
 import time
 import subprocess
 import platform
-import requests
+from modules.http_client import get_session
 import json
 import logging
 from bs4 import BeautifulSoup
@@ -1145,6 +1144,29 @@ def get_voice_info(query):
         logger.error(f"Voice info error: {e}")
 
 # --- Enhanced Search Functions ---
+WIKIPEDIA_API = "https://en.wikipedia.org/w/api.php"
+
+def wikipedia_lookup(search_term, results=5):
+    """Ranked Wikipedia matches with short plain-text extracts, via the MediaWiki API on the pooled session."""
+    params = {
+        "action": "query",
+        "format": "json",
+        "generator": "search",
+        "gsrsearch": search_term,
+        "gsrlimit": results,
+        "prop": "extracts|pageprops",
+        "ppprop": "disambiguation",
+        "exintro": 1,
+        "explaintext": 1,
+        "exsentences": 3,
+        "exlimit": results,
+        "redirects": 1,
+    }
+    response = get_session().get(WIKIPEDIA_API, params=params, timeout=10)
+    response.raise_for_status()
+    pages = response.json().get("query", {}).get("pages", {}).values()
+    return sorted(pages, key=lambda page: page.get("index", 0))
+
 def search_wikipedia(query):
     """Enhanced Wikipedia search with better error handling."""
     search_term = query.replace('wikipedia', '').replace('search', '').strip()
@@ -1156,14 +1178,17 @@ def search_wikipedia(query):
 
     try:
         speak("Searching Wikipedia...")
-        summary = wikipedia.summary(search_term, sentences=3)
-        speak("According to Wikipedia:")
-        speak(summary)
-        logger.info(f"Wikipedia search: {search_term}")
-    except wikipedia.exceptions.DisambiguationError as e:
-        speak(f"There are multiple results for {search_term}. Did you mean {e.options[0]}?")
-    except wikipedia.exceptions.PageError:
-        speak(f"Sorry, I couldn't find any Wikipedia page for {search_term}.")
+        pages = wikipedia_lookup(search_term)
+        if not pages:
+            speak(f"Sorry, I couldn't find any Wikipedia page for {search_term}.")
+        elif "disambiguation" in pages[0].get("pageprops", {}):
+            options = [p["title"] for p in pages[1:] if "disambiguation" not in p.get("pageprops", {})]
+            suggestion = f" Did you mean {options[0]}?" if options else ""
+            speak(f"There are multiple results for {search_term}.{suggestion}")
+        else:
+            speak("According to Wikipedia:")
+            speak(pages[0].get("extract", ""))
+            logger.info(f"Wikipedia search: {search_term}")
     except Exception as e:
         speak("Sorry, there was an error searching Wikipedia.")
         logger.error(f"Wikipedia search error: {e}")
@@ -1184,7 +1209,7 @@ def get_weather(query):
         api_key = "YOUR_OPENWEATHER_API_KEY"
         url = f"http://api.openweathermap.org/data/2.5/weather?q={location}&appid={api_key}&units=metric"
         
-        response = requests.get(url, timeout=10)
+        response = get_session().get(url, timeout=10)
         if response.status_code == 200:
             data = response.json()
             temp = data['main']['temp']
@@ -1428,7 +1453,7 @@ def get_news():
     
     try:
         url = f"https://newsapi.org/v2/top-headlines?country=us&apiKey={NEWS_API_KEY}&pageSize=5"
-        response = requests.get(url, timeout=10)
+        response = get_session().get(url, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -1453,7 +1478,7 @@ def get_hacker_news():
     try:
         speak("Fetching top stories from Hacker News...")
         url = "https://hacker-news.firebaseio.com/v0/topstories.json"
-        response = requests.get(url, timeout=10)
+        response = get_session().get(url, timeout=10)
         
         if response.status_code == 200:
             story_ids = response.json()[:5]  # Get top 5 stories
@@ -1461,7 +1486,7 @@ def get_hacker_news():
             speak("Here are the top Hacker News stories:")
             for i, story_id in enumerate(story_ids, 1):
                 story_url = f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json"
-                story_response = requests.get(story_url, timeout=5)
+                story_response = get_session().get(story_url, timeout=5)
                 
                 if story_response.status_code == 200:
                     story = story_response.json()
@@ -1496,7 +1521,7 @@ def google_search(query):
         # Try to get quick results using DuckDuckGo Instant Answer API (free alternative)
         try:
             ddg_url = f"https://api.duckduckgo.com/?q={search_term}&format=json&no_html=1&skip_disambig=1"
-            response = requests.get(ddg_url, timeout=5)
+            response = get_session().get(ddg_url, timeout=5)
             
             if response.status_code == 200:
                 data = response.json()
@@ -1628,7 +1653,7 @@ def get_definition(query):
     try:
         # Using a free dictionary API
         url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{word}"
-        response = requests.get(url, timeout=10)
+        response = get_session().get(url, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -1677,7 +1702,7 @@ def get_motivation():
 def check_internet():
     """Check internet connectivity."""
     try:
-        response = requests.get("https://www.google.com", timeout=5)
+        response = get_session().get("https://www.google.com", timeout=5)
         if response.status_code == 200:
             speak("Your internet connection is working perfectly.")
         else:
@@ -13,20 +13,19 @@
 # - Better error handling and logging
 #
 # Required libraries:
-# pip install beautifulsoup4 requests speechrecognition pyttsx3 wikipedia pyaudio
+# pip install beautifulsoup4 requests speechrecognition pyttsx3 pyaudio
 # pip install google-api-python-client google-auth-httplib2 google-auth-oauthlib
 # pip install python-dateutil fuzzywuzzy python-levenshtein
 
 import speech_recognition as sr
 import pyttsx3
 import datetime
-import wikipedia
 import webbrowser
 import os
 import time
 import subprocess
 import platform
-import requests
+from modules.http_client import get_session
 import json
 import logging
 from bs4 import BeautifulSoup
@@ -612,6 +611,29 @@ def change_voice_settings(query):
         save_settings(settings)
 
 # --- Enhanced Search Functions ---
+WIKIPEDIA_API = "https://en.wikipedia.org/w/api.php"
+
+def wikipedia_lookup(search_term, results=5):
+    """Ranked Wikipedia matches with short plain-text extracts, via the MediaWiki API on the pooled session."""
+    params = {
+        "action": "query",
+        "format": "json",
+        "generator": "search",
+        "gsrsearch": search_term,
+        "gsrlimit": results,
+        "prop": "extracts|pageprops",
+        "ppprop": "disambiguation",
+        "exintro": 1,
+        "explaintext": 1,
+        "exsentences": 3,
+        "exlimit": results,
+        "redirects": 1,
+    }
+    response = get_session().get(WIKIPEDIA_API, params=params, timeout=10)
+    response.raise_for_status()
+    pages = response.json().get("query", {}).get("pages", {}).values()
+    return sorted(pages, key=lambda page: page.get("index", 0))
+
 def search_wikipedia(query):
     """Enhanced Wikipedia search with better error handling."""
     search_term = query.replace('wikipedia', '').replace('search', '').strip()
@@ -623,14 +645,17 @@ def search_wikipedia(query):
 
     try:
         speak("Searching Wikipedia...")
-        summary = wikipedia.summary(search_term, sentences=3)
-        speak("According to Wikipedia:")
-        speak(summary)
-        logger.info(f"Wikipedia search: {search_term}")
-    except wikipedia.exceptions.DisambiguationError as e:
-        speak(f"There are multiple results for {search_term}. Did you mean {e.options[0]}?")
-    except wikipedia.exceptions.PageError:
-        speak(f"Sorry, I couldn't find any Wikipedia page for {search_term}.")
+        pages = wikipedia_lookup(search_term)
+        if not pages:
+            speak(f"Sorry, I couldn't find any Wikipedia page for {search_term}.")
+        elif "disambiguation" in pages[0].get("pageprops", {}):
+            options = [p["title"] for p in pages[1:] if "disambiguation" not in p.get("pageprops", {})]
+            suggestion = f" Did you mean {options[0]}?" if options else ""
+            speak(f"There are multiple results for {search_term}.{suggestion}")
+        else:
+            speak("According to Wikipedia:")
+            speak(pages[0].get("extract", ""))
+            logger.info(f"Wikipedia search: {search_term}")
     except Exception as e:
         speak("Sorry, there was an error searching Wikipedia.")
         logger.error(f"Wikipedia search error: {e}")
@@ -651,7 +676,7 @@ def get_weather(query):
         api_key = "YOUR_OPENWEATHER_API_KEY"
         url = f"http://api.openweathermap.org/data/2.5/weather?q={location}&appid={api_key}&units=metric"
         
-        response = requests.get(url, timeout=10)
+        response = get_session().get(url, timeout=10)
         if response.status_code == 200:
             data = response.json()
             temp = data['main']['temp']
@@ -53,6 +53,7 @@ from network_diagnostic_skills import (
     LatencyMonitorSkill,
     RouteTableSkill,
 )
+from modules.latency_store import format_snapshot as format_latency_snapshot
 
 
 # Global variables for persistence
@@ -106,9 +107,15 @@ def interface_info_skill_webui():
 def bandwidth_test_skill_webui(download_url, upload_url):
     return bandwidth_test_tool.test(download_url, upload_url)
 
+def bandwidth_local_skill_webui(host, streams, duration):
+    return bandwidth_test_tool.local_test(host.strip() or None, streams=int(streams), duration=float(duration))
+
 def packet_sniffer_skill_webui(filter_expr, count):
     return packet_sniffer_tool.sniff(filter_expr, int(count))
 
+def packet_capture_skill_webui(filter_expr, duration, count, pcap_path):
+    return packet_sniffer_tool.capture(filter_expr, duration=float(duration), count=int(count), pcap_path=pcap_path or None)
+
 def arp_scan_skill_webui(ip_range):
     clients = arp_scan_tool.scan(ip_range)
     if isinstance(clients, list):
@@ -123,9 +130,21 @@ def arp_scan_skill_webui(ip_range):
 def tcp_test_skill_webui(host, port, timeout):
     return tcp_test_tool.test(host, int(port), int(timeout))
 
-def latency_monitor_skill_webui(target_ip, interval, duration):
-    results = latency_monitor_tool.monitor(target_ip, int(interval), int(duration))
-    return "\n".join(results)
+def latency_monitor_skill_webui(targets, interval, duration):
+    hosts = [t.strip() for t in targets.split(",") if t.strip()]
+    if not hosts:
+        return "Enter at least one target."
+    return latency_monitor_tool.start(hosts, interval=float(interval), duration=float(duration) or None)
+
+def latency_status_skill_webui():
+    snapshot = latency_monitor_tool.status()
+    if not snapshot:
+        return "No latency monitor started."
+    state = "running" if snapshot.get("running") else "stopped"
+    return f"Latency monitor ({state}):\n" + format_latency_snapshot(snapshot)
+
+def latency_stop_skill_webui():
+    return latency_monitor_tool.stop() + "\n" + latency_status_skill_webui()
 
 def route_table_skill_webui():
     routes = route_table_tool.get_routes()
@@ -1329,6 +1348,17 @@ def create_ui(config, theme_name="Ocean"):
                             inputs=[bw_download_url_webui, bw_upload_url_webui],
                             outputs=bandwidth_output_webui,
                         )
+                        gr.Markdown("Local throughput test (bundled server; leave host empty for loopback):")
+                        with gr.Row():
+                            bw_local_host_webui = gr.Textbox(label="Throughput Server Host", placeholder="e.g., 10.0.0.5")
+                            bw_streams_webui = gr.Number(label="Streams", value=4, precision=0)
+                            bw_duration_webui = gr.Number(label="Duration (s)", value=5)
+                        bandwidth_local_button_webui = gr.Button("Run Local Throughput Test")
+                        bandwidth_local_button_webui.click(
+                            bandwidth_local_skill_webui,
+                            inputs=[bw_local_host_webui, bw_streams_webui, bw_duration_webui],
+                            outputs=bandwidth_output_webui,
+                        )
 
                     with gr.TabItem("Packet Sniffer"):
                         gr.Markdown("⚠️ **Warning:** Packet sniffing may require administrative/root privileges to run correctly.")
@@ -1340,6 +1370,15 @@ def create_ui(config, theme_name="Ocean"):
                         packet_sniffer_button_webui.click(
                             packet_sniffer_skill_webui, inputs=[sniff_filter_webui, sniff_count_webui], outputs=packet_sniffer_output_webui
                         )
+                        with gr.Row():
+                            capture_duration_webui = gr.Number(label="Streaming Capture Duration (seconds)", value=10)
+                            capture_pcap_webui = gr.Textbox(label="Spill to pcap (optional)", value="", placeholder="e.g., capture.pcap")
+                        packet_capture_button_webui = gr.Button("Start Streaming Capture (aggregates)")
+                        packet_capture_button_webui.click(
+                            packet_capture_skill_webui,
+                            inputs=[sniff_filter_webui, capture_duration_webui, sniff_count_webui, capture_pcap_webui],
+                            outputs=packet_sniffer_output_webui,
+                        )
 
                     with gr.TabItem("ARP Scan"):
                         gr.Markdown("⚠️ **Note:** ARP Scan is typically effective only on the local network segment.")
@@ -1365,16 +1404,21 @@ def create_ui(config, theme_name="Ocean"):
                     with gr.TabItem("Latency Monitor"):
                         gr.Markdown("⚠️ **Note:** This will perform repeated pings. Ensure you have permission and be mindful of network load.")
                         with gr.Row():
-                            lat_target_ip_webui = gr.Textbox(label="Target IP", placeholder="e.g., 8.8.8.8")
-                            lat_interval_webui = gr.Number(label="Interval (seconds)", value=60, precision=0)
-                            lat_duration_webui = gr.Number(label="Duration (seconds)", value=300, precision=0)
+                            lat_target_ip_webui = gr.Textbox(label="Targets", placeholder="e.g., 8.8.8.8, 1.1.1.1")
+                            lat_interval_webui = gr.Number(label="Interval (seconds)", value=1)
+                            lat_duration_webui = gr.Number(label="Duration (seconds, 0 = until stopped)", value=300, precision=0)
                         latency_output_webui = gr.Textbox(label="Latency Monitor Output", lines=10, interactive=False)
-                        latency_button_webui = gr.Button("Start Latency Monitoring")
+                        with gr.Row():
+                            latency_button_webui = gr.Button("Start Latency Monitoring")
+                            latency_refresh_button_webui = gr.Button("Refresh")
+                            latency_stop_button_webui = gr.Button("Stop", variant="stop")
                         latency_button_webui.click(
                             latency_monitor_skill_webui,
                             inputs=[lat_target_ip_webui, lat_interval_webui, lat_duration_webui],
                             outputs=latency_output_webui,
                         )
+                        latency_refresh_button_webui.click(latency_status_skill_webui, inputs=[], outputs=latency_output_webui)
+                        latency_stop_button_webui.click(latency_stop_skill_webui, inputs=[], outputs=latency_output_webui)
 
                     with gr.TabItem("Route Table"):
                         route_table_output_webui = gr.Textbox(label="Route Table Output", lines=10, interactive=False)